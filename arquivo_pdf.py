@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+arquivo_pdf.py — Pacotes mensais de PDFs antigos
+Sistema Oficina 2026
+
+PDFs/ acumula um OS_<ra>.pdf por ordem de serviço. Depois de algum tempo
+sem alteração, os arquivos são compactados em pacotes mensais
+(PDFs/pacotes/pdfs_YYYY-MM.pack, só concatenação) e o deslocamento de cada
+um fica num índice SQLite (PDFs/pacotes/indice.db). A reimpressão lê os
+bytes direto do pacote, sem precisar do arquivo solto.
+
+Ordem das gravações: bytes no pacote (fsync) -> índice (commit) -> apaga os
+arquivos soltos. Uma queda no meio deixa no máximo bytes órfãos no fim do
+pacote ou um arquivo solto que já está no índice.
+
+Nenhum PDF é apagado sem estar no pacote e no índice. Os de antes do cache
+de renderização entram com a chave calculada na hora (`chave_de`) ou, se a
+OS não existe mais, sem chave: continuam no arquivo e saem por extrair(ra).
+Bytes que o índice deixou de apontar (OS compactada de novo, queda no meio)
+são descartados por reescrever(), que copia as entradas vivas para um
+pacote novo antes de trocar o índice.
+"""
+
+import os
+import time
+import shutil
+import sqlite3
+import hashlib
+import tempfile
+from datetime import datetime
+
+PDF_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "PDFs")
+PACOTES_DIR = os.path.join(PDF_DIR, "pacotes")
+INDICE_PATH = os.path.join(PACOTES_DIR, "indice.db")
+EXTRAIDOS_DIR = os.path.join(tempfile.gettempdir(), "oficina_pdfs")
+
+# Só vão para o pacote PDFs sem alteração há pelo menos tantos dias
+IDADE_MINIMA_DIAS = 60
+
+
+def _conectar():
+    os.makedirs(PACOTES_DIR, exist_ok=True)
+    conn = sqlite3.connect(INDICE_PATH)
+    conn.row_factory = sqlite3.Row
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS pdfs (
+            ra TEXT PRIMARY KEY,
+            pacote TEXT NOT NULL,
+            inicio INTEGER NOT NULL,
+            tamanho INTEGER NOT NULL,
+            sha256 TEXT NOT NULL,
+            chave TEXT,
+            compactado_em TEXT
+        )
+    """)
+    return conn
+
+
+def _caminho_pacote(nome):
+    return os.path.join(PACOTES_DIR, nome)
+
+
+def localizar(ra):
+    """Entrada do índice para o RA (dict) ou None."""
+    if not os.path.exists(INDICE_PATH):
+        return None
+    conn = _conectar()
+    try:
+        row = conn.execute("SELECT * FROM pdfs WHERE ra = ?", (ra,)).fetchone()
+        return dict(row) if row else None
+    except sqlite3.Error as e:
+        print(f"[ARQUIVO PDF] Falha ao consultar indice: {e}")
+        return None
+    finally:
+        conn.close()
+
+
+def ler(ra, entrada=None):
+    """Bytes do PDF do RA lidos do pacote (seek + read), ou None."""
+    entrada = entrada or localizar(ra)
+    if not entrada:
+        return None
+    try:
+        with open(_caminho_pacote(entrada["pacote"]), "rb") as f:
+            f.seek(entrada["inicio"])
+            dados = f.read(entrada["tamanho"])
+    except OSError as e:
+        print(f"[ARQUIVO PDF] Falha ao ler {entrada['pacote']}: {e}")
+        return None
+    if hashlib.sha256(dados).hexdigest() != entrada["sha256"]:
+        print(f"[ARQUIVO PDF] PDF da OS {ra} corrompido em {entrada['pacote']}.")
+        return None
+    return dados
+
+
+def extrair(ra, chave=None):
+    """
+    Grava o PDF empacotado num arquivo temporário (para o visualizador) e
+    retorna o caminho. Com `chave`, só serve se o PDF foi gerado com ela.
+    """
+    entrada = localizar(ra)
+    if not entrada or (chave is not None and entrada.get("chave") != chave):
+        return None
+    dados = ler(ra, entrada)
+    if dados is None:
+        return None
+    os.makedirs(EXTRAIDOS_DIR, exist_ok=True)
+    destino = os.path.join(EXTRAIDOS_DIR, f"OS_{ra}.pdf")
+    tmp = f"{destino}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(dados)
+    os.replace(tmp, destino)
+    return destino
+
+
+def compactar(idade_dias=IDADE_MINIMA_DIAS, chaves=None, chave_de=None):
+    """
+    Move os OS_<ra>.pdf soltos sem alteração há `idade_dias` para o pacote
+    do mês em que foram gerados. `chaves` ({ra: chave de renderização})
+    é guardado no índice para a reimpressão saber se o PDF ainda vale;
+    para RA fora de `chaves`, usa chave_de(ra) (pode devolver None). No fim,
+    os pacotes com bytes órfãos são reescritos.
+    Retorna {"arquivos", "bytes", "pacotes", "sem_chave", "liberados", "segundos"}.
+    """
+    inicio = time.perf_counter()
+    chaves = chaves or {}
+    limite = time.time() - idade_dias * 86400
+    por_mes = {}
+    try:
+        with os.scandir(PDF_DIR) as it:
+            for e in it:
+                if not (e.is_file() and e.name.startswith("OS_") and e.name.endswith(".pdf")):
+                    continue
+                st = e.stat()
+                if st.st_mtime <= limite:
+                    mes = datetime.fromtimestamp(st.st_mtime).strftime("%Y-%m")
+                    por_mes.setdefault(mes, []).append(e.path)
+    except FileNotFoundError:
+        por_mes = {}
+
+    total_arquivos = total_bytes = sem_chave = 0
+    conn = _conectar() if por_mes else None
+    try:
+        for mes, caminhos in sorted(por_mes.items()):
+            nome = f"pdfs_{mes}.pack"
+            linhas = []
+            with open(_caminho_pacote(nome), "ab") as pacote:
+                for caminho in caminhos:
+                    ra = os.path.basename(caminho)[3:-4]
+                    chave = chaves.get(ra)
+                    if chave is None and chave_de is not None:
+                        chave = chave_de(ra)
+                    sem_chave += chave is None
+                    with open(caminho, "rb") as f:
+                        dados = f.read()
+                    pos = pacote.tell()
+                    pacote.write(dados)
+                    linhas.append((ra, nome, pos, len(dados), hashlib.sha256(dados).hexdigest(),
+                                   chave, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+                    total_bytes += len(dados)
+                pacote.flush()
+                os.fsync(pacote.fileno())
+            conn.executemany("INSERT OR REPLACE INTO pdfs VALUES (?, ?, ?, ?, ?, ?, ?)", linhas)
+            conn.commit()
+            for caminho in caminhos:
+                os.remove(caminho)
+            total_arquivos += len(caminhos)
+    except (OSError, sqlite3.Error) as e:
+        print(f"[ARQUIVO PDF] Compactacao interrompida: {e}")
+    finally:
+        if conn:
+            conn.close()
+
+    liberados = reescrever()
+    segundos = time.perf_counter() - inicio
+    if total_arquivos:
+        print(f"[ARQUIVO PDF] {total_arquivos} PDFs ({total_bytes / 1024 / 1024:.1f} MB) "
+              f"compactados em {len(por_mes)} pacotes ({sem_chave} sem chave), {segundos:.2f}s")
+    return {"arquivos": total_arquivos, "bytes": total_bytes, "pacotes": len(por_mes),
+            "sem_chave": sem_chave, "liberados": liberados, "segundos": segundos}
+
+
+def reescrever():
+    """
+    Tira dos pacotes os bytes que o índice não aponta mais. Cada pacote com
+    sobra é copiado (só as entradas vivas) para um arquivo de nome novo;
+    o índice passa a apontar para ele num único commit e só então o antigo
+    é apagado. Pacote sem nenhuma entrada no índice é apagado.
+    Retorna quantos bytes foram liberados.
+    """
+    if not os.path.isdir(PACOTES_DIR):
+        return 0
+    liberados = 0
+    conn = _conectar()
+    try:
+        vivos = {r[0]: r[1] for r in conn.execute(
+            "SELECT pacote, SUM(tamanho) FROM pdfs GROUP BY pacote").fetchall()}
+        for nome in sorted(os.listdir(PACOTES_DIR)):
+            if not nome.endswith(".pack"):
+                continue
+            caminho = _caminho_pacote(nome)
+            tamanho = os.path.getsize(caminho)
+            if nome not in vivos:
+                os.remove(caminho)
+                liberados += tamanho
+            elif tamanho > vivos[nome]:
+                _reescrever_pacote(conn, nome)
+                liberados += tamanho - vivos[nome]
+    except (OSError, sqlite3.Error) as e:
+        print(f"[ARQUIVO PDF] Reescrita dos pacotes interrompida: {e}")
+    finally:
+        conn.close()
+    if liberados:
+        print(f"[ARQUIVO PDF] {liberados / 1024 / 1024:.1f} MB orfaos liberados dos pacotes")
+    return liberados
+
+
+def _reescrever_pacote(conn, nome):
+    """Copia as entradas vivas de `nome` para um pacote novo e troca o índice."""
+    entradas = conn.execute(
+        "SELECT ra, inicio, tamanho FROM pdfs WHERE pacote = ? ORDER BY inicio", (nome,)).fetchall()
+    # O mês continua no começo do nome; o sufixo só precisa ser novo
+    novo = f"{nome[:-len('.pack')].split('.')[0]}.{datetime.now().strftime('%Y%m%d%H%M%S%f')}.pack"
+    linhas = []
+    with open(_caminho_pacote(nome), "rb") as origem, open(_caminho_pacote(novo), "wb") as destino:
+        for e in entradas:
+            origem.seek(e["inicio"])
+            linhas.append((novo, destino.tell(), e["ra"], nome))
+            shutil.copyfileobj(_Trecho(origem, e["tamanho"]), destino)
+        destino.flush()
+        os.fsync(destino.fileno())
+    conn.executemany("UPDATE pdfs SET pacote = ?, inicio = ? WHERE ra = ? AND pacote = ?", linhas)
+    conn.commit()
+    os.remove(_caminho_pacote(nome))
+
+
+class _Trecho:
+    """Leitura limitada a `tamanho` bytes a partir da posição atual (para copyfileobj)."""
+
+    def __init__(self, arquivo, tamanho):
+        self.arquivo = arquivo
+        self.restante = tamanho
+
+    def read(self, n=-1):
+        n = self.restante if n < 0 else min(n, self.restante)
+        dados = self.arquivo.read(n)
+        self.restante -= len(dados)
+        return dados
+
+
+def listar_pacotes():
+    """[(nome, quantidade de PDFs, bytes no índice)] de cada pacote."""
+    if not os.path.exists(INDICE_PATH):
+        return []
+    conn = _conectar()
+    try:
+        return [tuple(r) for r in conn.execute(
+            "SELECT pacote, COUNT(*), SUM(tamanho) FROM pdfs GROUP BY pacote ORDER BY pacote"
+        ).fetchall()]
+    finally:
+        conn.close()
@@ -2,24 +2,69 @@
 """
 backup.py — Módulo de backup automático
 Sistema Oficina 2026
+
+Os backups diários ficam num repositório deduplicado dentro de Backups/:
+    chunks/ab/<sha256>.z        blocos do banco (alinhados em páginas, comprimidos)
+    manifestos/oficina_YYYY-MM-DD.json   lista ordenada de blocos de cada dia
+Cada bloco é gravado uma única vez; blocos que nenhum manifesto referencia
+mais são apagados na rotação.
+
+No programa o backup roda numa thread (iniciar_backup_async) depois que a
+janela aparece; aguardar_backup() permite cancelar com segurança ao sair.
+
+Uso:
+    python backup.py                              (backup do dia)
+    python backup.py --listar
+    python backup.py --restaurar YYYY-MM-DD destino.db
 """
 
 import os
-import shutil
+import sys
 import glob
+import json
+import time
+import zlib
+import hashlib
+import sqlite3
+import threading
 from datetime import datetime
 
+import perfil
+
 # Caminhos relativos ao diretório do script
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, "oficina.db")
 BACKUP_DIR = os.path.join(BASE_DIR, "Backups")
+CHUNKS_DIR = os.path.join(BACKUP_DIR, "chunks")
+MANIFESTOS_DIR = os.path.join(BACKUP_DIR, "manifestos")
 MAX_BACKUPS = 30
+HISTORICO_PATH = os.path.join(BACKUP_DIR, "historico_backups.csv")
+
+# Cópia online em lotes de páginas, com pausa entre lotes para não travar a GUI
+PAGINAS_POR_LOTE = 256
+PAUSA_ENTRE_LOTES = 0.005
+
+# Tamanho do bloco deduplicado, em páginas do SQLite
+PAGINAS_POR_CHUNK = 16
+NIVEL_COMPRESSAO = 6
 
+# Estado do backup em segundo plano: ocioso | executando | ok | ja_existe | cancelado | erro
+_estado = "ocioso"
+_thread = None
+_cancelar = threading.Event()
 
+
+class BackupCancelado(Exception):
+    """Levantada quando aguardar_backup(cancelar=True) interrompe um backup em andamento."""
+
+
+@perfil.perfilar()
 def realizar_backup():
     """
-    Copia oficina.db para Backups/oficina_YYYY-MM-DD.db.
-    Mantém apenas os últimos MAX_BACKUPS arquivos.
+    Tira um snapshot de oficina.db usando a API de backup do SQLite (cópia
+    consistente mesmo com o banco em uso), valida com PRAGMA quick_check e
+    guarda no repositório deduplicado como Backups/manifestos/oficina_YYYY-MM-DD.json.
+    Mantém apenas os últimos MAX_BACKUPS manifestos.
     Retorna True se o backup foi realizado, False se já existe backup do dia ou houve erro.
     """
     try:
@@ -28,47 +73,333 @@ def realizar_backup():
             print("[BACKUP] Banco de dados não encontrado. Pulando backup.")
             return False
 
-        # Cria pasta de backups se necessário
-        if not os.path.exists(BACKUP_DIR):
-            os.makedirs(BACKUP_DIR)
-            print(f"[BACKUP] Pasta criada: {BACKUP_DIR}")
+        # Cria pastas de backups se necessário
+        for pasta in (BACKUP_DIR, CHUNKS_DIR, MANIFESTOS_DIR):
+            if not os.path.exists(pasta):
+                os.makedirs(pasta)
+                print(f"[BACKUP] Pasta criada: {pasta}")
 
-        # Nome do arquivo de backup
+        # Nome do backup do dia
         hoje = datetime.now().strftime("%Y-%m-%d")
-        backup_filename = f"oficina_{hoje}.db"
-        backup_path = os.path.join(BACKUP_DIR, backup_filename)
+        nome = f"oficina_{hoje}"
+        manifesto_path = _caminho_manifesto(hoje)
 
         # Verifica se já fez backup hoje
-        if os.path.exists(backup_path):
-            print(f"[BACKUP] Backup de hoje já existe: {backup_filename}")
+        if os.path.exists(manifesto_path):
+            print(f"[BACKUP] Backup de hoje já existe: {nome}")
             return False
 
-        # Realiza a cópia
-        shutil.copy2(DB_PATH, backup_path)
-        print(f"[BACKUP] ✓ Backup realizado: {backup_filename}")
+        # Snapshot em arquivo temporário, validado antes de entrar no repositório
+        tmp_path = os.path.join(BACKUP_DIR, f"{nome}.db.tmp")
+        inicio = time.perf_counter()
+        try:
+            _copiar_online(DB_PATH, tmp_path)
+            if not _verificar_integridade(tmp_path):
+                print(f"[BACKUP] ✗ Cópia falhou no quick_check: {nome}")
+                return False
+            journal_seq = _ultimo_seq_journal(tmp_path)
+            manifesto, bytes_novos = _armazenar_chunks(tmp_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        manifesto["data"] = hoje
+        manifesto["criado_em"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        manifesto["journal_seq"] = journal_seq
+        _gravar_atomico(manifesto_path, json.dumps(manifesto).encode("utf-8"))
+        duracao = time.perf_counter() - inicio
 
-        # Rotação: manter apenas os últimos MAX_BACKUPS
+        tamanho = manifesto["tamanho"]
+        _registrar_historico(nome, tamanho, bytes_novos, duracao)
+        print(f"[BACKUP] ✓ Backup realizado: {nome} "
+              f"({tamanho / 1048576:.1f} MB, {bytes_novos / 1048576:.2f} MB novos, {duracao:.2f}s)")
+
+        # Rotação: manter apenas os últimos MAX_BACKUPS e coletar blocos órfãos
         _limpar_backups_antigos()
+        _coletar_chunks_orfaos()
+        _podar_journal()
 
         return True
 
+    except BackupCancelado:
+        print("[BACKUP] Backup cancelado.")
+        return False
     except Exception as e:
         print(f"[BACKUP] ✗ Erro ao realizar backup: {e}")
         return False
 
 
+def iniciar_backup_async():
+    """
+    Executa realizar_backup() numa thread separada, sem travar a interface.
+    Acompanhe com estado_backup(). Não faz nada se já houver um em andamento.
+    """
+    global _thread, _estado
+    if _thread is not None and _thread.is_alive():
+        return _thread
+    _cancelar.clear()
+    _estado = "executando"
+    _thread = threading.Thread(target=_executar_em_segundo_plano, name="backup", daemon=True)
+    _thread.start()
+    return _thread
+
+
+def estado_backup():
+    """Retorna o estado do último backup em segundo plano."""
+    return _estado
+
+
+def aguardar_backup(cancelar=False, timeout=None):
+    """
+    Espera o backup em segundo plano terminar. Com cancelar=True, pede a
+    interrupção antes (nada fica pela metade: blocos e manifestos só
+    aparecem por rename atômico). Retorna True se não há backup rodando.
+    """
+    if _thread is None or not _thread.is_alive():
+        return True
+    if cancelar:
+        _cancelar.set()
+    _thread.join(timeout)
+    return not _thread.is_alive()
+
+
+def _executar_em_segundo_plano():
+    global _estado
+    if realizar_backup():
+        _estado = "ok"
+    elif _cancelar.is_set():
+        _estado = "cancelado"
+    elif os.path.exists(_caminho_manifesto(datetime.now().strftime("%Y-%m-%d"))):
+        _estado = "ja_existe"
+    else:
+        _estado = "erro"
+
+
+def _checar_cancelamento():
+    if _cancelar.is_set():
+        raise BackupCancelado()
+
+
+def listar_backups():
+    """Retorna as datas (YYYY-MM-DD) com backup disponível, da mais antiga à mais recente."""
+    manifestos = sorted(glob.glob(os.path.join(MANIFESTOS_DIR, "oficina_*.json")))
+    return [os.path.basename(m)[len("oficina_"):-len(".json")] for m in manifestos]
+
+
+def ler_manifesto(data):
+    """Retorna o manifesto (dict) do backup de `data` (YYYY-MM-DD)."""
+    with open(_caminho_manifesto(data), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def restaurar_backup(data, destino):
+    """
+    Remonta o banco do dia `data` (YYYY-MM-DD) em `destino`.
+    Cada bloco é conferido pelo hash. Retorna True se deu certo.
+    """
+    try:
+        manifesto = ler_manifesto(data)
+
+        tmp_path = destino + ".tmp"
+        with open(tmp_path, "wb") as out:
+            for h in manifesto["chunks"]:
+                out.write(_ler_chunk(h))
+        if os.path.getsize(tmp_path) != manifesto["tamanho"]:
+            os.remove(tmp_path)
+            print(f"[BACKUP] ✗ Tamanho restaurado não confere: {data}")
+            return False
+        os.replace(tmp_path, destino)
+        print(f"[BACKUP] ✓ Backup de {data} restaurado em: {destino}")
+        return True
+    except Exception as e:
+        print(f"[BACKUP] ✗ Erro ao restaurar backup de {data}: {e}")
+        return False
+
+
+def _copiar_online(origem, destino):
+    """Copia o banco página a página via sqlite3.Connection.backup."""
+    if os.path.exists(destino):
+        os.remove(destino)
+
+    def _pausa(status, restantes, total):
+        _checar_cancelamento()
+        if restantes:
+            time.sleep(PAUSA_ENTRE_LOTES)
+
+    src = sqlite3.connect(origem)
+    dst = sqlite3.connect(destino)
+    try:
+        src.backup(dst, pages=PAGINAS_POR_LOTE, progress=_pausa)
+    finally:
+        dst.close()
+        src.close()
+
+
+def _verificar_integridade(caminho):
+    """Executa PRAGMA quick_check na cópia. Retorna True se estiver ok."""
+    try:
+        conn = sqlite3.connect(caminho)
+        try:
+            row = conn.execute("PRAGMA quick_check").fetchone()
+            return bool(row) and row[0] == "ok"
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"[BACKUP] Erro no quick_check: {e}")
+        return False
+
+
+def _ultimo_seq_journal(caminho):
+    """Último seq do journal contido no snapshot (0 se o banco ainda não tem journal)."""
+    try:
+        conn = sqlite3.connect(caminho)
+        try:
+            return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM journal").fetchone()[0]
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return 0
+
+
+def _podar_journal():
+    """
+    Checkpoint do journal: entradas já contidas no backup mais antigo mantido
+    nunca mais serão reaplicadas, então saem do banco.
+    """
+    try:
+        seqs = [ler_manifesto(d).get("journal_seq", 0) for d in listar_backups()]
+        if not seqs or min(seqs) <= 0:
+            return
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            cur = conn.execute("DELETE FROM journal WHERE seq <= ?", (min(seqs),))
+            conn.commit()
+            if cur.rowcount:
+                print(f"[BACKUP] Journal: {cur.rowcount} entradas antigas removidas")
+        finally:
+            conn.close()
+    except Exception as e:
+        print(f"[BACKUP] Erro no checkpoint do journal: {e}")
+
+
+# ──────────────────────────── REPOSITÓRIO DE BLOCOS ────────────────────────────
+
+def _tamanho_pagina(caminho):
+    conn = sqlite3.connect(caminho)
+    try:
+        return conn.execute("PRAGMA page_size").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _armazenar_chunks(snapshot_path):
+    """
+    Divide o snapshot em blocos alinhados às páginas e grava só os blocos
+    ainda não existentes. Retorna (manifesto, bytes_novos_gravados).
+    """
+    page_size = _tamanho_pagina(snapshot_path)
+    tam_chunk = page_size * PAGINAS_POR_CHUNK
+    hashes = []
+    bytes_novos = 0
+    with open(snapshot_path, "rb") as f:
+        while True:
+            bloco = f.read(tam_chunk)
+            if not bloco:
+                break
+            _checar_cancelamento()
+            h = hashlib.sha256(bloco).hexdigest()
+            caminho = _caminho_chunk(h)
+            if not os.path.exists(caminho):
+                os.makedirs(os.path.dirname(caminho), exist_ok=True)
+                dados = zlib.compress(bloco, NIVEL_COMPRESSAO)
+                _gravar_atomico(caminho, dados)
+                bytes_novos += len(dados)
+            hashes.append(h)
+    manifesto = {
+        "page_size": page_size,
+        "tamanho": os.path.getsize(snapshot_path),
+        "chunks": hashes,
+    }
+    return manifesto, bytes_novos
+
+
+def _ler_chunk(h):
+    with open(_caminho_chunk(h), "rb") as f:
+        bloco = zlib.decompress(f.read())
+    if hashlib.sha256(bloco).hexdigest() != h:
+        raise ValueError(f"bloco corrompido: {h}")
+    return bloco
+
+
+def _caminho_chunk(h):
+    return os.path.join(CHUNKS_DIR, h[:2], f"{h}.z")
+
+
+def _caminho_manifesto(data):
+    return os.path.join(MANIFESTOS_DIR, f"oficina_{data}.json")
+
+
+def _gravar_atomico(caminho, dados):
+    tmp_path = caminho + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(dados)
+    os.replace(tmp_path, caminho)
+
+
+def _registrar_historico(nome, tamanho, bytes_novos, duracao):
+    """Anexa duração e throughput do backup em historico_backups.csv."""
+    try:
+        novo = not os.path.exists(HISTORICO_PATH)
+        mb_s = (tamanho / 1048576) / duracao if duracao > 0 else 0.0
+        with open(HISTORICO_PATH, "a", encoding="utf-8") as f:
+            if novo:
+                f.write("data_hora;backup;bytes;bytes_novos;segundos;mb_por_s\n")
+            f.write(f"{datetime.now().isoformat(timespec='seconds')};{nome};"
+                    f"{tamanho};{bytes_novos};{duracao:.3f};{mb_s:.2f}\n")
+    except Exception as e:
+        print(f"[BACKUP] Erro ao registrar histórico: {e}")
+
+
 def _limpar_backups_antigos():
     """Remove backups excedentes, mantendo apenas os MAX_BACKUPS mais recentes."""
     try:
-        backups = sorted(glob.glob(os.path.join(BACKUP_DIR, "oficina_*.db")))
-        if len(backups) > MAX_BACKUPS:
-            excedentes = backups[:len(backups) - MAX_BACKUPS]
-            for arquivo in excedentes:
+        manifestos = sorted(glob.glob(os.path.join(MANIFESTOS_DIR, "oficina_*.json")))
+        if len(manifestos) > MAX_BACKUPS:
+            for arquivo in manifestos[:len(manifestos) - MAX_BACKUPS]:
+                os.remove(arquivo)
+                print(f"[BACKUP] Removido backup antigo: {os.path.basename(arquivo)}")
+        # Cópias completas do formato anterior seguem a mesma regra
+        legados = sorted(glob.glob(os.path.join(BACKUP_DIR, "oficina_*.db")))
+        if len(legados) > MAX_BACKUPS:
+            for arquivo in legados[:len(legados) - MAX_BACKUPS]:
                 os.remove(arquivo)
                 print(f"[BACKUP] Removido backup antigo: {os.path.basename(arquivo)}")
     except Exception as e:
         print(f"[BACKUP] Erro na limpeza de backups: {e}")
 
 
+def _coletar_chunks_orfaos():
+    """Apaga blocos que nenhum manifesto restante referencia."""
+    try:
+        referenciados = set()
+        for m in glob.glob(os.path.join(MANIFESTOS_DIR, "oficina_*.json")):
+            with open(m, "r", encoding="utf-8") as f:
+                referenciados.update(json.load(f)["chunks"])
+        removidos = 0
+        for caminho in glob.glob(os.path.join(CHUNKS_DIR, "*", "*.z")):
+            if os.path.basename(caminho)[:-2] not in referenciados:
+                os.remove(caminho)
+                removidos += 1
+        if removidos:
+            print(f"[BACKUP] Blocos órfãos removidos: {removidos}")
+    except Exception as e:
+        print(f"[BACKUP] Erro na coleta de blocos: {e}")
+
+
 if __name__ == "__main__":
-    realizar_backup()
+    if len(sys.argv) >= 2 and sys.argv[1] == "--listar":
+        for d in listar_backups():
+            print(d)
+    elif len(sys.argv) >= 4 and sys.argv[1] == "--restaurar":
+        restaurar_backup(sys.argv[2], sys.argv[3])
+    else:
+        realizar_backup()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+bench_exportar.py — Tempo de exportar_dados numa oficina simulada
+Sistema Oficina 2026
+
+Cria uma pasta temporária com N PDFs falsos, mede a exportação completa,
+a incremental sem mudanças e a incremental com alguns PDFs novos.
+
+Uso:
+    python benchmarks/bench_exportar.py [qtd_pdfs]
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import database
+
+
+def _criar_pdfs(pasta, qtd, inicio=0):
+    os.makedirs(pasta, exist_ok=True)
+    # Conteúdo pouco compressível, como um PDF real
+    for i in range(inicio, inicio + qtd):
+        with open(os.path.join(pasta, f"OS_{2026000000 + i}.pdf"), "wb") as f:
+            f.write(b"%PDF-1.4\n" + os.urandom(4096))
+
+
+def _medir(rotulo, destino, base=None):
+    inicio = time.perf_counter()
+    database.exportar_dados(destino, base_zip=base)
+    duracao = time.perf_counter() - inicio
+    print(f"  {rotulo:<32} {duracao:8.2f}s  {os.path.getsize(destino) / 1048576:8.1f} MB")
+    return destino
+
+
+def main():
+    qtd = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    with tempfile.TemporaryDirectory() as tmp:
+        database.BASE_DIR = tmp
+        database.DB_PATH = os.path.join(tmp, "oficina.db")
+        database.init_db()
+        _criar_pdfs(os.path.join(tmp, "PDFs"), qtd)
+
+        print(f"[BENCH] exportar_dados com {qtd} PDFs")
+        completo = _medir("completa", os.path.join(tmp, "completo.zip"))
+        inc = _medir("incremental sem mudancas", os.path.join(tmp, "inc1.zip"), completo)
+        _criar_pdfs(os.path.join(tmp, "PDFs"), 100, inicio=qtd)
+        _medir("incremental +100 PDFs", os.path.join(tmp, "inc2.zip"), inc)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+bench_navegacao.py — Latência de troca de tela (F5/F2/F3/F4/Financeiro)
+Sistema Oficina 2026
+
+Abre a janela do sistema sobre um banco temporário e percorre as telas do
+menu várias vezes, medindo o tempo até a tela estar desenhada e até os
+dados em segundo plano chegarem. Modo "recriando" destrói as páginas antes
+de cada troca (como era antes das páginas persistentes), para comparar.
+Precisa de display.
+
+Uso:
+    python benchmarks/bench_navegacao.py [qtd_os] [voltas]
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import database
+import backup
+from bench_responsividade import _popular
+
+
+def _trocar(app, metodo, recriar):
+    inicio = time.perf_counter()
+    if recriar:
+        for pagina in app.paginas.values():
+            pagina.destroy()
+        app.paginas.clear()
+    metodo()
+    app.update()
+    desenho = (time.perf_counter() - inicio) * 1000
+    while app.tarefas.pendentes():
+        app.update()
+        time.sleep(0.002)
+    return desenho, (time.perf_counter() - inicio) * 1000
+
+
+def _medir(app, rotulo, voltas, recriar):
+    telas = [("Dashboard", app.mostrar_dashboard), ("Nova OS", app.mostrar_nova_os),
+             ("Buscar OS", app.mostrar_buscar_os), ("Clientes", app.mostrar_clientes),
+             ("Financeiro", app.mostrar_financeiro)]
+    for nome, metodo in telas:  # primeira visita (construção) fora da conta
+        _trocar(app, metodo, recriar)
+    amostras = {nome: [] for nome, _ in telas}
+    for _ in range(voltas):
+        for nome, metodo in telas:
+            amostras[nome].append(_trocar(app, metodo, recriar))
+    print(f"  {rotulo}")
+    for nome, medidas in amostras.items():
+        desenho = sorted(m[0] for m in medidas)
+        dados = sorted(m[1] for m in medidas)
+        print(f"    {nome:<12} desenho p50={desenho[len(desenho) // 2]:7.1f} ms  max={desenho[-1]:7.1f} ms   "
+              f"com dados p50={dados[len(dados) // 2]:7.1f} ms")
+
+
+def main():
+    qtd = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    voltas = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = backup.DB_PATH = os.path.join(tmp, "oficina.db")
+        backup.BACKUP_DIR = os.path.join(tmp, "Backups")
+        backup.CHUNKS_DIR = os.path.join(backup.BACKUP_DIR, "chunks")
+        backup.MANIFESTOS_DIR = os.path.join(backup.BACKUP_DIR, "manifestos")
+        backup.HISTORICO_PATH = os.path.join(backup.BACKUP_DIR, "historico_backups.csv")
+        database.init_db()
+        _popular(qtd)
+
+        import main as interface
+        app = interface.App()
+        while not app._pronto:  # banco preparado em segundo plano
+            app.update()
+            time.sleep(0.002)
+        print(f"[BENCH] troca de tela, {qtd} OS, {voltas} voltas")
+        _medir(app, "recriando as telas (antes)", voltas, recriar=True)
+        _medir(app, "paginas persistentes", voltas, recriar=False)
+        app._encerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+bench_pdf.py — PDFs/s e bytes por PDF do print_engine
+Sistema Oficina 2026
+
+Renderiza OS sintéticas (sem banco) em arquivos separados e num documento
+combinado, e mede throughput e tamanho médio.
+
+Uso:
+    python benchmarks/bench_pdf.py [qtd_os]
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import print_engine
+
+
+def os_sintetica(i):
+    servico = {
+        "ra": f"2026{i:05d}", "data_entrada": "2026-01-15", "status": "Pronto",
+        "cliente_nome": f"Cliente {i} da Silva", "cliente_telefone": "(11) 99999-0000",
+        "cliente_documento": "123.456.789-00", "cliente_endereco": "Rua das Flores, 100 - Centro",
+        "aparelho": "TV", "marca": "LG", "modelo": "42LB5600", "numero_serie": f"SN{i:08d}",
+        "defeito_relatado": "Nao liga, led pisca duas vezes", "valor_total": 350.0,
+        "desconto": 17.5, "valor_final": 332.5, "forma_pagamento": "PIX",
+    }
+    pecas = [{"descricao": "Placa fonte", "valor_unitario": 250.0},
+             {"descricao": "Mao de obra", "valor_unitario": 100.0}]
+    return servico, pecas
+
+
+def main():
+    qtd = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    itens = [os_sintetica(i) for i in range(qtd)]
+    with tempfile.TemporaryDirectory() as tmp:
+        inicio = time.perf_counter()
+        total_bytes = 0
+        for servico, pecas in itens:
+            caminho = os.path.join(tmp, f"OS_{servico['ra']}.pdf")
+            print_engine._renderizar(caminho, [(servico, pecas)])
+            total_bytes += os.path.getsize(caminho)
+        seg = time.perf_counter() - inicio
+        print(f"[BENCH] arquivos separados: {qtd / seg:7.1f} PDFs/s  {total_bytes / qtd:8.0f} bytes/PDF")
+
+        combinado = os.path.join(tmp, "todas.pdf")
+        inicio = time.perf_counter()
+        print_engine._renderizar(combinado, itens)
+        seg = time.perf_counter() - inicio
+        print(f"[BENCH] documento combinado: {qtd / seg:7.1f} pag/s   {os.path.getsize(combinado) / qtd:8.0f} bytes/pag")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+bench_responsividade.py — Atraso do loop de eventos com consultas pesadas
+Sistema Oficina 2026
+
+Simula o loop do Tk numa thread (after() + batida a cada 16 ms) e mede o
+atraso das batidas enquanto as consultas das telas (dashboard, buscar OS,
+financeiro) rodam: primeiro direto no loop, como era antes, depois pelo
+tarefas.Executor. Não precisa de display.
+
+Uso:
+    python benchmarks/bench_responsividade.py [qtd_os]
+"""
+
+import os
+import sys
+import time
+import heapq
+import random
+import sqlite3
+import tempfile
+import itertools
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import database
+import tarefas
+
+BATIDA_MS = 16
+
+
+class LoopSimulado:
+    """after() de uma janela Tk, executado numa única thread."""
+
+    def __init__(self):
+        self._fila = []
+        self._seq = itertools.count()
+
+    def after(self, ms, funcao):
+        heapq.heappush(self._fila, (time.perf_counter() + ms / 1000, next(self._seq), funcao))
+
+    def rodar(self, duracao):
+        fim = time.perf_counter() + duracao
+        while self._fila and time.perf_counter() < fim:
+            quando, _, funcao = heapq.heappop(self._fila)
+            espera = quando - time.perf_counter()
+            if espera > 0:
+                time.sleep(espera)
+            funcao()
+
+
+def _popular(qtd):
+    conn = sqlite3.connect(database.DB_PATH)
+    conn.executemany("INSERT INTO clientes (nome, telefone) VALUES (?, ?)",
+                     [(f"Cliente {i}", f"(11) 9{i:08d}") for i in range(qtd // 3)])
+    formas = ["PIX", "Dinheiro", "Cartao Credito", ""]
+    status = ["Aberto", "Pronto", "Entregue", "Aguardando Peça"]
+    hoje = time.strftime("%Y-%m")
+    conn.executemany(
+        """INSERT INTO servicos (ra, cliente_id, aparelho, status, valor_total, valor_final, forma_pagamento, data_entrada)
+           VALUES (?, ?, 'TV', ?, ?, ?, ?, ?)""",
+        [(f"{2026000000 + i}", random.randint(1, qtd // 3), random.choice(status), v, v, random.choice(formas),
+          f"{hoje}-{random.randint(1, 28):02d}") for i, v in ((i, random.randint(50, 900)) for i in range(qtd))]
+    )
+    conn.commit()
+    conn.close()
+
+
+def _consultas_das_telas():
+    database.contar_por_status()
+    database.contar_pendentes()
+    database.contar_prontos()
+    database.resumo_financeiro_mes()
+    database.listar_servicos()           # o que o Buscar OS fazia antes da tabela paginada
+    database.faturamento_ultimos_meses(6)
+
+
+def _medir(rotulo, disparar):
+    loop = LoopSimulado()
+    atrasos = []
+    esperado = [time.perf_counter() + BATIDA_MS / 1000]
+
+    def batida():
+        agora = time.perf_counter()
+        atrasos.append((agora - esperado[0]) * 1000)
+        esperado[0] = agora + BATIDA_MS / 1000
+        loop.after(BATIDA_MS, batida)
+
+    loop.after(BATIDA_MS, batida)
+    # Cinco "trocas de tela" ao longo de ~2 s
+    for i in range(5):
+        loop.after(200 + i * 350, lambda: disparar(loop))
+    loop.rodar(2.2)
+    atrasos.sort()
+    p95 = atrasos[int(len(atrasos) * 0.95)]
+    print(f"  {rotulo:<22} batidas={len(atrasos):4d}  p95={p95:7.1f} ms  max={atrasos[-1]:7.1f} ms")
+
+
+def main():
+    qtd = int(sys.argv[1]) if len(sys.argv) > 1 else 60000
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = os.path.join(tmp, "oficina.db")
+        database.init_db()
+        _popular(qtd)
+        print(f"[BENCH] atraso do loop de eventos, {qtd} OS (batida de {BATIDA_MS} ms)")
+
+        _medir("direto no loop", lambda loop: _consultas_das_telas())
+
+        executores = {}
+
+        def em_segundo_plano(loop):
+            ex = executores.setdefault(id(loop), tarefas.Executor(loop))
+            ex.executar(_consultas_das_telas)
+
+        _medir("tarefas.Executor", em_segundo_plano)
+        for ex in executores.values():
+            ex.encerrar(esperar=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,488 @@
+# -*- coding: utf-8 -*-
+"""
+bench_suite.py — Suíte de benchmarks com dados sintéticos
+Sistema Oficina 2026
+
+Gera um banco sintético determinístico (mesma semente = mesmos dados)
+numa pasta temporária e mede as funções públicas do database.py, as
+importações do migrador, gerar_pdf_ra e realizar_backup. Para cada caso:
+chamadas/s, itens/s (quando a função devolve linhas), latência p50/p90/
+p99/máx e pico de memória (tracemalloc, numa chamada à parte para não
+distorcer o tempo). O resultado vai para um JSON; --comparar aponta as
+regressões entre dois JSONs (código de saída 1 se houver alguma).
+
+Nada é gravado na pasta do sistema: banco, PDFs, backups e exportações
+ficam na pasta temporária. Ganchos e utilitários internos do esquema
+(ao_alterar, criar/remover_triggers_journal) não são medidos.
+
+Uso:
+    python benchmarks/bench_suite.py [--escala 10k|100k|1m] [--clientes N] [--os N] [--pecas N]
+                                     [--semente 42] [--tempo 1.0] [--so database,migrador,pdf,backup]
+                                     [--saida resultado.json]
+    python benchmarks/bench_suite.py --comparar antes.json depois.json [--tolerancia 0.15]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import sqlite3
+import platform
+import argparse
+import tempfile
+import contextlib
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import database
+import backup
+import migrador
+
+ESCALAS = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}  # quantidade de OS
+CLIENTES_POR_OS = 1 / 3
+PECAS_POR_OS = 2
+SEMENTE = 42
+DATA_FINAL = date(2026, 6, 30)  # fixa: os mesmos meses em qualquer dia que rodar
+MESES = 24
+LOTE_INSERCAO = 50_000
+
+TEMPO_POR_CASO_S = 1.0
+MIN_REPETICOES = 3
+MAX_REPETICOES = 2000
+# migrador.importar_clientes procura duplicado por telefone linha a linha:
+# CSV maior que isso mede a varredura, não a importação
+MAX_LINHAS_MIGRADOR = 20_000
+TOLERANCIA = 0.15
+PISO_MS = 0.2  # diferenças abaixo disso são ruído
+
+NOMES = ["Jose", "Maria", "Joao", "Ana", "Antonio", "Francisca", "Carlos", "Paulo", "Lucas", "Luiz",
+         "Adriana", "Juliana", "Marcos", "Patricia", "Rafael", "Fernanda", "Pedro", "Aline", "Sandra", "Bruno"]
+SOBRENOMES = ["Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira",
+              "Lima", "Gomes", "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes"]
+APARELHOS = [("TV", ["LG", "Samsung", "Philco", "TCL"]), ("Micro-ondas", ["Electrolux", "Panasonic"]),
+             ("Notebook", ["Dell", "Lenovo", "Acer"]), ("Celular", ["Motorola", "Samsung", "Xiaomi"]),
+             ("Som", ["Sony", "Philips"]), ("Geladeira", ["Brastemp", "Consul"])]
+DEFEITOS = ["Nao liga", "Sem imagem", "Sem som", "Tela quebrada", "Nao carrega", "Desliga sozinho",
+            "Barulho estranho", "Nao esquenta", "Botao travado", "Oxidacao"]
+PECAS = ["Placa fonte", "Capacitor", "Tela", "Bateria", "Conector de carga", "Magnetron",
+         "Alto-falante", "Fusivel", "Mao de obra", "Cabo flat"]
+STATUS = ["Aberto", "Aguardando Peca", "Pronto", "Entregue"]
+PESOS_STATUS = [15, 5, 10, 70]
+FORMAS = ["PIX", "Dinheiro", "Cartao Credito", "Cartao Debito", ""]
+
+
+# ──────────────────────────── DADOS SINTÉTICOS ────────────────────────────
+
+def _nome(rnd):
+    return f"{rnd.choice(NOMES)} {rnd.choice(SOBRENOMES)} {rnd.choice(SOBRENOMES)}"
+
+
+def _telefone(i):
+    return f"(11) 9{i:04d}-{(i * 7919) % 10000:04d}"
+
+
+def _clientes(rnd, qtd):
+    for i in range(1, qtd + 1):
+        yield (_nome(rnd), f"Rua {rnd.choice(SOBRENOMES)}, {rnd.randint(1, 2000)}", _telefone(i),
+               f"{rnd.randint(0, 999_999_999):09d}-{rnd.randint(0, 99):02d}")
+
+
+def _servicos(rnd, qtd, clientes):
+    inicio = DATA_FINAL - timedelta(days=MESES * 30)
+    dias = (DATA_FINAL - inicio).days
+    # Datas crescentes como no uso real (RA sequencial por ano)
+    datas = sorted(rnd.randrange(dias + 1) for _ in range(qtd))
+    seq = {}
+    for d in datas:
+        entrada = inicio + timedelta(days=d)
+        seq[entrada.year] = seq.get(entrada.year, 0) + 1
+        aparelho, marcas = rnd.choice(APARELHOS)
+        total = float(rnd.randint(5, 180) * 10)
+        desconto = float(rnd.choice((0, 0, 0, 10, 20)))
+        status = rnd.choices(STATUS, PESOS_STATUS)[0]
+        yield (f"{entrada.year}{seq[entrada.year]:06d}", rnd.randint(1, clientes), aparelho, rnd.choice(marcas),
+               f"M{rnd.randint(100, 999)}", f"SN{rnd.randint(0, 10**8):08d}", rnd.choice(DEFEITOS), status,
+               total, desconto, max(total - desconto, 0), rnd.choice(FORMAS) if status == "Entregue" else "",
+               entrada.isoformat())
+
+
+def gerar_banco(caminho, clientes, qtd_os, pecas_por_os, semente=SEMENTE):
+    """Cria o banco em `caminho` com o esquema do database.py e dados sintéticos. Retorna os RAs."""
+    rnd = random.Random(semente)
+    anterior, database.DB_PATH = database.DB_PATH, caminho
+    try:
+        database.init_db()
+    finally:
+        database.DB_PATH = anterior
+    conn = sqlite3.connect(caminho)
+    try:
+        cursor = conn.cursor()
+        # Carga inicial sem journal (como recuperacao.py ao reaplicar o journal)
+        database.remover_triggers_journal(cursor)
+        cursor.executemany("INSERT INTO clientes (nome, endereco, telefone, documento) VALUES (?, ?, ?, ?)",
+                           _clientes(rnd, clientes))
+        ras = []
+        gerador = _servicos(rnd, qtd_os, clientes)
+        while True:
+            lote = [s for _, s in zip(range(LOTE_INSERCAO), gerador)]
+            if not lote:
+                break
+            cursor.executemany(
+                """INSERT INTO servicos (ra, cliente_id, aparelho, marca, modelo, numero_serie, defeito_relatado,
+                       status, valor_total, desconto, valor_final, forma_pagamento, data_entrada)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""", lote)
+            cursor.executemany("INSERT INTO pecas (servico_ra, descricao, valor_unitario) VALUES (?, ?, ?)",
+                               [(s[0], rnd.choice(PECAS), float(rnd.randint(1, 40) * 5))
+                                for s in lote for _ in range(pecas_por_os)])
+            ras.extend(s[0] for s in lote)
+        database.criar_triggers_journal(cursor)
+        conn.commit()
+    finally:
+        conn.close()
+    return ras
+
+
+def gerar_csvs_legado(pasta, linhas, semente=SEMENTE):
+    """CSVs no formato do sistema antigo (migrador.py). Retorna (clientes.csv, servicos.csv)."""
+    rnd = random.Random(semente + 1)
+    cli_csv = os.path.join(pasta, "clientes_legado.csv")
+    srv_csv = os.path.join(pasta, "servicos_legado.csv")
+    nomes = []
+    with open(cli_csv, "w", encoding="utf-8", newline="") as f:
+        f.write("nome;endereco;telefone;documento\n")
+        for nome, endereco, telefone, documento in _clientes(rnd, linhas):
+            nomes.append(nome)
+            f.write(f"{nome};{endereco};{telefone};{documento}\n")
+    with open(srv_csv, "w", encoding="utf-8", newline="") as f:
+        f.write("ra;cliente_nome;aparelho;marca;modelo;numero_serie;defeito_relatado;status;valor_total;data_entrada\n")
+        for s in _servicos(rnd, linhas, len(nomes)):
+            valor = f"{s[8]:.2f}".replace(".", ",")
+            f.write(f"L{s[0]};{nomes[s[1] - 1]};{s[2]};{s[3]};{s[4]};{s[5]};{s[6]};{s[7].upper()};{valor};{s[12]}\n")
+    return cli_csv, srv_csv
+
+
+# ──────────────────────────── MEDIÇÃO ────────────────────────────
+
+class Caso:
+    """
+    funcao(i) faz a i-ésima chamada; preparar(i), se houver, roda antes e
+    fica fora do tempo. itens(resultado) = linhas processadas na chamada.
+    """
+
+    def __init__(self, grupo, nome, funcao, preparar=None, itens=None, max_repeticoes=MAX_REPETICOES):
+        self.grupo = grupo
+        self.nome = nome
+        self.funcao = funcao
+        self.preparar = preparar
+        self.itens = itens
+        self.max_repeticoes = max_repeticoes
+
+
+def _percentil(ordenados, p):
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def medir(caso, tempo_s=TEMPO_POR_CASO_S):
+    amostras = []
+    itens = 0
+    gasto = 0.0
+    i = 0
+    while i < caso.max_repeticoes and (gasto < tempo_s or (i < MIN_REPETICOES and gasto < tempo_s * 5)):
+        if caso.preparar:
+            caso.preparar(i)
+        inicio = time.perf_counter()
+        resultado = caso.funcao(i)
+        dur = time.perf_counter() - inicio
+        amostras.append(dur * 1000)
+        gasto += dur
+        if caso.itens:
+            itens += caso.itens(resultado)
+        i += 1
+    # Pico de memória numa chamada extra (tracemalloc deixa tudo mais lento)
+    if caso.preparar:
+        caso.preparar(i)
+    tracemalloc.start()
+    try:
+        caso.funcao(i)
+        pico = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    ordenados = sorted(amostras)
+    r = {
+        "grupo": caso.grupo,
+        "chamadas": len(amostras),
+        "ops_s": round(len(amostras) / gasto, 2) if gasto else 0.0,
+        "media_ms": round(sum(amostras) / len(amostras), 4),
+        "p50_ms": round(_percentil(ordenados, 50), 4),
+        "p90_ms": round(_percentil(ordenados, 90), 4),
+        "p99_ms": round(_percentil(ordenados, 99), 4),
+        "max_ms": round(ordenados[-1], 4),
+        "memoria_pico_kb": round(pico / 1024, 1),
+    }
+    if caso.itens:
+        r["itens_por_chamada"] = round(itens / len(amostras), 1)
+        r["itens_s"] = round(itens / gasto, 1) if gasto else 0.0
+    return r
+
+
+def _rss_pico_mb():
+    try:
+        import resource
+    except ImportError:
+        return None  # Windows
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(pico / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+# ──────────────────────────── CASOS ────────────────────────────
+
+def casos_database(pasta, ras, clientes, rnd):
+    meio = ras[len(ras) // 2][:4]
+    ultimo_mes = DATA_FINAL.strftime("%Y-%m")
+    de_mes, ate_mes = f"{ultimo_mes}-01", DATA_FINAL.isoformat()
+    aleatorio_ra = lambda i: ras[rnd.randrange(len(ras))]
+    aleatorio_cli = lambda i: rnd.randint(1, clientes)
+    novos_ras = iter(f"9{n:09d}" for n in range(10**9))
+    csv_clientes = os.path.join(pasta, "clientes_importar.csv")
+    with open(csv_clientes, "w", encoding="utf-8") as f:
+        f.write("nome;telefone;documento;endereco\n")
+        for n in range(2000):
+            f.write(f"Importado {n};(21) 9{n:08d};;Rua Nova, {n}\n")
+    zip_exportado = os.path.join(pasta, "exportacao.zip")
+
+    c = lambda nome, funcao, **kw: Caso("database", nome, funcao, **kw)
+    n = len
+    return [
+        c("get_connection", lambda i: database.get_connection().close()),
+        c("init_db (esquema atual)", lambda i: database.init_db()),
+        c("contar_clientes", lambda i: database.contar_clientes()),
+        c("buscar_clientes", lambda i: database.buscar_clientes(rnd.choice(SOBRENOMES)[:4]), itens=n),
+        c("obter_cliente", lambda i: database.obter_cliente(aleatorio_cli(i))),
+        c("listar_clientes_pagina", lambda i: database.listar_clientes_pagina(rnd.randrange(max(clientes - 50, 1)), 50), itens=n),
+        c("listar_todos_clientes", lambda i: database.listar_todos_clientes(), itens=n),
+        c("gerar_ra", lambda i: database.gerar_ra()),
+        c("obter_servico", lambda i: database.obter_servico(aleatorio_ra(i))),
+        c("obter_servicos_lote (50)", lambda i: database.obter_servicos_lote([aleatorio_ra(i) for _ in range(50)]), itens=n),
+        c("listar_ras (1 mes)", lambda i: database.listar_ras(de_mes, ate_mes), itens=n),
+        c("iterar_servicos_periodo (1 mes)", lambda i: sum(1 for _ in database.iterar_servicos_periodo(de_mes, ate_mes)), itens=lambda r: r),
+        c("listar_servicos (Pronto)", lambda i: database.listar_servicos("Pronto"), itens=n),
+        c("listar_servicos (todos)", lambda i: database.listar_servicos(), itens=n),
+        c("contar_servicos (busca)", lambda i: database.contar_servicos(busca=rnd.choice(SOBRENOMES))),
+        c("listar_servicos_pagina", lambda i: database.listar_servicos_pagina(rnd.randrange(max(len(ras) - 50, 1)), 50), itens=n),
+        c("listar_servicos_pagina (busca)", lambda i: database.listar_servicos_pagina(0, 50, busca=rnd.choice(SOBRENOMES)), itens=n),
+        c("buscar_servicos", lambda i: database.buscar_servicos(f"{meio}00{rnd.randint(10, 99)}"), itens=n),
+        c("listar_pecas", lambda i: database.listar_pecas(aleatorio_ra(i)), itens=n),
+        c("listar_pecas_lote (50)", lambda i: database.listar_pecas_lote([aleatorio_ra(i) for _ in range(50)]), itens=n),
+        c("contar_por_status", lambda i: database.contar_por_status()),
+        c("contar_pendentes", lambda i: database.contar_pendentes()),
+        c("contar_prontos", lambda i: database.contar_prontos()),
+        c("resumo_financeiro_mes", lambda i: database.resumo_financeiro_mes(DATA_FINAL.year, DATA_FINAL.month)),
+        c("faturamento_ultimos_meses (6)", lambda i: database.faturamento_ultimos_meses(6)),
+        # Gravações (cada uma com commit próprio, como na interface)
+        c("salvar_cliente", lambda i: database.salvar_cliente(f"Bench {i}", "Rua X", f"(31) 9{i:08d}", "")),
+        c("atualizar_cliente", lambda i: database.atualizar_cliente(aleatorio_cli(i), f"Bench {i}", "Rua Y", "", "")),
+        c("salvar_servico", lambda i: database.salvar_servico(next(novos_ras), aleatorio_cli(i), "TV", "LG", valor_total=100.0, valor_final=100.0)),
+        c("atualizar_status", lambda i: database.atualizar_status(aleatorio_ra(i), rnd.choice(STATUS))),
+        c("atualizar_servico", lambda i: database.atualizar_servico(aleatorio_ra(i), "Troca de capacitor", 150.0)),
+        c("adicionar_peca", lambda i: database.adicionar_peca(aleatorio_ra(i), "Peca benchmark", 10.0)),
+        c("remover_peca", lambda i: database.remover_peca(i + 1)),  # peças geradas: ids 1..OS x pecas
+        c("importar_clientes_csv (2000)", lambda i: database.importar_clientes_csv(csv_clientes), itens=lambda r: sum(r)),
+        c("exportar_dados", lambda i: database.exportar_dados(zip_exportado), max_repeticoes=5),
+        c("importar_dados", lambda i: database.importar_dados(zip_exportado), max_repeticoes=5),
+    ]
+
+
+def casos_migrador(pasta, linhas):
+    cli_csv, srv_csv = gerar_csvs_legado(pasta, linhas)
+    banco = os.path.join(pasta, "migracao.db")
+
+    def banco_vazio(i):
+        for sufixo in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(banco + sufixo):
+                os.remove(banco + sufixo)
+        database.DB_PATH = banco
+        database.init_db()
+
+    def banco_com_clientes(i):
+        banco_vazio(i)
+        migrador.importar_clientes(cli_csv)
+
+    def banco_importado(i):
+        database.DB_PATH = banco
+        if i == 0:
+            banco_com_clientes(i)
+            migrador.importar_servicos(srv_csv)
+
+    return [
+        Caso("migrador", f"importar_clientes ({linhas})", lambda i: migrador.importar_clientes(cli_csv), preparar=banco_vazio, itens=lambda r: r, max_repeticoes=5),
+        Caso("migrador", f"importar_servicos ({linhas})", lambda i: migrador.importar_servicos(srv_csv), preparar=banco_com_clientes, itens=lambda r: r, max_repeticoes=5),
+        Caso("migrador", f"importar_servicos delta sem mudancas ({linhas})", lambda i: migrador.importar_servicos(srv_csv, delta=True), preparar=banco_importado, max_repeticoes=5),
+    ]
+
+
+def casos_pdf(pasta, ras, rnd):
+    import print_engine
+    import arquivo_pdf
+    print_engine.PDF_DIR = arquivo_pdf.PDF_DIR = os.path.join(pasta, "PDFs")
+    print_engine.CACHE_PDF_PATH = os.path.join(print_engine.PDF_DIR, "cache_pdf.db")
+    arquivo_pdf.PACOTES_DIR = os.path.join(arquivo_pdf.PDF_DIR, "pacotes")
+    arquivo_pdf.INDICE_PATH = os.path.join(arquivo_pdf.PACOTES_DIR, "indice.db")
+    fixo = ras[-1]
+    return [
+        Caso("pdf", "gerar_pdf_ra (renderizando)", lambda i: print_engine.gerar_pdf_ra(ras[rnd.randrange(len(ras))], abrir=False, forcar=True)),
+        Caso("pdf", "gerar_pdf_ra (sem alteracoes)", lambda i: print_engine.gerar_pdf_ra(fixo, abrir=False),
+             preparar=lambda i: i == 0 and print_engine.gerar_pdf_ra(fixo, abrir=False)),
+    ]
+
+
+def casos_backup(pasta):
+    def sem_backups(i):
+        shutil.rmtree(backup.BACKUP_DIR, ignore_errors=True)
+
+    def sem_manifesto_de_hoje(i):
+        # Mantém os blocos: o backup seguinte só grava o que mudou
+        if i == 0 and not os.path.isdir(backup.CHUNKS_DIR):
+            backup.realizar_backup()
+        hoje = backup._caminho_manifesto(datetime.now().strftime("%Y-%m-%d"))
+        if os.path.exists(hoje):
+            os.remove(hoje)
+
+    return [
+        Caso("backup", "realizar_backup (primeiro)", lambda i: backup.realizar_backup(), preparar=sem_backups, max_repeticoes=5),
+        Caso("backup", "realizar_backup (deduplicado)", lambda i: backup.realizar_backup(), preparar=sem_manifesto_de_hoje, max_repeticoes=10),
+    ]
+
+
+# ──────────────────────────── EXECUÇÃO ────────────────────────────
+
+def _apontar_para(pasta):
+    """Banco, backups e exportações da suíte dentro de `pasta`."""
+    database.BASE_DIR = pasta
+    database.DB_PATH = backup.DB_PATH = os.path.join(pasta, "oficina.db")
+    backup.BACKUP_DIR = os.path.join(pasta, "Backups")
+    backup.CHUNKS_DIR = os.path.join(backup.BACKUP_DIR, "chunks")
+    backup.MANIFESTOS_DIR = os.path.join(backup.BACKUP_DIR, "manifestos")
+    backup.HISTORICO_PATH = os.path.join(backup.BACKUP_DIR, "historico_backups.csv")
+
+
+def executar(args):
+    qtd_os = args.os or ESCALAS[args.escala]
+    clientes = args.clientes or max(int(qtd_os * CLIENTES_POR_OS), 1)
+    grupos = args.so.split(",") if args.so else ["database", "migrador", "pdf", "backup"]
+    parametros = {"os": qtd_os, "clientes": clientes, "pecas_por_os": args.pecas, "semente": args.semente,
+                  "tempo_por_caso_s": args.tempo}
+    resultado = {
+        "data": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "plataforma": platform.platform(),
+        "parametros": parametros,
+        "casos": {},
+    }
+    with tempfile.TemporaryDirectory(prefix="oficina_bench_") as pasta:
+        _apontar_para(pasta)
+        print(f"[BENCH] Gerando {qtd_os} OS, {clientes} clientes, {args.pecas} pecas/OS (semente {args.semente})...")
+        inicio = time.perf_counter()
+        ras = gerar_banco(database.DB_PATH, clientes, qtd_os, args.pecas, args.semente)
+        resultado["geracao_s"] = round(time.perf_counter() - inicio, 2)
+        resultado["banco_mb"] = round(os.path.getsize(database.DB_PATH) / 1048576, 1)
+        print(f"[BENCH] Banco de {resultado['banco_mb']} MB em {resultado['geracao_s']} s")
+
+        rnd = random.Random(args.semente)
+        casos = []
+        if "database" in grupos:
+            casos += casos_database(pasta, ras, clientes, rnd)
+        if "pdf" in grupos:
+            try:
+                casos += casos_pdf(pasta, ras, rnd)
+            except ImportError as e:
+                print(f"[BENCH] PDF ignorado (reportlab ausente): {e}")
+        if "backup" in grupos:
+            casos += casos_backup(pasta)
+        if "migrador" in grupos:  # por último: troca o banco ativo
+            casos += casos_migrador(pasta, min(qtd_os, MAX_LINHAS_MIGRADOR))
+
+        print(f"{'caso':<46} {'chamadas':>8} {'ops/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'pico KB':>10}")
+        for caso in casos:
+            # Argumentos sorteados iguais em toda execução, não importa quantas chamadas os casos anteriores fizeram
+            rnd.seed(f"{args.semente}:{caso.nome}")
+            # Mensagens dos módulos ([PDF] OK, [BACKUP]...) não entram na saída
+            with contextlib.redirect_stdout(io.StringIO()):
+                r = medir(caso, args.tempo)
+            resultado["casos"][caso.nome] = r
+            print(f"{caso.nome:<46} {r['chamadas']:>8} {r['ops_s']:>10.1f} {r['p50_ms']:>10.3f} "
+                  f"{r['p99_ms']:>10.3f} {r['memoria_pico_kb']:>10.1f}")
+    resultado["rss_pico_mb"] = _rss_pico_mb()
+
+    saida = args.saida or f"bench_suite_{qtd_os}_{datetime.now().strftime('%Y%m%d_%H%M')}.json"
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=1)
+    print(f"[BENCH] Resultado: {saida}")
+    return 0
+
+
+def comparar(antes_path, depois_path, tolerancia=TOLERANCIA):
+    """
+    Compara caso a caso. Regressão de tempo: p50 e p90 piores que a
+    tolerância (um só costuma ser ruído); de memória: pico acima dela.
+    Retorna 1 se houver regressão.
+    """
+    with open(antes_path, "r", encoding="utf-8") as f:
+        antes = json.load(f)
+    with open(depois_path, "r", encoding="utf-8") as f:
+        depois = json.load(f)
+    if antes.get("parametros") != depois.get("parametros"):
+        print(f"[BENCH] Atencao: parametros diferentes\n  antes:  {antes.get('parametros')}\n  depois: {depois.get('parametros')}")
+    regressoes = 0
+    print(f"{'caso':<46} {'p50 antes':>10} {'p50 depois':>11} {'variacao':>9} {'pico KB':>17}  situacao")
+    for nome, a in antes["casos"].items():
+        d = depois["casos"].get(nome)
+        if d is None:
+            print(f"{nome:<46} (ausente em {depois_path})")
+            continue
+        razao = d["p50_ms"] / a["p50_ms"] if a["p50_ms"] else 1.0
+        razao_p90 = d["p90_ms"] / a["p90_ms"] if a["p90_ms"] else 1.0
+        razao_mem = d["memoria_pico_kb"] / a["memoria_pico_kb"] if a["memoria_pico_kb"] else 1.0
+        situacao = []
+        if razao > 1 + tolerancia and razao_p90 > 1 + tolerancia and d["p50_ms"] - a["p50_ms"] > PISO_MS:
+            situacao.append("REGRESSAO tempo")
+        elif razao < 1 / (1 + tolerancia) and a["p50_ms"] - d["p50_ms"] > PISO_MS:
+            situacao.append("melhora")
+        if razao_mem > 1 + tolerancia and d["memoria_pico_kb"] - a["memoria_pico_kb"] > 64:
+            situacao.append("REGRESSAO memoria")
+        regressoes += sum(s.startswith("REGRESSAO") for s in situacao)
+        print(f"{nome:<46} {a['p50_ms']:>10.3f} {d['p50_ms']:>11.3f} {(razao - 1) * 100:>+8.0f}% "
+              f"{a['memoria_pico_kb']:>8.0f}->{d['memoria_pico_kb']:<8.0f} {', '.join(situacao) or 'ok'}")
+    for nome in depois["casos"].keys() - antes["casos"].keys():
+        print(f"{nome:<46} (novo)")
+    print(f"[BENCH] {regressoes} regressao(oes) acima de {tolerancia:.0%}")
+    return 1 if regressoes else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks com dados sinteticos do Sistema Oficina.")
+    parser.add_argument("--escala", choices=sorted(ESCALAS), default="10k", help="quantidade de OS")
+    parser.add_argument("--os", type=int, help="quantidade de OS (substitui --escala)")
+    parser.add_argument("--clientes", type=int, help=f"padrao: OS x {CLIENTES_POR_OS:.2f}")
+    parser.add_argument("--pecas", type=int, default=PECAS_POR_OS, help="pecas por OS")
+    parser.add_argument("--semente", type=int, default=SEMENTE)
+    parser.add_argument("--tempo", type=float, default=TEMPO_POR_CASO_S, help="segundos medindo cada caso")
+    parser.add_argument("--so", help="grupos separados por virgula: database,migrador,pdf,backup")
+    parser.add_argument("--saida", help="arquivo JSON do resultado")
+    parser.add_argument("--comparar", nargs=2, metavar=("ANTES", "DEPOIS"), help="compara dois resultados")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA, help="variacao aceita (0.15 = 15%%)")
+    args = parser.parse_args()
+    if args.comparar:
+        return comparar(*args.comparar, tolerancia=args.tolerancia)
+    return executar(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+busca_incremental.py — Busca enquanto digita (debounce + cache de prefixos)
+Sistema Oficina 2026
+
+Cada tecla só reagenda a busca; a consulta sai depois de `atraso_ms` sem
+digitação e roda no tarefas.Executor. Resposta de um texto que já mudou é
+descartada. Se um prefixo do texto já foi consultado e veio completo (menos
+linhas que o limite), o resultado é filtrado em memória: "jos" -> "jose"
+não vai ao banco.
+"""
+
+from collections import OrderedDict
+
+ATRASO_PADRAO_MS = 250
+TAMANHO_MINIMO = 2
+MAX_CACHE = 64
+
+# LIKE do SQLite ignora maiúsculas só em ASCII; o filtro em memória faz igual
+_MINUSCULAS_ASCII = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+def contem(texto, trecho):
+    """Equivalente a `texto LIKE '%trecho%'` no SQLite."""
+    return trecho.translate(_MINUSCULAS_ASCII) in (texto or "").translate(_MINUSCULAS_ASCII)
+
+
+class BuscaIncremental:
+    """
+    consultar(texto, limite) -> [dict]      roda no executor
+    campos: chaves comparadas no filtro em memória (as mesmas do WHERE)
+    ao_resultado(texto, linhas)             chamado na thread do Tk
+    """
+
+    def __init__(self, janela, executor, consultar, campos, ao_resultado, limite=20,
+                 atraso_ms=ATRASO_PADRAO_MS, grupo=None):
+        self.janela = janela
+        self.executor = executor
+        self.consultar = consultar
+        self.campos = campos
+        self.ao_resultado = ao_resultado
+        self.limite = limite
+        self.atraso_ms = atraso_ms
+        self.grupo = grupo
+        self._agendado = None
+        self._tarefa = None
+        self._texto = ""
+        self._cache = OrderedDict()  # texto em minúsculas -> linhas (só resultados completos)
+
+    def digitar(self, texto):
+        """Chamar a cada alteração do campo."""
+        self._texto = texto = texto.strip()
+        if self._agendado is not None:
+            self.janela.after_cancel(self._agendado)
+            self._agendado = None
+        if len(texto) < TAMANHO_MINIMO:
+            self._cancelar_consulta()
+            self.ao_resultado(texto, [])
+            return
+        linhas = self._do_cache(texto)
+        if linhas is not None:
+            self._cancelar_consulta()
+            self.ao_resultado(texto, linhas)
+            return
+        self._agendado = self.janela.after(self.atraso_ms, self._consultar)
+
+    def limpar_cache(self):
+        """Após cadastrar/alterar clientes."""
+        self._cache.clear()
+
+    def _do_cache(self, texto):
+        if "%" in texto or "_" in texto:
+            return None  # curingas do LIKE: deixa para o banco
+        chave = texto.translate(_MINUSCULAS_ASCII)
+        if chave in self._cache:
+            self._cache.move_to_end(chave)
+            return self._cache[chave]
+        # Maior prefixo já consultado com resultado completo
+        for fim in range(len(chave) - 1, TAMANHO_MINIMO - 1, -1):
+            base = self._cache.get(chave[:fim])
+            if base is not None:
+                linhas = [r for r in base if any(contem(r.get(c), texto) for c in self.campos)]
+                self._guardar(texto, linhas)
+                return linhas
+        return None
+
+    def _guardar(self, texto, linhas):
+        self._cache[texto.translate(_MINUSCULAS_ASCII)] = linhas
+        if len(self._cache) > MAX_CACHE:
+            self._cache.popitem(last=False)
+
+    def _cancelar_consulta(self):
+        if self._tarefa is not None:
+            self._tarefa.cancelar()
+            self._tarefa = None
+
+    def _consultar(self):
+        self._agendado = None
+        self._cancelar_consulta()
+        texto = self._texto
+
+        def chegou(linhas):
+            if texto != self._texto:
+                return  # o usuário continuou digitando
+            self._tarefa = None
+            if len(linhas) < self.limite:
+                self._guardar(texto, linhas)
+            self.ao_resultado(texto, linhas)
+
+        self._tarefa = self.executor.executar(self.consultar, texto, self.limite, ao_concluir=chegou, grupo=self.grupo)
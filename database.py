@@ -7,9 +7,20 @@ Sistema Oficina 2026
 import sqlite3
 import os
 from datetime import datetime
+import perfil
 
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "oficina.db")
 
+# Tabelas cujas alterações vão para o journal (recuperação ponto-a-ponto)
+TABELAS_JOURNAL = ("clientes", "servicos", "pecas")
+
+# Sobe junto com qualquer mudança em init_db (tabelas, colunas, índices,
+# triggers); com o banco já nessa versão a abertura pula as migrações
+VERSAO_ESQUEMA = 1
+
+# Callbacks avisados depois de cada gravação feita por este módulo
+_ouvintes = []
+
 
 def get_connection():
     """Retorna uma conexão com o banco de dados SQLite."""
@@ -19,11 +30,39 @@ def get_connection():
     return conn
 
 
+def ao_alterar(callback):
+    """
+    Registra callback(tabela), chamado na thread que gravou logo após o
+    commit. tabela None = banco inteiro substituído (importar_dados).
+    """
+    _ouvintes.append(callback)
+
+
+def _notificar(tabela):
+    for callback in _ouvintes:
+        try:
+            callback(tabela)
+        except Exception as e:
+            print(f"[ERRO DB] Falha ao avisar alteracao: {e}")
+
+
+def _esquema_atual(cursor):
+    """Banco já na VERSAO_ESQUEMA e com todos os triggers do journal."""
+    if cursor.execute("PRAGMA user_version").fetchone()[0] != VERSAO_ESQUEMA:
+        return False
+    triggers = cursor.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'journal_%'"
+    ).fetchone()[0]
+    return triggers == 3 * len(TABELAS_JOURNAL)
+
+
 def init_db():
     """Cria as tabelas se não existirem e aplica migrações."""
     conn = get_connection()
     cursor = conn.cursor()
     try:
+        if _esquema_atual(cursor):
+            return
         cursor.executescript("""
             CREATE TABLE IF NOT EXISTS clientes (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -61,9 +100,23 @@ def init_db():
                 valor_unitario REAL DEFAULT 0.0,
                 FOREIGN KEY (servico_ra) REFERENCES servicos(ra)
             );
+
+            CREATE TABLE IF NOT EXISTS journal (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts TEXT DEFAULT (STRFTIME('%Y-%m-%d %H:%M:%f', 'now', 'localtime')),
+                tabela TEXT NOT NULL,
+                op TEXT NOT NULL,
+                linha INTEGER NOT NULL,
+                dados TEXT
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_servicos_data_entrada ON servicos(data_entrada);
+            CREATE INDEX IF NOT EXISTS idx_clientes_nome ON clientes(nome);
         """)
         # Migrações - adiciona colunas novas em bancos existentes
         _migrar_colunas(cursor)
+        criar_triggers_journal(cursor)
+        cursor.execute(f"PRAGMA user_version = {VERSAO_ESQUEMA}")
         conn.commit()
     except sqlite3.Error as e:
         print(f"[ERRO DB] Falha ao inicializar banco: {e}")
@@ -88,6 +141,55 @@ def _migrar_colunas(cursor):
                 pass
 
 
+def criar_triggers_journal(cursor):
+    """
+    (Re)cria os triggers que registram cada INSERT/UPDATE/DELETE em `journal`.
+    Guarda só o rowid, a operação e, no UPDATE, apenas as colunas alteradas.
+    Recriado sempre que init_db migra o esquema, para acompanhar colunas novas.
+    """
+    for tabela in TABELAS_JOURNAL:
+        cols = [row[1] for row in cursor.execute(f"PRAGMA table_info({tabela})").fetchall()]
+        for op in ("ins", "upd", "del"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS journal_{tabela}_{op}")
+
+        todas = ", ".join(f"'{c}', NEW.{c}" for c in cols)
+        cursor.execute(
+            f"""CREATE TRIGGER journal_{tabela}_ins AFTER INSERT ON {tabela}
+                BEGIN
+                    INSERT INTO journal (tabela, op, linha, dados)
+                    VALUES ('{tabela}', 'I', NEW.rowid, json_object({todas}));
+                END"""
+        )
+
+        mudou = " OR ".join(f"NEW.{c} IS NOT OLD.{c}" for c in cols)
+        alteradas = " UNION ALL ".join(
+            f"SELECT '{c}' AS k, NEW.{c} AS v WHERE NEW.{c} IS NOT OLD.{c}" for c in cols
+        )
+        cursor.execute(
+            f"""CREATE TRIGGER journal_{tabela}_upd AFTER UPDATE ON {tabela}
+                WHEN {mudou}
+                BEGIN
+                    INSERT INTO journal (tabela, op, linha, dados)
+                    VALUES ('{tabela}', 'U', NEW.rowid,
+                            (SELECT json_group_object(k, v) FROM ({alteradas})));
+                END"""
+        )
+
+        cursor.execute(
+            f"""CREATE TRIGGER journal_{tabela}_del AFTER DELETE ON {tabela}
+                BEGIN
+                    INSERT INTO journal (tabela, op, linha) VALUES ('{tabela}', 'D', OLD.rowid);
+                END"""
+        )
+
+
+def remover_triggers_journal(cursor):
+    """Remove os triggers do journal (usado ao reaplicar o próprio journal)."""
+    for tabela in TABELAS_JOURNAL:
+        for op in ("ins", "upd", "del"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS journal_{tabela}_{op}")
+
+
 # ──────────────────────────── CLIENTES ────────────────────────────
 
 def salvar_cliente(nome, endereco="", telefone="", documento=""):
@@ -99,6 +201,7 @@ def salvar_cliente(nome, endereco="", telefone="", documento=""):
             (nome.strip(), endereco.strip(), telefone.strip(), documento.strip())
         )
         conn.commit()
+        _notificar("clientes")
         return cursor.lastrowid
     except sqlite3.Error as e:
         print(f"[ERRO DB] Falha ao salvar cliente: {e}")
@@ -107,14 +210,14 @@ def salvar_cliente(nome, endereco="", telefone="", documento=""):
         conn.close()
 
 
-def buscar_clientes(query):
+def buscar_clientes(query, limite=20):
     conn = get_connection()
     try:
         cursor = conn.cursor()
         like = f"%{query.strip()}%"
         cursor.execute(
-            "SELECT * FROM clientes WHERE nome LIKE ? OR telefone LIKE ? ORDER BY nome LIMIT 20",
-            (like, like)
+            "SELECT * FROM clientes WHERE nome LIKE ? OR telefone LIKE ? ORDER BY nome LIMIT ?",
+            (like, like, limite)
         )
         return [dict(row) for row in cursor.fetchall()]
     except sqlite3.Error as e:
@@ -151,6 +254,41 @@ def listar_todos_clientes():
         conn.close()
 
 
+# Colunas aceitas em ORDER BY nas consultas paginadas (nome na tela -> SQL)
+ORDENACAO_CLIENTES = {"nome": "nome", "telefone": "telefone", "documento": "documento",
+                      "endereco": "endereco", "data_cadastro": "data_cadastro"}
+
+
+def contar_clientes():
+    conn = get_connection()
+    try:
+        return conn.execute("SELECT COUNT(*) FROM clientes").fetchone()[0]
+    except sqlite3.Error as e:
+        print(f"[ERRO DB] Falha ao contar clientes: {e}")
+        return 0
+    finally:
+        conn.close()
+
+
+def listar_clientes_pagina(offset, limite, ordenar_por="nome", decrescente=False):
+    """Uma página de clientes na ordem pedida (para tabelas virtualizadas)."""
+    coluna = ORDENACAO_CLIENTES.get(ordenar_por, "nome")
+    direcao = "DESC" if decrescente else "ASC"
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT * FROM clientes ORDER BY {coluna} {direcao}, id {direcao} LIMIT ? OFFSET ?",
+            (limite, offset)
+        )
+        return [dict(row) for row in cursor.fetchall()]
+    except sqlite3.Error as e:
+        print(f"[ERRO DB] Falha ao listar clientes: {e}")
+        return []
+    finally:
+        conn.close()
+
+
 def atualizar_cliente(cliente_id, nome, endereco, telefone, documento):
     conn = get_connection()
     try:
@@ -159,6 +297,7 @@ def atualizar_cliente(cliente_id, nome, endereco, telefone, documento):
             (nome.strip(), endereco.strip(), telefone.strip(), documento.strip(), cliente_id)
         )
         conn.commit()
+        _notificar("clientes")
         return True
     except sqlite3.Error as e:
         print(f"[ERRO DB] Falha ao atualizar cliente: {e}")
@@ -209,6 +348,7 @@ def salvar_servico(ra, cliente_id, aparelho="", marca="", modelo="",
              desconto, valor_final, forma_pagamento.strip(), observacoes.strip())
         )
         conn.commit()
+        _notificar("servicos")
         return True
     except sqlite3.Error as e:
         print(f"[ERRO DB] Falha ao salvar serviço: {e}")
@@ -238,6 +378,91 @@ def obter_servico(ra):
         conn.close()
 
 
+def obter_servicos_lote(ras):
+    """Retorna {ra: servico} (mesmo formato de obter_servico) para vários RAs."""
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        resultado = {}
+        ras = list(ras)
+        # Lotes de 500 para ficar abaixo do limite de parâmetros do SQLite
+        for i in range(0, len(ras), 500):
+            lote = ras[i:i + 500]
+            marcas = ", ".join("?" for _ in lote)
+            cursor.execute(
+                f"""SELECT s.*, c.nome AS cliente_nome, c.endereco AS cliente_endereco,
+                           c.telefone AS cliente_telefone, c.documento AS cliente_documento
+                    FROM servicos s
+                    JOIN clientes c ON s.cliente_id = c.id
+                    WHERE s.ra IN ({marcas})""",
+                lote
+            )
+            for row in cursor.fetchall():
+                resultado[row["ra"]] = dict(row)
+        return resultado
+    except sqlite3.Error as e:
+        print(f"[ERRO DB] Falha ao obter serviços em lote: {e}")
+        return {}
+    finally:
+        conn.close()
+
+
+def listar_ras(data_inicio=None, data_fim=None, status=None):
+    """RAs filtrados por período de entrada (YYYY-MM-DD, inclusivo) e/ou status."""
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        condicoes, params = [], []
+        if data_inicio:
+            condicoes.append("data_entrada >= ?")
+            params.append(data_inicio)
+        if data_fim:
+            condicoes.append("data_entrada <= ?")
+            params.append(data_fim)
+        if status:
+            condicoes.append("status = ?")
+            params.append(status)
+        where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+        cursor.execute(f"SELECT ra FROM servicos {where} ORDER BY ra", params)
+        return [row["ra"] for row in cursor.fetchall()]
+    except sqlite3.Error as e:
+        print(f"[ERRO DB] Falha ao listar RAs: {e}")
+        return []
+    finally:
+        conn.close()
+
+
+def iterar_servicos_periodo(data_inicio=None, data_fim=None, lote=500, status=None, busca=None):
+    """
+    Gera as OS do período (YYYY-MM-DD, inclusivo) em ordem de data_entrada,
+    buscando `lote` linhas por vez: a memória não cresce com o período.
+    status/busca filtram como na tela Buscar OS.
+    """
+    where, params = _filtro_servicos(status, busca, data_inicio, data_fim)
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"""SELECT s.ra, s.data_entrada, c.nome AS cliente_nome, s.aparelho, s.status,
+                       s.valor_total, s.desconto, s.valor_final, s.forma_pagamento
+                FROM servicos s
+                JOIN clientes c ON s.cliente_id = c.id
+                {where}
+                ORDER BY s.data_entrada, s.ra""",
+            params
+        )
+        while True:
+            linhas = cursor.fetchmany(lote)
+            if not linhas:
+                break
+            for row in linhas:
+                yield dict(row)
+    except sqlite3.Error as e:
+        print(f"[ERRO DB] Falha ao percorrer serviços: {e}")
+    finally:
+        conn.close()
+
+
 def listar_servicos(status=None):
     conn = get_connection()
     try:
@@ -270,6 +495,70 @@ def listar_servicos(status=None):
         conn.close()
 
 
+ORDENACAO_SERVICOS = {"ra": "s.ra", "cliente_nome": "c.nome", "aparelho": "s.aparelho", "status": "s.status",
+                      "valor_final": "s.valor_final", "forma_pagamento": "s.forma_pagamento",
+                      "data_entrada": "s.data_entrada"}
+
+
+def _filtro_servicos(status=None, busca=None, data_inicio=None, data_fim=None):
+    condicoes, params = [], []
+    if data_inicio:
+        condicoes.append("s.data_entrada >= ?")
+        params.append(data_inicio)
+    if data_fim:
+        condicoes.append("s.data_entrada <= ?")
+        params.append(data_fim)
+    if status:
+        condicoes.append("s.status = ?")
+        params.append(status)
+    if busca:
+        like = f"%{busca.strip()}%"
+        condicoes.append("(s.ra LIKE ? OR c.nome LIKE ?)")
+        params += [like, like]
+    return (f"WHERE {' AND '.join(condicoes)}" if condicoes else ""), params
+
+
+def contar_servicos(status=None, busca=None):
+    where, params = _filtro_servicos(status, busca)
+    conn = get_connection()
+    try:
+        return conn.execute(
+            f"SELECT COUNT(*) FROM servicos s JOIN clientes c ON s.cliente_id = c.id {where}", params
+        ).fetchone()[0]
+    except sqlite3.Error as e:
+        print(f"[ERRO DB] Falha ao contar serviços: {e}")
+        return 0
+    finally:
+        conn.close()
+
+
+def listar_servicos_pagina(offset, limite, ordenar_por="data_entrada", decrescente=True, status=None, busca=None):
+    """Uma página de OS (mesmas colunas de listar_servicos), com filtro opcional."""
+    coluna = ORDENACAO_SERVICOS.get(ordenar_por, "s.data_entrada")
+    direcao = "DESC" if decrescente else "ASC"
+    where, params = _filtro_servicos(status, busca)
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"""SELECT s.ra, c.nome AS cliente_nome, s.aparelho, s.marca, s.status,
+                       s.valor_total, s.desconto, s.valor_final, s.forma_pagamento,
+                       s.data_entrada
+                FROM servicos s
+                JOIN clientes c ON s.cliente_id = c.id
+                {where}
+                ORDER BY {coluna} {direcao}, s.ra {direcao}
+                LIMIT ? OFFSET ?""",
+            (*params, limite, offset)
+        )
+        return [dict(row) for row in cursor.fetchall()]
+    except sqlite3.Error as e:
+        print(f"[ERRO DB] Falha ao listar serviços: {e}")
+        return []
+    finally:
+        conn.close()
+
+
 def buscar_servicos(query):
     conn = get_connection()
     try:
@@ -308,6 +597,7 @@ def atualizar_status(ra, novo_status):
                 (novo_status, ra)
             )
         conn.commit()
+        _notificar("servicos")
         return True
     except sqlite3.Error as e:
         print(f"[ERRO DB] Falha ao atualizar status: {e}")
@@ -329,6 +619,7 @@ def atualizar_servico(ra, servico_realizado="", valor_total=0.0,
              forma_pagamento.strip(), observacoes.strip(), ra)
         )
         conn.commit()
+        _notificar("servicos")
         return True
     except sqlite3.Error as e:
         print(f"[ERRO DB] Falha ao atualizar serviço: {e}")
@@ -347,6 +638,7 @@ def adicionar_peca(servico_ra, descricao, valor_unitario=0.0):
             (servico_ra, descricao.strip(), valor_unitario)
         )
         conn.commit()
+        _notificar("pecas")
         return True
     except sqlite3.Error as e:
         print(f"[ERRO DB] Falha ao adicionar peça: {e}")
@@ -371,11 +663,36 @@ def listar_pecas(servico_ra):
         conn.close()
 
 
+def listar_pecas_lote(ras):
+    """Retorna {ra: [pecas]} para vários RAs (RAs sem peças ficam com lista vazia)."""
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        ras = list(ras)
+        resultado = {ra: [] for ra in ras}
+        for i in range(0, len(ras), 500):
+            lote = ras[i:i + 500]
+            marcas = ", ".join("?" for _ in lote)
+            cursor.execute(
+                f"SELECT * FROM pecas WHERE servico_ra IN ({marcas}) ORDER BY id",
+                lote
+            )
+            for row in cursor.fetchall():
+                resultado[row["servico_ra"]].append(dict(row))
+        return resultado
+    except sqlite3.Error as e:
+        print(f"[ERRO DB] Falha ao listar peças em lote: {e}")
+        return {}
+    finally:
+        conn.close()
+
+
 def remover_peca(peca_id):
     conn = get_connection()
     try:
         conn.execute("DELETE FROM pecas WHERE id = ?", (peca_id,))
         conn.commit()
+        _notificar("pecas")
         return True
     except sqlite3.Error as e:
         print(f"[ERRO DB] Falha ao remover peça: {e}")
@@ -507,64 +824,174 @@ def faturamento_ultimos_meses(n=6):
 import shutil
 import zipfile
 import csv
+import json
+import hashlib
+import tempfile
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-
-def exportar_dados(destino_zip):
-    """Exporta banco, config e PDFs para um arquivo ZIP."""
-    try:
-        with zipfile.ZipFile(destino_zip, 'w', zipfile.ZIP_DEFLATED) as zf:
-            # Banco de dados
-            if os.path.exists(DB_PATH):
-                zf.write(DB_PATH, "oficina.db")
-            # Config
-            config_path = os.path.join(BASE_DIR, "config.json")
-            if os.path.exists(config_path):
-                zf.write(config_path, "config.json")
-            # PDFs
-            pdf_dir = os.path.join(BASE_DIR, "PDFs")
-            if os.path.exists(pdf_dir):
-                for f in os.listdir(pdf_dir):
-                    fp = os.path.join(pdf_dir, f)
-                    if os.path.isfile(fp):
-                        zf.write(fp, f"PDFs/{f}")
-            # Backups
-            bkp_dir = os.path.join(BASE_DIR, "Backups")
-            if os.path.exists(bkp_dir):
-                for f in os.listdir(bkp_dir):
-                    fp = os.path.join(bkp_dir, f)
-                    if os.path.isfile(fp):
-                        zf.write(fp, f"Backups/{f}")
+# Exportação: extensões já comprimidas vão sem deflate (ZIP_STORED)
+EXTENSOES_SEM_COMPRESSAO = {".pdf", ".pack", ".db", ".z", ".zip", ".png", ".jpg", ".jpeg"}
+MANIFESTO_EXPORTACAO = "manifesto.json"
+BLOCO_COPIA = 1024 * 1024
+
+
+def _arquivos_para_exportar():
+    """Lista (caminho, nome_no_zip) de config, PDFs e Backups (recursivo)."""
+    arquivos = []
+    config_path = os.path.join(BASE_DIR, "config.json")
+    if os.path.exists(config_path):
+        arquivos.append((config_path, "config.json"))
+    for pasta in ("PDFs", "Backups"):
+        raiz = os.path.join(BASE_DIR, pasta)
+        for dirpath, _, nomes in os.walk(raiz):
+            for nome in nomes:
+                if nome.endswith(".tmp"):
+                    continue
+                fp = os.path.join(dirpath, nome)
+                rel = os.path.relpath(fp, BASE_DIR).replace(os.sep, "/")
+                arquivos.append((fp, rel))
+    return arquivos
+
+
+def _hash_arquivo(caminho):
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(BLOCO_COPIA), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _ler_manifesto_zip(zip_path):
+    with zipfile.ZipFile(zip_path, "r") as zf:
+        if MANIFESTO_EXPORTACAO not in zf.namelist():
+            return None
+        return json.loads(zf.read(MANIFESTO_EXPORTACAO).decode("utf-8"))
+
+
+def _gravar_no_zip(zf, caminho, arcname):
+    """Copia o arquivo para o ZIP em blocos, sem deflate para conteúdo já comprimido."""
+    ext = os.path.splitext(arcname)[1].lower()
+    info = zipfile.ZipInfo.from_file(caminho, arcname)
+    info.compress_type = zipfile.ZIP_STORED if ext in EXTENSOES_SEM_COMPRESSAO else zipfile.ZIP_DEFLATED
+    with open(caminho, "rb") as src, zf.open(info, "w") as dst:
+        shutil.copyfileobj(src, dst, BLOCO_COPIA)
+
+
+def exportar_dados(destino_zip, base_zip=None):
+    """
+    Exporta banco, config, PDFs e Backups para um arquivo ZIP.
+    Grava manifesto.json com hash e tamanho de cada arquivo. Com base_zip,
+    a exportação é incremental: só entram os arquivos que mudaram desde a
+    exportação base (a restauração aplica a base antes, ver importar_dados).
+    """
+    snapshot = None
+    try:
+        base = {}
+        if base_zip:
+            manifesto_base = _ler_manifesto_zip(base_zip)
+            if manifesto_base is None:
+                print(f"[ERRO] Exportacao base sem manifesto: {base_zip}")
+                return False
+            base = manifesto_base["arquivos"]
+
+        arquivos = _arquivos_para_exportar()
+        # Banco de dados: cópia consistente via API de backup do SQLite
+        if os.path.exists(DB_PATH):
+            fd, snapshot = tempfile.mkstemp(suffix=".db")
+            os.close(fd)
+            src = sqlite3.connect(DB_PATH)
+            dst = sqlite3.connect(snapshot)
+            try:
+                src.backup(dst)
+            finally:
+                dst.close()
+                src.close()
+            arquivos.insert(0, (snapshot, "oficina.db"))
+
+        manifesto = {
+            "criado_em": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "base": os.path.basename(base_zip) if base_zip else None,
+            "arquivos": {},
+        }
+        gravados = 0
+        with zipfile.ZipFile(destino_zip, 'w', zipfile.ZIP_DEFLATED, allowZip64=True) as zf:
+            for caminho, arcname in arquivos:
+                st = os.stat(caminho)
+                anterior = base.get(arcname)
+                # Mesmo tamanho e mtime da base: reaproveita o hash sem reler o arquivo
+                if (anterior and arcname != "oficina.db"
+                        and anterior["tamanho"] == st.st_size and anterior["mtime"] == int(st.st_mtime)):
+                    h = anterior["sha256"]
+                else:
+                    h = _hash_arquivo(caminho)
+                manifesto["arquivos"][arcname] = {
+                    "sha256": h, "tamanho": st.st_size, "mtime": int(st.st_mtime),
+                }
+                if anterior and anterior["sha256"] == h:
+                    continue
+                _gravar_no_zip(zf, caminho, arcname)
+                gravados += 1
+            zf.writestr(MANIFESTO_EXPORTACAO, json.dumps(manifesto, ensure_ascii=False))
+        print(f"[EXPORTAR] {gravados} de {len(arquivos)} arquivos gravados em {destino_zip}")
         return True
     except Exception as e:
         print(f"[ERRO] Exportacao falhou: {e}")
         return False
+    finally:
+        if snapshot and os.path.exists(snapshot):
+            os.remove(snapshot)
 
 
 def importar_dados(zip_path):
-    """Importa dados de um ZIP previamente exportado. Sobrescreve o banco atual."""
-    try:
-        with zipfile.ZipFile(zip_path, 'r') as zf:
-            nomes = zf.namelist()
-            # Restaura banco
-            if "oficina.db" in nomes:
-                zf.extract("oficina.db", BASE_DIR)
-            # Restaura config
-            if "config.json" in nomes:
-                zf.extract("config.json", BASE_DIR)
-            # Restaura PDFs
-            for n in nomes:
-                if n.startswith("PDFs/"):
-                    zf.extract(n, BASE_DIR)
-                elif n.startswith("Backups/"):
-                    zf.extract(n, BASE_DIR)
+    """
+    Importa dados de um ZIP previamente exportado. Sobrescreve o banco atual.
+    Se o ZIP for incremental, a exportação base (mesma pasta) é importada antes.
+    """
+    try:
+        manifesto = _ler_manifesto_zip(zip_path)
+        # Só volta o que existia na exportação mais recente: arquivo apagado
+        # depois da base (ex.: PDF que foi para um pacote) não reaparece
+        manter = set(manifesto["arquivos"]) if manifesto else None
+        restaurados = _importar_cadeia(zip_path, manifesto, manter)
+        if restaurados is None:
+            return False
+        if "oficina.db" in restaurados:
+            _notificar(None)
         return True
     except Exception as e:
         print(f"[ERRO] Importacao falhou: {e}")
         return False
 
 
+def _importar_cadeia(zip_path, manifesto, manter):
+    """
+    Extrai a base (recursivamente) e depois o próprio ZIP, só os nomes em
+    `manter` (None = todos, ZIP sem manifesto). Retorna os nomes extraídos
+    ou None se faltar uma exportação base.
+    """
+    extraidos = set()
+    if manifesto and manifesto.get("base"):
+        base_path = os.path.join(os.path.dirname(os.path.abspath(zip_path)), manifesto["base"])
+        if not os.path.exists(base_path):
+            print(f"[ERRO] Exportacao base nao encontrada: {base_path}")
+            return None
+        da_base = _importar_cadeia(base_path, _ler_manifesto_zip(base_path), manter)
+        if da_base is None:
+            return None
+        extraidos |= da_base
+    with zipfile.ZipFile(zip_path, 'r') as zf:
+        for n in zf.namelist():
+            # Banco, config, PDFs e Backups
+            if n not in ("oficina.db", "config.json") and not n.startswith(("PDFs/", "Backups/")):
+                continue
+            if manter is None or n in manter:
+                zf.extract(n, BASE_DIR)
+                extraidos.add(n)
+    return extraidos
+
+
+@perfil.perfilar()
 def importar_clientes_csv(csv_path, encoding="utf-8"):
     """
     Importa clientes de um CSV.
@@ -623,6 +1050,8 @@ def importar_clientes_csv(csv_path, encoding="utf-8"):
                     erros += 1
 
         conn.commit()
+        if importados:
+            _notificar("clientes")
     except Exception as e:
         print(f"[ERRO] Importacao CSV falhou: {e}")
         erros += 1
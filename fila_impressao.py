@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+fila_impressao.py — Fila de impressão em segundo plano
+Sistema Oficina 2026
+
+Os PDFs são renderizados em memória por uma thread de trabalho, para que a
+janela não congele. Pedidos repetidos para o mesmo RA enquanto ele ainda está
+na fila viram um só. Quando o PDF fica pronto ele é aberto no visualizador
+ou enviado à impressora, e os callbacks rodam na thread do Tk via after().
+"""
+
+import queue
+import threading
+
+# Ações possíveis depois de gerar o PDF
+ABRIR = "abrir"
+IMPRIMIR = "imprimir"
+SALVAR = "salvar"
+
+INTERVALO_DESPACHO_MS = 100
+
+
+class FilaImpressao:
+    """Fila de PDFs de OS ligada a uma janela Tk (qualquer widget com after())."""
+
+    def __init__(self, janela):
+        self.janela = janela
+        self._pedidos = queue.Queue()
+        self._resultados = queue.Queue()
+        self._pendentes = {}  # ra -> {"acoes": set, "callbacks": list}
+        self._em_execucao = 0  # pedidos já retirados de _pendentes cujo resultado ainda não está na fila
+        self._lock = threading.Lock()
+        self._despachando = False
+        self._thread = threading.Thread(target=self._trabalhar, name="fila-impressao", daemon=True)
+        self._thread.start()
+
+    def solicitar(self, ra, acao=ABRIR, ao_concluir=None):
+        """
+        Pede o PDF do RA. ao_concluir(ra, caminho) é chamado na thread do Tk
+        (caminho None se falhou). Retorna False se o pedido foi agrupado com
+        um que já estava na fila.
+        """
+        with self._lock:
+            pendente = self._pendentes.get(ra)
+            novo = pendente is None
+            if novo:
+                pendente = self._pendentes[ra] = {"acoes": set(), "callbacks": []}
+            pendente["acoes"].add(acao)
+            if ao_concluir:
+                pendente["callbacks"].append(ao_concluir)
+        if novo:
+            self._pedidos.put(ra)
+        self._agendar_despacho()
+        return novo
+
+    def executar(self, tarefa):
+        """
+        Roda `tarefa()` na thread da fila, entre dois PDFs. Usado para manutenção
+        de PDFs/ (ex.: compactação) sem disputar arquivos com a impressão.
+        """
+        self._pedidos.put(tarefa)
+
+    def ocupada(self):
+        with self._lock:
+            return bool(self._pendentes) or self._em_execucao > 0
+
+    def encerrar(self, timeout=10):
+        """Para a thread depois dos pedidos já na fila. Retorna True se terminou."""
+        self._pedidos.put(None)
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def _trabalhar(self):
+        while True:
+            ra = self._pedidos.get()
+            if ra is None:
+                return
+            if callable(ra):
+                try:
+                    ra()
+                except Exception as e:
+                    print(f"[FILA] Erro em tarefa de manutencao: {e}")
+                continue
+            # Retira o pedido antes de renderizar: um clique durante a geração
+            # entra como pedido novo e enxerga os dados mais recentes
+            with self._lock:
+                pendente = self._pendentes.pop(ra, {"acoes": set(), "callbacks": []})
+                self._em_execucao += 1
+            caminho = None
+            try:
+                # Import tardio: o reportlab só é carregado no primeiro PDF, nesta thread
+                import print_engine
+                caminho = print_engine.preparar_pdf_ra(ra)
+                if caminho and IMPRIMIR in pendente["acoes"]:
+                    print_engine.imprimir_pdf(caminho)
+                if caminho and ABRIR in pendente["acoes"]:
+                    print_engine._abrir_pdf(caminho)
+            except Exception as e:
+                print(f"[FILA] Erro ao gerar PDF da OS {ra}: {e}")
+                caminho = None
+            # Resultado na fila antes de deixar de contar como em execução:
+            # o despacho nunca vê "nada ocupado e nada a entregar" no meio do caminho
+            self._resultados.put((ra, caminho, pendente["callbacks"]))
+            with self._lock:
+                self._em_execucao -= 1
+
+    def _agendar_despacho(self):
+        if not self._despachando:
+            self._despachando = True
+            self.janela.after(INTERVALO_DESPACHO_MS, self._despachar)
+
+    def _despachar(self):
+        """Roda na thread do Tk: entrega resultados e só continua enquanto houver trabalho."""
+        while True:
+            try:
+                ra, caminho, callbacks = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+            for cb in callbacks:
+                try:
+                    cb(ra, caminho)
+                except Exception as e:
+                    print(f"[FILA] Erro no retorno da OS {ra}: {e}")
+        self._despachando = False
+        if self.ocupada() or not self._resultados.empty():
+            self._agendar_despacho()
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+historico.py — Consulta de registros antigos direto dos backups ("time travel")
+Sistema Oficina 2026
+
+Abre um backup somente-leitura (URI mode=ro&immutable=1) e busca uma OS ou
+um cliente como estava naquela data, sem restaurar nada e sem tocar no
+oficina.db. Fontes aceitas:
+    "YYYY-MM-DD"          backup diário do repositório deduplicado
+    caminho/para/x.db     cópia completa (formato antigo de Backups/)
+    caminho/para/x.zip    exportação feita por database.exportar_dados
+
+Uso:
+    python historico.py 2026-10-01 2026001            (OS pelo RA)
+    python historico.py 2026-10-01 --cliente 42       (cliente pelo id)
+"""
+
+import os
+import sys
+import shutil
+import hashlib
+import sqlite3
+import pathlib
+import tempfile
+import zipfile
+import threading
+
+import backup
+import database
+
+# Conexões abertas por fonte (reaproveitadas entre consultas)
+_conexoes = {}
+_cache_dir = None
+# As comparações rodam no pool de tarefas da interface: uma fonte só é
+# materializada/aberta uma vez mesmo com dois pedidos ao mesmo tempo
+_lock = threading.Lock()
+
+CAMPOS_IGNORADOS_DIFF = {"data_cadastro"}
+
+
+class FonteIndisponivel(Exception):
+    """Backup/cópia/exportação que não existe ou não pôde ser lida."""
+
+
+def _pasta_cache():
+    global _cache_dir
+    if _cache_dir is None:
+        _cache_dir = tempfile.mkdtemp(prefix="oficina_historico_")
+    return _cache_dir
+
+
+def _materializar(fonte):
+    """Retorna o caminho de um arquivo .db que representa a fonte."""
+    if fonte.lower().endswith(".db"):
+        return fonte
+    if fonte.lower().endswith(".zip"):
+        destino = os.path.join(_pasta_cache(), f"zip_{hashlib.sha1(os.path.abspath(fonte).encode()).hexdigest()[:16]}.db")
+        if not os.path.exists(destino):
+            tmp = destino + ".tmp"
+            with zipfile.ZipFile(fonte, "r") as zf, zf.open("oficina.db") as src, open(tmp, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            os.replace(tmp, destino)
+        return destino
+    # Data de um backup do repositório deduplicado
+    destino = os.path.join(_pasta_cache(), f"oficina_{fonte}.db")
+    if not os.path.exists(destino) and not backup.restaurar_backup(fonte, destino):
+        raise FileNotFoundError(f"backup de {fonte} indisponível")
+    return destino
+
+
+def abrir(fonte):
+    """Conexão somente-leitura (cacheada) para a fonte. FonteIndisponivel se não abrir."""
+    with _lock:
+        conn = _conexoes.get(fonte)
+        if conn is None:
+            try:
+                caminho = _materializar(fonte)
+                uri = pathlib.Path(os.path.abspath(caminho)).as_uri() + "?mode=ro&immutable=1"
+                conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+                conn.row_factory = sqlite3.Row
+            except (sqlite3.Error, OSError, KeyError, zipfile.BadZipFile) as e:
+                raise FonteIndisponivel(f"{fonte}: {e}") from e
+            _conexoes[fonte] = conn
+        return conn
+
+
+def fechar_tudo():
+    """Fecha as conexões abertas e apaga os bancos materializados."""
+    global _cache_dir
+    with _lock:
+        for conn in _conexoes.values():
+            conn.close()
+        _conexoes.clear()
+        if _cache_dir:
+            shutil.rmtree(_cache_dir, ignore_errors=True)
+            _cache_dir = None
+
+
+def obter_servico_em(fonte, ra):
+    """
+    OS `ra` (com peças em 'pecas') como estava na fonte, ou None se ela não
+    existia lá. FonteIndisponivel se a fonte não puder ser lida.
+    """
+    conn = abrir(fonte)
+    try:
+        row = conn.execute(
+            """SELECT s.*, c.nome AS cliente_nome, c.endereco AS cliente_endereco,
+                      c.telefone AS cliente_telefone, c.documento AS cliente_documento
+               FROM servicos s
+               JOIN clientes c ON s.cliente_id = c.id
+               WHERE s.ra = ?""",
+            (ra,)
+        ).fetchone()
+        if not row:
+            return None
+        servico = dict(row)
+        servico["pecas"] = [dict(r) for r in conn.execute(
+            "SELECT * FROM pecas WHERE servico_ra = ? ORDER BY id", (ra,)
+        ).fetchall()]
+        return servico
+    except sqlite3.Error as e:
+        raise FonteIndisponivel(f"{fonte}: {e}") from e
+
+
+def obter_cliente_em(fonte, cliente_id):
+    """Cliente como estava na fonte, ou None se não existia lá. FonteIndisponivel se não ler."""
+    conn = abrir(fonte)
+    try:
+        row = conn.execute("SELECT * FROM clientes WHERE id = ?", (cliente_id,)).fetchone()
+    except sqlite3.Error as e:
+        raise FonteIndisponivel(f"{fonte}: {e}") from e
+    return dict(row) if row else None
+
+
+def diferencas(antigo, atual):
+    """Lista (campo, valor_antigo, valor_atual) dos campos que mudaram."""
+    antigo = antigo or {}
+    atual = atual or {}
+    difs = []
+    for campo in sorted(set(antigo) | set(atual)):
+        if campo in CAMPOS_IGNORADOS_DIFF:
+            continue
+        a, b = antigo.get(campo), atual.get(campo)
+        if campo == "pecas":
+            a = [(p.get("descricao"), p.get("valor_unitario")) for p in a or []]
+            b = [(p.get("descricao"), p.get("valor_unitario")) for p in b or []]
+        if a != b:
+            difs.append((campo, a, b))
+    return difs
+
+
+def comparar_servico(fonte, ra):
+    """Diferenças entre a OS na fonte e a OS atual no oficina.db."""
+    antigo = obter_servico_em(fonte, ra)
+    atual = database.obter_servico(ra)
+    if atual is not None:
+        atual["pecas"] = database.listar_pecas(ra)
+    return diferencas(antigo, atual)
+
+
+def comparar_cliente(fonte, cliente_id):
+    """Diferenças entre o cliente na fonte e o cliente atual no oficina.db."""
+    return diferencas(obter_cliente_em(fonte, cliente_id), database.obter_cliente(cliente_id))
+
+
+def main():
+    """Ponto de entrada CLI."""
+    args = sys.argv[1:]
+    if len(args) == 3 and args[1] == "--cliente" and args[2].isdigit():
+        fonte, rotulo = args[0], f"Cliente {args[2]}"
+        comparar = lambda: comparar_cliente(fonte, int(args[2]))
+    elif len(args) == 2:
+        fonte, rotulo = args[0], f"OS {args[1]}"
+        comparar = lambda: comparar_servico(fonte, args[1])
+    else:
+        print("Uso: python historico.py <YYYY-MM-DD | backup.db | exportacao.zip> <RA | --cliente ID>")
+        return
+    try:
+        difs = comparar()
+        if not difs:
+            print(f"{rotulo}: sem diferenças entre {fonte} e hoje.")
+        for campo, antes, depois in difs:
+            print(f"  {campo}: {antes!r} -> {depois!r}")
+    except FonteIndisponivel as e:
+        print(f"[HISTORICO] Fonte indisponível: {e}")
+    finally:
+        fechar_tudo()
+
+
+if __name__ == "__main__":
+    main()
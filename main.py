@@ -4,17 +4,34 @@ main.py — Interface Principal (CustomTkinter)
 Sistema Oficina 2026 — Tema Azul + Amarelo
 """
 
+import time
+_INICIO = time.perf_counter()  # antes dos imports pesados: base do relatório de abertura
+
 import customtkinter as ctk
 from tkinter import messagebox, StringVar, END
 import database
 import backup
-import print_engine
+import historico
+import tarefas
+import fila_impressao
+import busca_incremental
+import monitor_dados
+import tempos_inicio
+import vigia_loop
+import perfil
+from tabela_virtual import TabelaVirtual, FonteLista, FonteConsulta
 from datetime import datetime
+import calendar
 import json
 import os
+import sys
 from theme import *
 
 CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json")
+MAX_SUGESTOES = 8
+ULTIMAS_OS = 15
+# Telas atualizadas sozinhas quando outra estação (ou tarefa) grava no banco
+PAGINAS_AO_VIVO = ("Dashboard", "Buscar OS", "Clientes", "Financeiro")
 
 def carregar_config():
     defaults = {"nome": "ELETRONICA EXEMPLO", "endereco": "Rua Exemplo, 123", "telefone": "(00) 0000-0000", "cnpj": "00.000.000/0001-00"}
@@ -30,36 +47,109 @@ def salvar_config(dados):
     try:
         with open(CONFIG_PATH, "w", encoding="utf-8") as f:
             json.dump(dados, f, ensure_ascii=False, indent=2)
-        print_engine.EMPRESA.update(dados)
+        # print_engine só é importado na primeira impressão e lê o config.json nessa hora
+        motor = sys.modules.get("print_engine")
+        if motor:
+            motor.EMPRESA.update(dados)
         return True
     except Exception:
         return False
 
+def _compactar_pdfs():
+    import print_engine
+    print_engine.compactar_pdfs()
+
+# Consultas das tabelas, rodadas no pool de tarefas. O tempo de abrir as telas
+# com dados está nelas (os mostrar_* só trocam a página e agendam a carga),
+# então é aqui que o perfilamento fica.
+_contar_servicos = perfil.perfilar("carga_os_contar")(database.contar_servicos)
+_pagina_servicos = perfil.perfilar("carga_os_pagina")(database.listar_servicos_pagina)
+_contar_clientes = perfil.perfilar("carga_clientes_contar")(database.contar_clientes)
+_pagina_clientes = perfil.perfilar("carga_clientes_pagina")(database.listar_clientes_pagina)
+
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
 
 
 class App(ctk.CTk):
-    def __init__(self):
+    def __init__(self, cronometro=None):
         super().__init__()
-        database.init_db()
-        backup.realizar_backup()
+        self.cronometro = cronometro
+        self._pronto = False
+        self._pagina_pedida = self.mostrar_dashboard  # exibida quando o banco estiver pronto
         self.title("Sistema Oficina 2026")
         self.geometry("1300x850")
         self.minsize(1024, 700)
         self.pagina_atual = None
+        self.paginas = {}              # nome -> frame construído uma vez, depois só escondido
+        self.pagina_temporaria = None  # detalhes da OS: recriada a cada abertura
+        self._atualizar_pagina = None  # atualizar() da tela visível (ver _exibir_pagina)
+        self.latencias_nav = {}        # nome -> [ms] da troca de tela até o Tk ficar ocioso
         self.cliente_selecionado_id = None
         self.pecas_temp = []
+        self.fila_impressao = fila_impressao.FilaImpressao(self)
+        self.tarefas = tarefas.Executor(self)
+        self.monitor = monitor_dados.MonitorDados(self)
+        self.monitor.assinar(self._dados_alterados, tabelas=("servicos", "clientes"))
+        cfg = carregar_config()
+        perfil.configurar(cfg.get("perfilar"))
+        try:
+            limite = int(cfg.get("limite_travamento_ms", vigia_loop.LIMITE_MS))
+        except (TypeError, ValueError):
+            limite = vigia_loop.LIMITE_MS
+        self.vigia = vigia_loop.VigiaLoop(self, tela=lambda: self.pagina_atual, limite_ms=limite)
+        self._busca_desde = None       # perf_counter da última tecla na busca de cliente
         self.grid_columnconfigure(1, weight=1)
         self.grid_rowconfigure(0, weight=1)
         self._criar_sidebar()
         self._criar_area_conteudo()
-        self.mostrar_dashboard()
+        self._aviso_inicio = ctk.CTkLabel(self.content, text="Carregando...", font=FONTE_SUBTITULO, text_color=COR_TEXTO_SEC)
+        self._aviso_inicio.pack(expand=True)
         self.bind("<F1>", lambda e: self._mostrar_ajuda())
         self.bind("<F2>", lambda e: self.mostrar_nova_os())
         self.bind("<F3>", lambda e: self.mostrar_buscar_os())
         self.bind("<F4>", lambda e: self.mostrar_clientes())
         self.bind("<F5>", lambda e: self.mostrar_dashboard())
+        self.protocol("WM_DELETE_WINDOW", self._encerrar)
+        self._marcar("janela")
+        # Primeiro a casca da janela aparece; banco, dashboard e backup vêm depois
+        self.after_idle(self._preparar_em_segundo_plano)
+
+    # ═══════════ ABERTURA ═══════════
+    def _marcar(self, evento):
+        if self.cronometro:
+            self.cronometro.marcar(evento)
+
+    def _preparar_em_segundo_plano(self):
+        self._marcar("primeiro desenho")
+
+        def preparar_banco():
+            inicio = time.perf_counter()
+            database.init_db()
+            return (time.perf_counter() - inicio) * 1000
+
+        self.tarefas.executar(preparar_banco, ao_concluir=self._banco_pronto)
+
+    def _banco_pronto(self, ms):
+        self._marcar("banco pronto")
+        if self.cronometro:
+            self.cronometro.medir("init_db", ms)
+        self._pronto = True
+        self._aviso_inicio.destroy()
+        self._pagina_pedida()
+        if self.pagina_atual != "Dashboard":
+            self._fim_abertura("primeira tela")
+        self.monitor.iniciar()
+        self.vigia.iniciar()
+        # Backup diário só depois que a janela já apareceu
+        self.after(1500, self._iniciar_backup)
+
+    def _fim_abertura(self, evento="dashboard com dados"):
+        """Primeira tela com dados: fecha o relatório de abertura."""
+        if self.cronometro and not self.cronometro.concluido:
+            self.cronometro.marcar(evento)
+            self.cronometro.concluir()
+            self.tarefas.executar(self.cronometro.gravar)
 
     # ═══════════ SIDEBAR ═══════════
     def _criar_sidebar(self):
@@ -97,6 +187,8 @@ class App(ctk.CTk):
             self.menu_buttons[texto] = btn
 
         ctk.CTkFrame(self.sidebar, fg_color="transparent").pack(fill="both", expand=True)
+        self.label_backup = ctk.CTkLabel(self.sidebar, text="Backup: aguardando", font=("Segoe UI", 10), text_color=COR_TEXTO_SEC, anchor="w")
+        self.label_backup.pack(fill="x", padx=14)
         ctk.CTkButton(self.sidebar, text="Sair", font=FONTE_MENU, fg_color=COR_VERMELHO, hover_color="#dc2626",
                       height=42, corner_radius=8, command=self._sair).pack(fill="x", padx=10, pady=(5, 15))
 
@@ -107,7 +199,43 @@ class App(ctk.CTk):
 
     def _sair(self):
         if messagebox.askyesno("Sair", "Deseja realmente sair?"):
-            self.destroy()
+            self._encerrar()
+
+    def _encerrar(self):
+        # Backup em andamento: pede cancelamento e espera a thread soltar os arquivos
+        if backup.estado_backup() == "executando":
+            self.label_backup.configure(text="Backup: cancelando...", text_color=COR_AMARELO)
+            self.update_idletasks()
+            backup.aguardar_backup(cancelar=True, timeout=10)
+        self.monitor.parar()
+        self.vigia.parar()
+        self.fila_impressao.encerrar(timeout=10)
+        self.tarefas.encerrar()
+        self._relatorio_navegacao()
+        historico.fechar_tudo()
+        self.destroy()
+
+    # ═══════════ BACKUP ═══════════
+    def _iniciar_backup(self):
+        backup.iniciar_backup_async()
+        self._acompanhar_backup()
+
+    def _acompanhar_backup(self):
+        textos = {
+            "executando": ("Backup: em andamento...", COR_AMARELO),
+            "ok": (f"Backup: OK ({datetime.now().strftime('%H:%M')})", COR_VERDE),
+            "ja_existe": ("Backup: feito hoje", COR_VERDE),
+            "cancelado": ("Backup: cancelado", COR_TEXTO_SEC),
+            "erro": ("Backup: FALHOU", COR_VERMELHO),
+        }
+        estado = backup.estado_backup()
+        texto, cor = textos.get(estado, ("Backup: aguardando", COR_TEXTO_SEC))
+        self.label_backup.configure(text=texto, text_color=cor)
+        if estado == "executando":
+            self.after(500, self._acompanhar_backup)
+        elif estado in ("ok", "ja_existe"):
+            # PDFs antigos vão para os pacotes mensais, na mesma fila da impressão
+            self.fila_impressao.executar(_compactar_pdfs)
 
     def _mostrar_ajuda(self):
         messagebox.showinfo("Atalhos", "F1 = Ajuda\nF2 = Nova OS\nF3 = Buscar OS\nF4 = Clientes\nF5 = Dashboard")
@@ -120,13 +248,66 @@ class App(ctk.CTk):
         self.content.grid_rowconfigure(0, weight=1)
 
     def _limpar(self):
-        for w in self.content.winfo_children():
-            w.destroy()
+        # Resultados de consultas da tela anterior não devem chegar numa tela escondida
+        self.tarefas.cancelar_grupo("tela")
+        if self.pagina_temporaria is not None:
+            self.pagina_temporaria.destroy()
+            self.pagina_temporaria = None
+        for pagina in self.paginas.values():
+            pagina.pack_forget()
+
+    def _exibir_pagina(self, nome, construir, atualizar):
+        """
+        Páginas do menu são construídas na primeira visita e depois só
+        escondidas e mostradas de novo; atualizar() relê os dados e mexe só
+        nos widgets que mudaram. construir() já carrega os dados da 1a vez.
+        """
+        if not self._pronto:
+            # Banco ainda sendo preparado: a última tela pedida abre em seguida
+            self._atualizar_menu_ativo(nome)
+            self._pagina_pedida = lambda: self._exibir_pagina(nome, construir, atualizar)
+            return
+        inicio = time.perf_counter()
+        self.vigia.acao("navegacao", nome)
+        self._limpar()
+        self._atualizar_menu_ativo(nome)
+        # A tela relê tudo agora; alterações anteriores já estão incluídas
+        self.monitor.descartar_pendentes()
+        pagina = self.paginas.get(nome)
+        if pagina is None:
+            pagina = self.paginas[nome] = construir()
+        else:
+            atualizar()
+        pagina.pack(fill="both", expand=True, padx=25, pady=15)
+        self.pagina_atual = nome
+        self._atualizar_pagina = atualizar
+        self.after_idle(lambda: self.latencias_nav.setdefault(nome, []).append((time.perf_counter() - inicio) * 1000))
+
+    def _dados_alterados(self, alteradas):
+        # Só a tela visível relê; as escondidas releem ao serem exibidas
+        if self.pagina_atual in PAGINAS_AO_VIVO:
+            self._atualizar_pagina()
+
+    def _relatorio_navegacao(self):
+        for nome, amostras in self.latencias_nav.items():
+            depois = sorted(amostras[1:])
+            resumo = f", depois mediana {depois[len(depois) // 2]:.0f} ms / max {depois[-1]:.0f} ms ({len(depois)}x)" if depois else ""
+            print(f"[NAV] {nome}: 1a exibicao {amostras[0]:.0f} ms{resumo}")
 
     def _titulo_pagina(self, frame, titulo, subtitulo=""):
+        """Retorna o label do subtítulo (para atualizar depois) ou None."""
         ctk.CTkLabel(frame, text=titulo, font=FONTE_TITULO, text_color=COR_AMARELO, anchor="w").pack(fill="x", pady=(0, 2))
         if subtitulo:
-            ctk.CTkLabel(frame, text=subtitulo, font=FONTE_PEQUENA, text_color=COR_TEXTO_SEC, anchor="w").pack(fill="x", pady=(0, 15))
+            lbl = ctk.CTkLabel(frame, text=subtitulo, font=FONTE_PEQUENA, text_color=COR_TEXTO_SEC, anchor="w")
+            lbl.pack(fill="x", pady=(0, 15))
+            return lbl
+        return None
+
+    @staticmethod
+    def _trocar_texto(lbl, texto):
+        # configure redesenha o CTkLabel mesmo com o mesmo texto
+        if lbl.cget("text") != texto:
+            lbl.configure(text=texto)
 
     def _secao(self, parent, titulo):
         ctk.CTkLabel(parent, text=titulo, font=FONTE_SUBTITULO, text_color=COR_AZUL, anchor="w").pack(fill="x", pady=(15, 6))
@@ -138,95 +319,114 @@ class App(ctk.CTk):
 
     # ═══════════ DASHBOARD ═══════════
     def mostrar_dashboard(self):
-        self._limpar()
-        self._atualizar_menu_ativo("Dashboard")
+        self._exibir_pagina("Dashboard", self._criar_dashboard, self._atualizar_dashboard)
+
+    def _criar_dashboard(self):
         f = ctk.CTkScrollableFrame(self.content, fg_color="transparent")
-        f.pack(fill="both", expand=True, padx=25, pady=15)
-        self._titulo_pagina(f, "Dashboard", f"Hoje: {datetime.now().strftime('%d/%m/%Y')}")
+        self.dash_subtitulo = self._titulo_pagina(f, "Dashboard", f"Hoje: {datetime.now().strftime('%d/%m/%Y')}")
 
         # Cards
         cards = ctk.CTkFrame(f, fg_color="transparent")
         cards.pack(fill="x", pady=5)
         cards.grid_columnconfigure((0, 1, 2, 3), weight=1)
 
-        pendentes = database.contar_pendentes()
-        prontos = database.contar_prontos()
-        contagens = database.contar_por_status()
-        aguardando = contagens.get("Aguardando Peça", 0)
-        resumo = database.resumo_financeiro_mes()
-
         dados_cards = [
-            ("Pendentes", str(pendentes), COR_AMARELO, "Em aberto"),
-            ("Prontos", str(prontos), COR_VERDE, "Para retirar"),
-            ("Aguardando", str(aguardando), COR_AZUL, "Falta peca"),
-            ("Faturado", f"R$ {resumo['faturado']:.0f}", COR_DESTAQUE, "Este mes"),
+            ("Pendentes", COR_AMARELO, "Em aberto"),
+            ("Prontos", COR_VERDE, "Para retirar"),
+            ("Aguardando", COR_AZUL, "Falta peca"),
+            ("Faturado", COR_DESTAQUE, "Este mes"),
         ]
-        for i, (t, v, cor, sub) in enumerate(dados_cards):
+        self.dash_valores = []
+        for i, (t, cor, sub) in enumerate(dados_cards):
             card = ctk.CTkFrame(cards, fg_color=COR_CARD, corner_radius=12, border_width=1, border_color=COR_BORDA, height=130)
             card.grid(row=0, column=i, padx=6, pady=5, sticky="nsew")
             card.grid_propagate(False)
             inner = ctk.CTkFrame(card, fg_color="transparent")
             inner.place(relx=0.5, rely=0.5, anchor="center")
-            ctk.CTkLabel(inner, text=v, font=FONTE_CARD_NUM, text_color=cor).pack()
+            lbl = ctk.CTkLabel(inner, text="...", font=FONTE_CARD_NUM, text_color=cor)
+            lbl.pack()
+            self.dash_valores.append(lbl)
             ctk.CTkLabel(inner, text=t, font=FONTE_NORMAL, text_color=COR_TEXTO).pack()
             ctk.CTkLabel(inner, text=sub, font=("Segoe UI", 10), text_color=COR_TEXTO_SEC).pack()
 
         # Tabela de OS recentes
         ctk.CTkLabel(f, text="Ultimas Ordens de Servico", font=FONTE_SUBTITULO, text_color=COR_AZUL, anchor="w").pack(fill="x", pady=(20, 8))
-        servicos = database.listar_servicos()[:15]
-        if servicos:
-            self._tabela_servicos(f, servicos)
-        else:
-            ctk.CTkLabel(f, text="Nenhuma OS cadastrada.", font=FONTE_NORMAL, text_color=COR_TEXTO_SEC).pack(pady=20)
-
-    def _tabela_servicos(self, parent, servicos, com_acoes=False):
-        header = ctk.CTkFrame(parent, fg_color=COR_SIDEBAR, corner_radius=8, height=38)
-        header.pack(fill="x", pady=(0, 2))
-        header.pack_propagate(False)
-        cols = [("RA", 0.1), ("Cliente", 0.2), ("Aparelho", 0.14), ("Status", 0.12), ("Valor", 0.1), ("Pgto", 0.1), ("Data", 0.1)]
+        self.dash_area = ctk.CTkFrame(f, fg_color="transparent")
+        self.dash_area.pack(fill="x")
+        self.dash_aguarde = ctk.CTkLabel(self.dash_area, text="Carregando...", font=FONTE_NORMAL, text_color=COR_TEXTO_SEC)
+        self.dash_aguarde.pack(pady=20)
+        self.dash_tabela = None
+        self.dash_servicos = None
+        self._atualizar_dashboard()
+        return f
+
+    def _atualizar_dashboard(self):
+        self._trocar_texto(self.dash_subtitulo, f"Hoje: {datetime.now().strftime('%d/%m/%Y')}")
+
+        def preencher(dados):
+            for lbl, texto in zip(self.dash_valores, dados["cards"]):
+                self._trocar_texto(lbl, texto)
+            if self.dash_tabela is None:
+                self.dash_aguarde.destroy()
+                self.dash_tabela = self._tabela_servicos(self.dash_area, FonteLista(dados["servicos"]), linhas_visiveis=ULTIMAS_OS)
+            elif dados["servicos"] != self.dash_servicos:
+                self.dash_tabela.atualizar(FonteLista(dados["servicos"]))
+            self.dash_servicos = dados["servicos"]
+            self._fim_abertura()
+
+        self.tarefas.executar(self._dados_dashboard, ao_concluir=preencher, grupo="tela")
+
+    @staticmethod
+    @perfil.perfilar("carga_dashboard")
+    def _dados_dashboard():
+        """Roda fora da thread do Tk: tudo que o dashboard consulta no banco."""
+        contagens = database.contar_por_status()
+        resumo = database.resumo_financeiro_mes()
+        return {
+            "cards": [str(database.contar_pendentes()), str(database.contar_prontos()),
+                      str(contagens.get("Aguardando Peça", 0)), f"R$ {resumo['faturado']:.0f}"],
+            "servicos": database.listar_servicos_pagina(0, ULTIMAS_OS),
+        }
+
+    def _tabela_servicos(self, parent, fonte, com_acoes=False, linhas_visiveis=None, assincrona=False):
+        cols = [("RA", "ra", 0.1), ("Cliente", "cliente_nome", 0.2), ("Aparelho", "aparelho", 0.14), ("Status", "status", 0.12),
+                ("Valor", "valor_final", 0.1), ("Pgto", "forma_pagamento", 0.1), ("Data", "data_entrada", 0.1)]
+        acoes = None
         if com_acoes:
-            cols.append(("Acoes", 0.14))
-        rx = 0.01
-        for text, w in cols:
-            ctk.CTkLabel(header, text=text, font=("Segoe UI", 11, "bold"), text_color=COR_AMARELO, anchor="w").place(relx=rx, rely=0.5, anchor="w", relwidth=w)
-            rx += w
-
-        for srv in servicos:
-            row = ctk.CTkFrame(parent, fg_color=COR_CARD, corner_radius=6, height=40)
-            row.pack(fill="x", pady=1)
-            row.pack_propagate(False)
-            st = srv.get("status", "")
-            st_cor = {"Aberto": COR_AMARELO, "Aguardando Peca": COR_AZUL, "Pronto": COR_VERDE, "Entregue": COR_TEXTO_SEC}.get(st, COR_TEXTO)
-            vf = srv.get("valor_final", 0) or srv.get("valor_total", 0) or 0
-            vals = [
-                (srv.get("ra", ""), COR_DESTAQUE), (srv.get("cliente_nome", ""), COR_TEXTO),
-                (srv.get("aparelho", ""), COR_TEXTO), (st, st_cor),
-                (f"R$ {vf:.2f}", COR_VERDE), (srv.get("forma_pagamento", "") or "-", COR_TEXTO_SEC),
-                (srv.get("data_entrada", ""), COR_TEXTO_SEC),
-            ]
-            rx = 0.01
-            for (_, w), (val, cor) in zip(cols[:7], vals):
-                ctk.CTkLabel(row, text=val, font=FONTE_PEQUENA, text_color=cor, anchor="w").place(relx=rx, rely=0.5, anchor="w", relwidth=w)
-                rx += w
-            if com_acoes:
-                af = ctk.CTkFrame(row, fg_color="transparent")
-                af.place(relx=rx, rely=0.5, anchor="w", relwidth=0.14, relheight=0.9)
-                ra = srv.get("ra", "")
-                ctk.CTkButton(af, text="Ver", width=40, height=26, font=("Segoe UI", 11), fg_color=COR_AZUL, hover_color=COR_AZUL_HOVER,
-                              command=lambda r=ra: self._abrir_detalhes_os(r)).pack(side="left", padx=2)
-                ctk.CTkButton(af, text="PDF", width=40, height=26, font=("Segoe UI", 11), fg_color=COR_SIDEBAR_HOVER, hover_color=COR_SIDEBAR,
-                              command=lambda r=ra: print_engine.gerar_pdf_ra(r)).pack(side="left", padx=2)
+            acoes = [("Ver", COR_AZUL, COR_AZUL_HOVER, lambda srv: self._abrir_detalhes_os(srv.get("ra", ""))),
+                     ("PDF", COR_SIDEBAR_HOVER, COR_SIDEBAR, lambda srv: self._imprimir_os(srv.get("ra", "")))]
+        tabela = TabelaVirtual(parent, cols, fonte, self._celulas_servico, acoes=acoes, ordenar_por="data_entrada", decrescente=True,
+                               linhas_visiveis=linhas_visiveis, mensagem_vazia="Nenhuma OS encontrada.",
+                               executor=self.tarefas if assincrona else None, grupo="tela")
+        if linhas_visiveis:
+            tabela.pack(fill="x")
+        else:
+            tabela.pack(fill="both", expand=True)
+        return tabela
+
+    @staticmethod
+    def _celulas_servico(srv):
+        st = srv.get("status", "")
+        st_cor = {"Aberto": COR_AMARELO, "Aguardando Peca": COR_AZUL, "Pronto": COR_VERDE, "Entregue": COR_TEXTO_SEC}.get(st, COR_TEXTO)
+        vf = srv.get("valor_final", 0) or srv.get("valor_total", 0) or 0
+        return [
+            (srv.get("ra", ""), COR_DESTAQUE), (srv.get("cliente_nome", ""), COR_TEXTO),
+            (srv.get("aparelho", ""), COR_TEXTO), (st, st_cor),
+            (f"R$ {vf:.2f}", COR_VERDE), (srv.get("forma_pagamento", "") or "-", COR_TEXTO_SEC),
+            (srv.get("data_entrada", ""), COR_TEXTO_SEC),
+        ]
 
     # ═══════════ NOVA OS ═══════════
+    @perfil.perfilar()
     def mostrar_nova_os(self):
-        self._limpar()
-        self._atualizar_menu_ativo("Nova OS")
+        self._exibir_pagina("Nova OS", self._criar_nova_os, self._atualizar_nova_os)
+
+    def _criar_nova_os(self):
         self.cliente_selecionado_id = None
         self.pecas_temp = []
         f = ctk.CTkScrollableFrame(self.content, fg_color="transparent")
-        f.pack(fill="both", expand=True, padx=25, pady=15)
         self.ra_atual = database.gerar_ra()
-        self._titulo_pagina(f, "Nova Ordem de Servico", f"RA: {self.ra_atual}")
+        self.label_ra = self._titulo_pagina(f, "Nova Ordem de Servico", f"RA: {self.ra_atual}")
 
         # === CLIENTE ===
         sec = self._secao(f, "Cliente")
@@ -235,6 +435,13 @@ class App(ctk.CTk):
         self.entry_busca_cli = ctk.CTkEntry(sec, textvariable=self.busca_cliente_var, font=FONTE_NORMAL, height=40, placeholder_text="Buscar cliente por nome ou telefone...")
         self.entry_busca_cli.pack(fill="x", pady=(0, 5))
         self.lista_clientes_frame = ctk.CTkFrame(sec, fg_color=COR_CARD_HOVER, corner_radius=8)
+        # Botões de sugestão criados uma vez e reaproveitados a cada busca
+        self.sugestoes_cli = [ctk.CTkButton(self.lista_clientes_frame, text="", font=FONTE_NORMAL, fg_color="transparent", hover_color=COR_SIDEBAR_HOVER, anchor="w", height=34) for _ in range(MAX_SUGESTOES)]
+        try:
+            atraso = int(carregar_config().get("atraso_busca_ms", busca_incremental.ATRASO_PADRAO_MS))
+        except (TypeError, ValueError):
+            atraso = busca_incremental.ATRASO_PADRAO_MS
+        self.busca_cli = busca_incremental.BuscaIncremental(self, self.tarefas, database.buscar_clientes, ("nome", "telefone"), self._mostrar_sugestoes, atraso_ms=atraso, grupo="tela")
         self.label_cliente_sel = ctk.CTkLabel(sec, text="Nenhum cliente selecionado", font=FONTE_NORMAL, text_color=COR_AMARELO, anchor="w")
         self.label_cliente_sel.pack(fill="x", pady=3)
         ctk.CTkButton(sec, text="+ Novo Cliente", font=FONTE_NORMAL, fg_color=COR_AZUL, hover_color=COR_AZUL_HOVER, height=36, command=self._toggle_novo_cli).pack(anchor="w", pady=3)
@@ -313,6 +520,28 @@ class App(ctk.CTk):
         btns.pack(fill="x", pady=15)
         ctk.CTkButton(btns, text="Salvar OS", font=FONTE_GRANDE, fg_color=COR_VERDE, hover_color="#16a34a", height=48, corner_radius=10, command=self._salvar_os).pack(side="left", padx=(0, 8))
         ctk.CTkButton(btns, text="Salvar e Imprimir", font=FONTE_GRANDE, fg_color=COR_AMARELO, hover_color=COR_AMARELO_HOVER, text_color=COR_SIDEBAR, height=48, corner_radius=10, command=lambda: self._salvar_os(imprimir=True)).pack(side="left")
+        return f
+
+    def _atualizar_nova_os(self):
+        # O rascunho continua preenchido; só o RA (outra estação pode ter
+        # gravado OS) e as sugestões de cliente são relidos
+        self.ra_atual = database.gerar_ra()
+        self._trocar_texto(self.label_ra, f"RA: {self.ra_atual}")
+        self.busca_cli.limpar_cache()
+
+    def _limpar_form_os(self):
+        """Depois de salvar: formulário em branco para a próxima OS."""
+        self.cliente_selecionado_id = None
+        self.pecas_temp = []
+        self.label_cliente_sel.configure(text="Nenhum cliente selecionado", text_color=COR_AMARELO)
+        self.busca_cliente_var.set("")
+        for e in list(self.campos_ap.values()) + [self.entry_peca_desc, self.entry_peca_valor, self.entry_desconto]:
+            e.delete(0, END)
+        for t in (self.text_defeito, self.text_obs):
+            t.delete("1.0", END)
+        self.combo_pgto.set("")
+        self.label_sugestao.configure(text="")
+        self._refresh_pecas()
 
     def _on_pgto_change(self, valor):
         if valor in DESCONTOS_SUGERIDOS:
@@ -336,19 +565,25 @@ class App(ctk.CTk):
         self.label_final.configure(text=f"R$ {final:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
 
     def _ao_buscar_cliente(self, *a):
-        q = self.busca_cliente_var.get().strip()
-        for w in self.lista_clientes_frame.winfo_children():
-            w.destroy()
-        if len(q) < 2:
-            self.lista_clientes_frame.pack_forget()
-            return
-        res = database.buscar_clientes(q)
+        self._busca_desde = time.perf_counter()
+        self.busca_cli.digitar(self.busca_cliente_var.get())
+
+    def _mostrar_sugestoes(self, q, res):
+        if self._busca_desde is not None and len(q) >= busca_incremental.TAMANHO_MINIMO:
+            # Da última tecla até as sugestões (inclui o atraso da busca)
+            self.vigia.registrar("busca cliente", (time.perf_counter() - self._busca_desde) * 1000)
+            self._busca_desde = None
         if not res:
             self.lista_clientes_frame.pack_forget()
             return
-        self.lista_clientes_frame.pack(fill="x", pady=2)
-        for cli in res[:8]:
-            ctk.CTkButton(self.lista_clientes_frame, text=f"  {cli['nome']}  -  {cli.get('telefone', '')}", font=FONTE_NORMAL, fg_color="transparent", hover_color=COR_SIDEBAR_HOVER, anchor="w", height=34, command=lambda c=cli: self._sel_cli(c)).pack(fill="x", padx=4, pady=1)
+        self.lista_clientes_frame.pack(fill="x", pady=2, after=self.entry_busca_cli)
+        for i, btn in enumerate(self.sugestoes_cli):
+            if i < len(res):
+                cli = res[i]
+                btn.configure(text=f"  {cli['nome']}  -  {cli.get('telefone', '')}", command=lambda c=cli: self._sel_cli(c))
+                btn.pack(fill="x", padx=4, pady=1)
+            else:
+                btn.pack_forget()
 
     def _sel_cli(self, cli):
         self.cliente_selecionado_id = cli["id"]
@@ -368,11 +603,13 @@ class App(ctk.CTk):
         if not nome:
             messagebox.showwarning("Atencao", "Nome obrigatorio!")
             return
+        self.vigia.acao("salvar", "cliente")
         try:
             cid = database.salvar_cliente(nome, self.campos_cli["endereco"].get().strip(), self.campos_cli["telefone"].get().strip(), self.campos_cli["documento"].get().strip())
             if cid:
                 self.cliente_selecionado_id = cid
                 self.label_cliente_sel.configure(text=f"OK: {nome}", text_color=COR_VERDE)
+                self.busca_cli.limpar_cache()
                 self.form_cli.pack_forget()
                 self.form_cli_vis = False
                 for e in self.campos_cli.values():
@@ -417,6 +654,7 @@ class App(ctk.CTk):
             self.pecas_temp.pop(idx)
             self._refresh_pecas()
 
+    @perfil.perfilar()
     def _salvar_os(self, imprimir=False):
         if not self.cliente_selecionado_id:
             messagebox.showwarning("Atencao", "Selecione ou cadastre um cliente!")
@@ -425,6 +663,7 @@ class App(ctk.CTk):
         if not ap:
             messagebox.showwarning("Atencao", "Informe o aparelho!")
             return
+        self.vigia.acao("salvar", f"OS {self.ra_atual}")
         try:
             total = sum(v for _, v in self.pecas_temp)
             try:
@@ -447,17 +686,19 @@ class App(ctk.CTk):
                 database.adicionar_peca(self.ra_atual, d, v)
             messagebox.showinfo("OK", f"OS {self.ra_atual} salva!")
             if imprimir:
-                print_engine.gerar_pdf_ra(self.ra_atual)
+                self._imprimir_os(self.ra_atual)
+            self._limpar_form_os()
             self.mostrar_dashboard()
         except Exception as e:
             messagebox.showerror("Erro", f"Erro: {e}")
 
     # ═══════════ BUSCAR OS ═══════════
     def mostrar_buscar_os(self):
-        self._limpar()
-        self._atualizar_menu_ativo("Buscar OS")
-        f = ctk.CTkScrollableFrame(self.content, fg_color="transparent")
-        f.pack(fill="both", expand=True, padx=25, pady=15)
+        # Voltar dos detalhes mantém busca, filtro, ordenação e posição
+        self._exibir_pagina("Buscar OS", self._criar_buscar_os, lambda: self.tabela_os.atualizar())
+
+    def _criar_buscar_os(self):
+        f = ctk.CTkFrame(self.content, fg_color="transparent")
         self._titulo_pagina(f, "Buscar OS")
         bf = ctk.CTkFrame(f, fg_color=COR_CARD, corner_radius=10, border_width=1, border_color=COR_BORDA)
         bf.pack(fill="x", pady=(0, 10))
@@ -472,27 +713,22 @@ class App(ctk.CTk):
         filtros.pack(fill="x", pady=(0, 10))
         for s, cor in [("Todos", COR_TEXTO_SEC), ("Aberto", COR_AMARELO), ("Aguardando Peca", COR_AZUL), ("Pronto", COR_VERDE), ("Entregue", COR_TEXTO_SEC)]:
             ctk.CTkButton(filtros, text=s, font=FONTE_PEQUENA, fg_color=COR_CARD, hover_color=COR_CARD_HOVER, text_color=cor, height=32, corner_radius=20, command=lambda st=s: self._filtrar_os(st)).pack(side="left", padx=3)
-        self.res_os_frame = ctk.CTkFrame(f, fg_color="transparent")
-        self.res_os_frame.pack(fill="both", expand=True)
-        self._filtrar_os("Todos")
+        self.tabela_os = self._tabela_servicos(f, self._fonte_os(), com_acoes=True, assincrona=True)
+        return f
+
+    def _fonte_os(self, status=None, busca=None):
+        return FonteConsulta(_contar_servicos, _pagina_servicos, status=status, busca=busca)
 
     def _exec_busca_os(self):
         q = self.busca_os_var.get().strip()
         if not q:
             self._filtrar_os("Todos")
             return
-        self._mostrar_res_os(database.buscar_servicos(q))
+        self.vigia.acao("busca", "Buscar OS")
+        self.tabela_os.recarregar(self._fonte_os(busca=q))
 
     def _filtrar_os(self, st):
-        self._mostrar_res_os(database.listar_servicos() if st == "Todos" else database.listar_servicos(st))
-
-    def _mostrar_res_os(self, servicos):
-        for w in self.res_os_frame.winfo_children():
-            w.destroy()
-        if not servicos:
-            ctk.CTkLabel(self.res_os_frame, text="Nenhuma OS encontrada.", font=FONTE_NORMAL, text_color=COR_TEXTO_SEC).pack(pady=20)
-            return
-        self._tabela_servicos(self.res_os_frame, servicos, com_acoes=True)
+        self.tabela_os.recarregar(self._fonte_os(status=None if st == "Todos" else st))
 
     def _abrir_detalhes_os(self, ra):
         srv = database.obter_servico(ra)
@@ -501,6 +737,8 @@ class App(ctk.CTk):
         self._limpar()
         f = ctk.CTkScrollableFrame(self.content, fg_color="transparent")
         f.pack(fill="both", expand=True, padx=25, pady=15)
+        self.pagina_temporaria = f
+        self.pagina_atual = "Detalhes"
         self._titulo_pagina(f, f"OS: {ra}", f"Status: {srv.get('status', '')}  |  Data: {srv.get('data_entrada', '')}")
         sec = self._secao(f, "Detalhes")
         for label, val in [("Cliente", srv.get("cliente_nome", "")), ("Telefone", srv.get("cliente_telefone", "")), ("Aparelho", srv.get("aparelho", "")),
@@ -518,71 +756,232 @@ class App(ctk.CTk):
             cor = {"Aberto": COR_AMARELO, "Aguardando Peca": COR_AZUL, "Pronto": COR_VERDE, "Entregue": COR_TEXTO_SEC}.get(st, COR_TEXTO)
             ctk.CTkButton(st_frame, text=st, font=FONTE_NORMAL, fg_color=COR_CARD, hover_color=cor, text_color=cor, height=36, corner_radius=8,
                           command=lambda s=st: self._mudar_status(ra, s)).pack(side="left", padx=4)
+        # Historico: compara com a OS como estava num backup, sem restaurar nada
+        self._secao_historico(f, lambda data: historico.comparar_servico(data, ra))
         # Print
-        ctk.CTkButton(f, text="Imprimir PDF", font=FONTE_GRANDE, fg_color=COR_AMARELO, hover_color=COR_AMARELO_HOVER, text_color=COR_SIDEBAR, height=46, corner_radius=10,
-                      command=lambda: print_engine.gerar_pdf_ra(ra)).pack(pady=15, anchor="w")
+        pf = ctk.CTkFrame(f, fg_color="transparent")
+        pf.pack(pady=15, anchor="w")
+        ctk.CTkButton(pf, text="Imprimir PDF", font=FONTE_GRANDE, fg_color=COR_AMARELO, hover_color=COR_AMARELO_HOVER, text_color=COR_SIDEBAR, height=46, corner_radius=10,
+                      command=lambda: self._imprimir_os(ra)).pack(side="left", padx=(0, 10))
+        ctk.CTkButton(pf, text="Enviar p/ Impressora", font=FONTE_GRANDE, fg_color=COR_AZUL, hover_color=COR_AZUL_HOVER, height=46, corner_radius=10,
+                      command=lambda: self._imprimir_os(ra, fila_impressao.IMPRIMIR)).pack(side="left", padx=(0, 10))
+        ctk.CTkButton(pf, text="Recibo Termico", font=FONTE_GRANDE, fg_color=COR_SIDEBAR_HOVER, hover_color=COR_SIDEBAR, height=46, corner_radius=10,
+                      command=lambda: self._imprimir_recibo(ra)).pack(side="left")
         ctk.CTkButton(f, text="Voltar", font=FONTE_NORMAL, fg_color=COR_CARD, hover_color=COR_CARD_HOVER, height=36, command=self.mostrar_buscar_os).pack(anchor="w")
 
+    def _imprimir_os(self, ra, acao=fila_impressao.ABRIR):
+        # PDF gerado em segundo plano; a janela continua respondendo
+        self.vigia.acao("imprimir", ra)
+        inicio = time.perf_counter()
+
+        def concluido(ra, caminho):
+            self.vigia.registrar("imprimir ate pdf", (time.perf_counter() - inicio) * 1000)
+            if not caminho:
+                messagebox.showerror("Erro", f"Nao foi possivel gerar o PDF da OS {ra}.")
+        self.fila_impressao.solicitar(ra, acao, concluido)
+
+    def _imprimir_recibo(self, ra):
+        self.vigia.acao("imprimir", f"recibo {ra}")
+
+        def enviar():
+            import recibo_termico  # puxa o print_engine (reportlab) só quando usado
+            return recibo_termico.imprimir_recibo(ra)
+
+        def concluido(ok):
+            if not ok:
+                messagebox.showerror("Erro", "Nao foi possivel enviar o recibo.\nConfira a impressora termica em Configuracoes.")
+        self.tarefas.executar(enviar, ao_concluir=concluido)
+
+    def _secao_historico(self, f, comparar):
+        """Seção "Comparar com Backup": comparar(data) -> [(campo, antes, depois)]."""
+        datas = list(reversed(backup.listar_backups()))
+        if not datas:
+            return
+        sec = self._secao(f, "Comparar com Backup")
+        hr = ctk.CTkFrame(sec, fg_color="transparent")
+        hr.pack(fill="x")
+        combo_hist = ctk.CTkComboBox(hr, values=datas, font=FONTE_NORMAL, height=36, dropdown_font=FONTE_NORMAL, state="readonly")
+        combo_hist.set(datas[0])
+        combo_hist.pack(side="left", padx=(0, 8))
+        label_diff = ctk.CTkLabel(sec, text="", font=FONTE_PEQUENA, text_color=COR_TEXTO, anchor="w", justify="left")
+        label_diff.pack(fill="x", pady=(8, 0))
+        ctk.CTkButton(hr, text="Comparar", font=FONTE_NORMAL, fg_color=COR_AZUL, hover_color=COR_AZUL_HOVER, height=36,
+                      command=lambda: self._comparar_historico(comparar, combo_hist.get(), label_diff)).pack(side="left")
+
+    def _comparar_historico(self, comparar, data, label):
+        # Montar o backup da data pode levar segundos: roda no pool, fora da thread do Tk
+        self.vigia.acao("historico", data)
+        label.configure(text=f"Comparando com o backup de {data}...", text_color=COR_TEXTO_SEC)
+
+        def concluido(difs):
+            if not difs:
+                label.configure(text=f"Sem diferencas em relacao ao backup de {data}.", text_color=COR_TEXTO_SEC)
+                return
+            linhas = [f"{campo}:  {antes}  ->  {depois}" for campo, antes, depois in difs]
+            label.configure(text=f"Mudancas desde {data}:\n" + "\n".join(linhas), text_color=COR_TEXTO)
+
+        def falhou(e):
+            label.configure(text=f"Nao foi possivel ler o backup de {data}: {e}", text_color=COR_VERMELHO)
+        self.tarefas.executar(comparar, data, ao_concluir=concluido, ao_falhar=falhou, grupo="tela")
+
     def _mudar_status(self, ra, st):
+        self.vigia.acao("salvar", f"status {ra}")
         if database.atualizar_status(ra, st):
             messagebox.showinfo("OK", f"Status alterado para: {st}")
             self._abrir_detalhes_os(ra)
 
     # ═══════════ CLIENTES ═══════════
     def mostrar_clientes(self):
+        self._exibir_pagina("Clientes", self._criar_clientes, lambda: self.tabela_clientes.atualizar())
+
+    def _criar_clientes(self):
+        f = ctk.CTkFrame(self.content, fg_color="transparent")
+        self._titulo_pagina(f, "Clientes")
+        cols = [("Nome", "nome", 0.26), ("Telefone", "telefone", 0.16), ("Documento", "documento", 0.16), ("Endereco", "endereco", 0.26)]
+        celulas = lambda cli: [(cli.get("nome", ""), COR_TEXTO), (cli.get("telefone", ""), COR_TEXTO_SEC),
+                               (cli.get("documento", ""), COR_TEXTO_SEC), (cli.get("endereco", ""), COR_TEXTO_SEC)]
+        acoes = [("Ver", COR_AZUL, COR_AZUL_HOVER, lambda cli: self._abrir_detalhes_cliente(cli.get("id")))]
+        self.tabela_clientes = TabelaVirtual(f, cols, FonteConsulta(_contar_clientes, _pagina_clientes), celulas,
+                                             acoes=acoes, ordenar_por="nome", mensagem_vazia="Nenhum cliente cadastrado.",
+                                             executor=self.tarefas, grupo="tela")
+        self.tabela_clientes.pack(fill="both", expand=True)
+        return f
+
+    def _abrir_detalhes_cliente(self, cliente_id):
+        cli = database.obter_cliente(cliente_id)
+        if not cli:
+            return
         self._limpar()
-        self._atualizar_menu_ativo("Clientes")
         f = ctk.CTkScrollableFrame(self.content, fg_color="transparent")
         f.pack(fill="both", expand=True, padx=25, pady=15)
-        self._titulo_pagina(f, "Clientes")
-        clientes = database.listar_todos_clientes()
-        if not clientes:
-            ctk.CTkLabel(f, text="Nenhum cliente cadastrado.", font=FONTE_NORMAL, text_color=COR_TEXTO_SEC).pack(pady=20)
-            return
-        h = ctk.CTkFrame(f, fg_color=COR_SIDEBAR, corner_radius=8, height=38)
-        h.pack(fill="x", pady=(0, 2))
-        h.pack_propagate(False)
-        for text, rx, w in [("Nome", 0.01, 0.3), ("Telefone", 0.31, 0.2), ("Documento", 0.51, 0.2), ("Endereco", 0.71, 0.28)]:
-            ctk.CTkLabel(h, text=text, font=("Segoe UI", 11, "bold"), text_color=COR_AMARELO, anchor="w").place(relx=rx, rely=0.5, anchor="w", relwidth=w)
-        for cli in clientes:
-            row = ctk.CTkFrame(f, fg_color=COR_CARD, corner_radius=6, height=38)
-            row.pack(fill="x", pady=1)
-            row.pack_propagate(False)
-            for val, rx, w, cor in [(cli.get("nome", ""), 0.01, 0.3, COR_TEXTO), (cli.get("telefone", ""), 0.31, 0.2, COR_TEXTO_SEC),
-                                     (cli.get("documento", ""), 0.51, 0.2, COR_TEXTO_SEC), (cli.get("endereco", ""), 0.71, 0.28, COR_TEXTO_SEC)]:
-                ctk.CTkLabel(row, text=val, font=FONTE_PEQUENA, text_color=cor, anchor="w").place(relx=rx, rely=0.5, anchor="w", relwidth=w)
+        self.pagina_temporaria = f
+        self.pagina_atual = "Detalhes"
+        self._titulo_pagina(f, cli.get("nome", ""), f"Cadastro: {cli.get('data_cadastro', '') or '-'}")
+        sec = self._secao(f, "Detalhes")
+        for label, val in [("Telefone", cli.get("telefone", "")), ("Documento", cli.get("documento", "")), ("Endereco", cli.get("endereco", ""))]:
+            r = ctk.CTkFrame(sec, fg_color="transparent")
+            r.pack(fill="x", pady=2)
+            ctk.CTkLabel(r, text=f"{label}:", font=("Segoe UI", 13, "bold"), text_color=COR_AZUL, width=120, anchor="w").pack(side="left")
+            ctk.CTkLabel(r, text=val or "-", font=FONTE_NORMAL, text_color=COR_TEXTO, anchor="w").pack(side="left", fill="x", expand=True)
+        self._secao_historico(f, lambda data: historico.comparar_cliente(data, cliente_id))
+        ctk.CTkButton(f, text="Voltar", font=FONTE_NORMAL, fg_color=COR_CARD, hover_color=COR_CARD_HOVER, height=36, command=self.mostrar_clientes).pack(anchor="w", pady=(15, 0))
 
     # ═══════════ FINANCEIRO ═══════════
     def mostrar_financeiro(self):
-        self._limpar()
-        self._atualizar_menu_ativo("Financeiro")
+        self._exibir_pagina("Financeiro", self._criar_financeiro, self._atualizar_financeiro)
+
+    def _criar_financeiro(self):
         f = ctk.CTkScrollableFrame(self.content, fg_color="transparent")
-        f.pack(fill="both", expand=True, padx=25, pady=15)
         agora = datetime.now()
-        self._titulo_pagina(f, "Painel Financeiro", f"{MESES_PT.get(agora.month, '')} {agora.year}")
+        self.fin_subtitulo = self._titulo_pagina(f, "Painel Financeiro", f"{MESES_PT.get(agora.month, '')} {agora.year}")
 
-        resumo = database.resumo_financeiro_mes()
         # Cards
         cards = ctk.CTkFrame(f, fg_color="transparent")
         cards.pack(fill="x", pady=5)
         cards.grid_columnconfigure((0, 1, 2, 3), weight=1)
-        for i, (t, v, cor) in enumerate([
-            ("Faturado", f"R$ {resumo['faturado']:,.0f}".replace(",", "."), COR_AMARELO),
-            ("Bruto", f"R$ {resumo['bruto']:,.0f}".replace(",", "."), COR_AZUL),
-            ("Descontos", f"R$ {resumo['descontos']:,.0f}".replace(",", "."), COR_VERMELHO),
-            ("Total OS", str(resumo["total_os"]), COR_VERDE),
-        ]):
+        self.fin_valores = []
+        for i, (t, cor) in enumerate([("Faturado", COR_AMARELO), ("Bruto", COR_AZUL), ("Descontos", COR_VERMELHO), ("Total OS", COR_VERDE)]):
             card = ctk.CTkFrame(cards, fg_color=COR_CARD, corner_radius=12, border_width=1, border_color=COR_BORDA, height=110)
             card.grid(row=0, column=i, padx=6, sticky="nsew")
             card.grid_propagate(False)
             inn = ctk.CTkFrame(card, fg_color="transparent")
             inn.place(relx=0.5, rely=0.5, anchor="center")
-            ctk.CTkLabel(inn, text=v, font=("Segoe UI", 24, "bold"), text_color=cor).pack()
+            lbl = ctk.CTkLabel(inn, text="...", font=("Segoe UI", 24, "bold"), text_color=cor)
+            lbl.pack()
+            self.fin_valores.append(lbl)
             ctk.CTkLabel(inn, text=t, font=FONTE_NORMAL, text_color=COR_TEXTO).pack()
 
         # Pagamentos
-        sec = self._secao(f, "Por Forma de Pagamento")
-        pgtos = resumo.get("por_pagamento", [])
+        self.fin_pagamentos = self._secao(f, "Por Forma de Pagamento")
+        ctk.CTkLabel(self.fin_pagamentos, text="Carregando...", font=FONTE_NORMAL, text_color=COR_TEXTO_SEC).pack(pady=10)
+
+        # Relatorio
+        sec_rel = self._secao(f, "Relatorio em PDF")
+        ctk.CTkLabel(sec_rel, text="Lista todas as OS do periodo, com subtotal por dia e por forma de pagamento.", font=FONTE_PEQUENA, text_color=COR_TEXTO_SEC, anchor="w").pack(fill="x", pady=(0, 10))
+        rel_row = ctk.CTkFrame(sec_rel, fg_color="transparent")
+        rel_row.pack(fill="x")
+        ctk.CTkButton(rel_row, text="Mes Atual", font=FONTE_NORMAL, fg_color=COR_AZUL, hover_color=COR_AZUL_HOVER, height=38, corner_radius=8,
+                      command=self._relatorio_mes_atual).pack(side="left", padx=(0, 8))
+        ctk.CTkButton(rel_row, text="Ano Atual", font=FONTE_NORMAL, fg_color=COR_SIDEBAR_HOVER, hover_color=COR_SIDEBAR, height=38, corner_radius=8,
+                      command=self._relatorio_ano_atual).pack(side="left")
+        self.fin_relatorio_status = ctk.CTkLabel(sec_rel, text="", font=FONTE_PEQUENA, text_color=COR_TEXTO_SEC, anchor="w")
+        self.fin_relatorio_status.pack(fill="x", pady=(8, 0))
+        self.fin_relatorio_ativo = False
+
+        # Historico
+        self.fin_historico = self._secao(f, "Ultimos 6 Meses")
+        ctk.CTkLabel(self.fin_historico, text="Carregando...", font=FONTE_NORMAL, text_color=COR_TEXTO_SEC).pack(pady=10)
+        self.fin_dados = None
+        self._atualizar_financeiro()
+        return f
+
+    def _atualizar_financeiro(self):
+        agora = datetime.now()
+        self._trocar_texto(self.fin_subtitulo, f"{MESES_PT.get(agora.month, '')} {agora.year}")
+
+        def preencher(dados):
+            resumo, hist = dados
+            for lbl, texto in zip(self.fin_valores, [
+                f"R$ {resumo['faturado']:,.0f}".replace(",", "."),
+                f"R$ {resumo['bruto']:,.0f}".replace(",", "."),
+                f"R$ {resumo['descontos']:,.0f}".replace(",", "."),
+                str(resumo["total_os"]),
+            ]):
+                self._trocar_texto(lbl, texto)
+            anterior = self.fin_dados or ({}, None)
+            # As listas só são redesenhadas quando mudaram
+            if resumo.get("por_pagamento") != anterior[0].get("por_pagamento"):
+                self._mostrar_pagamentos(self.fin_pagamentos, resumo.get("por_pagamento", []))
+            if hist != anterior[1]:
+                self._mostrar_historico_meses(self.fin_historico, hist)
+            self.fin_dados = dados
+
+        self.tarefas.executar(self._dados_financeiro, ao_concluir=preencher, grupo="tela")
+
+    @staticmethod
+    @perfil.perfilar("carga_financeiro")
+    def _dados_financeiro():
+        """Roda fora da thread do Tk: resumo do mês e faturamento dos últimos meses."""
+        return database.resumo_financeiro_mes(), database.faturamento_ultimos_meses(6)
+
+    def _relatorio_mes_atual(self):
+        agora = datetime.now()
+        fim_mes = f"{agora.year}-{agora.month:02d}-{calendar.monthrange(agora.year, agora.month)[1]:02d}"
+        self._gerar_relatorio(f"{agora.year}-{agora.month:02d}-01", fim_mes)
+
+    def _relatorio_ano_atual(self):
+        agora = datetime.now()
+        self._gerar_relatorio(f"{agora.year}-01-01", f"{agora.year}-12-31")
+
+    def _gerar_relatorio(self, de, ate):
+        if self.fin_relatorio_ativo:
+            return
+        self.fin_relatorio_ativo = True
+        self.fin_relatorio_status.configure(text=f"Gerando relatorio de {de} a {ate}...", text_color=COR_AMARELO)
+
+        def gerar():
+            import relatorio_financeiro  # reportlab só quando usado
+            return relatorio_financeiro.gerar_relatorio(de, ate, abrir=True)
+
+        def concluido(r):
+            self.fin_relatorio_ativo = False
+            if not r:
+                self.fin_relatorio_status.configure(text="Falha ao gerar o relatorio.", text_color=COR_VERMELHO)
+                messagebox.showerror("Erro", f"Nao foi possivel gerar o relatorio de {de} a {ate}.")
+                return
+            self.fin_relatorio_status.configure(text=f"Relatorio gerado: {r['os']} OS em {r['segundos']:.1f}s - {r['caminho']}",
+                                                text_color=COR_VERDE)
+
+        def falhou(e):
+            self.fin_relatorio_ativo = False
+            self.fin_relatorio_status.configure(text="Falha ao gerar o relatorio.", text_color=COR_VERMELHO)
+            messagebox.showerror("Erro", f"Falha ao gerar o relatorio: {e}")
+        # Sem grupo "tela": o relatorio continua (e avisa) mesmo se o usuario trocar de tela
+        self.tarefas.executar(gerar, ao_concluir=concluido, ao_falhar=falhou)
+
+    def _mostrar_pagamentos(self, sec, pgtos):
+        for w in sec.winfo_children():
+            w.destroy()
         if pgtos:
             for pg in pgtos:
                 r = ctk.CTkFrame(sec, fg_color="transparent")
@@ -593,9 +992,9 @@ class App(ctk.CTk):
         else:
             ctk.CTkLabel(sec, text="Nenhum pagamento registrado este mes.", font=FONTE_NORMAL, text_color=COR_TEXTO_SEC).pack(pady=10)
 
-        # Historico
-        sec2 = self._secao(f, "Ultimos 6 Meses")
-        hist = database.faturamento_ultimos_meses(6)
+    def _mostrar_historico_meses(self, sec2, hist):
+        for w in sec2.winfo_children():
+            w.destroy()
         if hist:
             max_val = max((h.get("total", 0) for h in hist), default=1) or 1
             for h in hist:
@@ -613,16 +1012,20 @@ class App(ctk.CTk):
                 ctk.CTkLabel(r, text=f"({h.get('qtd_os', 0)} OS)", font=("Segoe UI", 10), text_color=COR_TEXTO_SEC, width=60).pack(side="right")
 
     # ═══════════ CONFIGURACOES ═══════════
+    @perfil.perfilar()
     def mostrar_configuracoes(self):
-        self._limpar()
-        self._atualizar_menu_ativo("Configuracoes")
+        self._exibir_pagina("Configuracoes", self._criar_configuracoes, self._atualizar_configuracoes)
+
+    def _criar_configuracoes(self):
         f = ctk.CTkScrollableFrame(self.content, fg_color="transparent")
-        f.pack(fill="both", expand=True, padx=25, pady=15)
         self._titulo_pagina(f, "Configuracoes", "Dados que aparecem no PDF")
         sec = self._secao(f, "Dados da Empresa")
         cfg = carregar_config()
         self.campos_cfg = {}
-        for key, label in [("nome", "Nome *"), ("endereco", "Endereco"), ("telefone", "Telefone"), ("cnpj", "CNPJ")]:
+        for key, label in [("nome", "Nome *"), ("endereco", "Endereco"), ("telefone", "Telefone"), ("cnpj", "CNPJ"),
+                           ("impressora_termica", "Impressora termica"), ("largura_termica", "Bobina (58/80 mm)"),
+                           ("atraso_busca_ms", "Atraso da busca (ms)"), ("limite_travamento_ms", "Aviso de travamento (ms)"),
+                           ("perfilar", "Perfilar acoes (0/1)")]:
             r = ctk.CTkFrame(sec, fg_color="transparent")
             r.pack(fill="x", pady=5)
             ctk.CTkLabel(r, text=label, font=FONTE_NORMAL, text_color=COR_TEXTO, width=150, anchor="w").pack(side="left")
@@ -638,12 +1041,23 @@ class App(ctk.CTk):
         btn_row = ctk.CTkFrame(sec2, fg_color="transparent")
         btn_row.pack(fill="x")
         ctk.CTkButton(btn_row, text="Exportar Dados (ZIP)", font=FONTE_NORMAL, fg_color=COR_VERDE, hover_color="#16a34a", height=42, corner_radius=8, command=self._exportar_dados).pack(side="left", padx=(0, 8))
+        ctk.CTkButton(btn_row, text="Exportar Incremental", font=FONTE_NORMAL, fg_color=COR_SIDEBAR_HOVER, hover_color=COR_SIDEBAR, height=42, corner_radius=8, command=lambda: self._exportar_dados(incremental=True)).pack(side="left", padx=(0, 8))
         ctk.CTkButton(btn_row, text="Restaurar Dados (ZIP)", font=FONTE_NORMAL, fg_color=COR_AZUL, hover_color=COR_AZUL_HOVER, height=42, corner_radius=8, command=self._importar_dados).pack(side="left", padx=(0, 8))
 
         # === IMPORTAR CLIENTES ANTIGOS ===
         sec3 = self._secao(f, "Importar Clientes (Programa Antigo)")
         ctk.CTkLabel(sec3, text="Importe clientes do programa antigo via arquivo CSV.\nO CSV deve ter pelo menos a coluna 'nome'. Colunas opcionais: telefone, documento, endereco.\nClientes duplicados serao ignorados automaticamente.", font=FONTE_PEQUENA, text_color=COR_TEXTO_SEC, anchor="w", justify="left").pack(fill="x", pady=(0, 10))
         ctk.CTkButton(sec3, text="Importar CSV de Clientes", font=FONTE_NORMAL, fg_color=COR_AMARELO, hover_color=COR_AMARELO_HOVER, text_color=COR_SIDEBAR, height=42, corner_radius=8, command=self._importar_csv).pack(anchor="w")
+        return f
+
+    def _atualizar_configuracoes(self):
+        # config.json pode ter sido editado fora (ou salvo por outra tela)
+        cfg = carregar_config()
+        for key, e in self.campos_cfg.items():
+            valor = str(cfg.get(key, ""))
+            if e.get() != valor:
+                e.delete(0, END)
+                e.insert(0, valor)
 
     def _salvar_cfg(self):
         nome = self.campos_cfg["nome"].get().strip()
@@ -652,24 +1066,38 @@ class App(ctk.CTk):
             return
         dados = {k: e.get().strip() for k, e in self.campos_cfg.items()}
         if salvar_config(dados):
+            perfil.configurar(dados.get("perfilar"))
             messagebox.showinfo("OK", "Configuracoes salvas! PDF atualizado.")
         else:
             messagebox.showerror("Erro", "Falha ao salvar.")
 
-    def _exportar_dados(self):
+    def _exportar_dados(self, incremental=False):
         from tkinter import filedialog
+        base = None
+        if incremental:
+            base = filedialog.askopenfilename(
+                title="Selecionar exportacao anterior (base)",
+                filetypes=[("ZIP", "*.zip")]
+            )
+            if not base:
+                return
         destino = filedialog.asksaveasfilename(
             title="Salvar backup como...",
             defaultextension=".zip",
             filetypes=[("ZIP", "*.zip")],
-            initialfile=f"oficina_backup_{datetime.now().strftime('%Y%m%d_%H%M')}.zip"
+            initialfile=f"oficina_backup_{datetime.now().strftime('%Y%m%d_%H%M')}{'_inc' if incremental else ''}.zip"
         )
         if not destino:
             return
-        if database.exportar_dados(destino):
-            messagebox.showinfo("OK", f"Dados exportados com sucesso!\n\n{destino}\n\nGuarde este arquivo em local seguro (pendrive, nuvem, etc).")
-        else:
-            messagebox.showerror("Erro", "Falha ao exportar dados.")
+
+        def concluido(ok):
+            if ok:
+                aviso = "\n\nGuarde junto com a exportacao base: a restauracao precisa das duas." if base else ""
+                messagebox.showinfo("OK", f"Dados exportados com sucesso!\n\n{destino}\n\nGuarde este arquivo em local seguro (pendrive, nuvem, etc).{aviso}")
+            else:
+                messagebox.showerror("Erro", "Falha ao exportar dados.")
+
+        self.tarefas.executar(database.exportar_dados, destino, base_zip=base, ao_concluir=concluido)
 
     def _importar_dados(self):
         from tkinter import filedialog
@@ -681,10 +1109,14 @@ class App(ctk.CTk):
         )
         if not arquivo:
             return
-        if database.importar_dados(arquivo):
-            messagebox.showinfo("OK", "Dados restaurados com sucesso!\n\nReinicie o programa para aplicar as mudancas.")
-        else:
-            messagebox.showerror("Erro", "Falha ao restaurar dados.")
+
+        def concluido(ok):
+            if ok:
+                messagebox.showinfo("OK", "Dados restaurados com sucesso!\n\nReinicie o programa para aplicar as mudancas.")
+            else:
+                messagebox.showerror("Erro", "Falha ao restaurar dados.")
+
+        self.tarefas.executar(database.importar_dados, arquivo, ao_concluir=concluido)
 
     def _importar_csv(self):
         from tkinter import filedialog
@@ -694,28 +1126,31 @@ class App(ctk.CTk):
         )
         if not arquivo:
             return
-        # Tenta primeiro UTF-8, depois Latin-1
-        importados, duplicados, erros = 0, 0, 0
-        try:
-            importados, duplicados, erros = database.importar_clientes_csv(arquivo, encoding="utf-8")
-        except Exception:
+
+        def importar():
+            # Tenta primeiro UTF-8, depois Latin-1
             try:
-                importados, duplicados, erros = database.importar_clientes_csv(arquivo, encoding="latin-1")
-            except Exception as e:
-                messagebox.showerror("Erro", f"Falha ao ler arquivo: {e}")
-                return
+                return database.importar_clientes_csv(arquivo, encoding="utf-8")
+            except Exception:
+                return database.importar_clientes_csv(arquivo, encoding="latin-1")
+
+        def concluido(resultado):
+            importados, duplicados, erros = resultado
+            msg = (
+                f"Importacao concluida!\n\n"
+                f"Importados: {importados}\n"
+                f"Duplicados (ignorados): {duplicados}\n"
+                f"Erros: {erros}"
+            )
+            messagebox.showinfo("Resultado", msg)
 
-        msg = (
-            f"Importacao concluida!\n\n"
-            f"Importados: {importados}\n"
-            f"Duplicados (ignorados): {duplicados}\n"
-            f"Erros: {erros}"
-        )
-        messagebox.showinfo("Resultado", msg)
+        self.tarefas.executar(importar, ao_concluir=concluido,
+                              ao_falhar=lambda e: messagebox.showerror("Erro", f"Falha ao ler arquivo: {e}"))
 
 
 # ═══════════ PONTO DE ENTRADA ═══════════
 if __name__ == "__main__":
-    print_engine.EMPRESA.update(carregar_config())
-    app = App()
+    cronometro = tempos_inicio.Cronometro(_INICIO)
+    cronometro.marcar("imports")
+    app = App(cronometro)
     app.mainloop()
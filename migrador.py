@@ -5,11 +5,13 @@ Sistema Oficina 2026
 
 Uso:
     python migrador.py clientes.csv servicos.csv
+    python migrador.py --delta clientes.csv servicos.csv   (reimportação diária)
 """
 
 import csv
 import sys
 import os
+import hashlib
 from database import get_connection, init_db
 
 
@@ -20,6 +22,25 @@ def limpar_string(valor):
     return " ".join(valor.strip().split()).upper()
 
 
+def _garantir_tabela_hashes(cursor):
+    """Cria a tabela que guarda o hash de cada registro legado já importado."""
+    cursor.execute(
+        """CREATE TABLE IF NOT EXISTS migracao_hashes (
+               origem TEXT NOT NULL,
+               chave TEXT NOT NULL,
+               hash TEXT NOT NULL,
+               data_importacao TEXT DEFAULT (DATETIME('now', 'localtime')),
+               PRIMARY KEY (origem, chave)
+           )"""
+    )
+
+
+def hash_registro(valores):
+    """Hash estável do conteúdo normalizado de um registro legado."""
+    bruto = "\x1f".join(str(v) for v in valores)
+    return hashlib.sha1(bruto.encode("utf-8")).hexdigest()
+
+
 def importar_clientes(csv_path):
     """
     Importa clientes de um CSV.
@@ -89,12 +110,16 @@ def importar_clientes(csv_path):
         conn.close()
 
 
-def importar_servicos(csv_path):
+def importar_servicos(csv_path, delta=False):
     """
     Importa serviços de um CSV.
     Colunas esperadas: ra, cliente_nome, aparelho, marca, modelo,
                        numero_serie, defeito_relatado, status, valor_total, data_entrada
     Vincula ao cliente pelo nome. Cria o cliente se não existir.
+
+    Com delta=True, RAs já importados são comparados pelo hash de conteúdo
+    guardado em migracao_hashes: linhas inalteradas são ignoradas sem tocar
+    no banco e linhas alteradas atualizam status e valor_total.
     """
     if not os.path.exists(csv_path):
         print(f"[MIGRADOR] ✗ Arquivo não encontrado: {csv_path}")
@@ -103,9 +128,15 @@ def importar_servicos(csv_path):
     conn = get_connection()
     cursor = conn.cursor()
     importados = 0
+    atualizados = 0
+    inalterados = 0
     erros = 0
 
     try:
+        _garantir_tabela_hashes(cursor)
+        cursor.execute("SELECT chave, hash FROM migracao_hashes WHERE origem = 'servicos'")
+        hashes = {r["chave"]: r["hash"] for r in cursor.fetchall()}
+
         with open(csv_path, "r", encoding="utf-8-sig") as f:
             reader = csv.DictReader(f, delimiter=";")
 
@@ -143,6 +174,35 @@ def importar_servicos(csv_path):
                     }
                     status = status_map.get(status, "Aberto")
 
+                    h = hash_registro((ra, cliente_nome, aparelho, marca, modelo, numero_serie,
+                                       defeito, status, f"{valor_total:.2f}", data_entrada))
+
+                    # Delta: linha idêntica à última importação não toca no banco
+                    if delta and hashes.get(ra) == h:
+                        inalterados += 1
+                        continue
+
+                    # Verifica se RA já existe
+                    cursor.execute(
+                        "SELECT status, valor_total FROM servicos WHERE ra = ?", (ra,)
+                    )
+                    existente = cursor.fetchone()
+                    if existente:
+                        if not delta:
+                            erros += 1
+                            continue
+                        if existente["status"] != status or existente["valor_total"] != valor_total:
+                            cursor.execute(
+                                "UPDATE servicos SET status=?, valor_total=? WHERE ra=?",
+                                (status, valor_total, ra)
+                            )
+                            atualizados += 1
+                        else:
+                            inalterados += 1
+                        _registrar_hash(cursor, ra, h)
+                        hashes[ra] = h
+                        continue
+
                     # Busca ou cria cliente
                     cursor.execute(
                         "SELECT id FROM clientes WHERE nome = ?", (cliente_nome,)
@@ -156,12 +216,6 @@ def importar_servicos(csv_path):
                         )
                         cliente_id = cursor.lastrowid
 
-                    # Verifica se RA já existe
-                    cursor.execute("SELECT ra FROM servicos WHERE ra = ?", (ra,))
-                    if cursor.fetchone():
-                        erros += 1
-                        continue
-
                     cursor.execute(
                         """INSERT INTO servicos
                            (ra, cliente_id, aparelho, marca, modelo, numero_serie,
@@ -170,6 +224,8 @@ def importar_servicos(csv_path):
                         (ra, cliente_id, aparelho, marca, modelo, numero_serie,
                          defeito, status, valor_total, data_entrada)
                     )
+                    _registrar_hash(cursor, ra, h)
+                    hashes[ra] = h
                     importados += 1
 
                 except Exception as e:
@@ -178,7 +234,11 @@ def importar_servicos(csv_path):
                     continue
 
         conn.commit()
-        print(f"[MIGRADOR] ✓ Serviços importados: {importados} | Erros/Duplicados: {erros}")
+        if delta:
+            print(f"[MIGRADOR] ✓ Serviços novos: {importados} | Atualizados: {atualizados} | "
+                  f"Inalterados: {inalterados} | Erros: {erros}")
+        else:
+            print(f"[MIGRADOR] ✓ Serviços importados: {importados} | Erros/Duplicados: {erros}")
         return importados
 
     except Exception as e:
@@ -189,6 +249,16 @@ def importar_servicos(csv_path):
         conn.close()
 
 
+def _registrar_hash(cursor, ra, h):
+    cursor.execute(
+        """INSERT INTO migracao_hashes (origem, chave, hash) VALUES ('servicos', ?, ?)
+           ON CONFLICT(origem, chave) DO UPDATE SET
+               hash = excluded.hash,
+               data_importacao = DATETIME('now', 'localtime')""",
+        (ra, h)
+    )
+
+
 def main():
     """Ponto de entrada CLI."""
     print("=" * 60)
@@ -198,10 +268,16 @@ def main():
     # Inicializa o banco
     init_db()
 
-    if len(sys.argv) < 2:
+    args = sys.argv[1:]
+    delta = "--delta" in args
+    args = [a for a in args if a != "--delta"]
+
+    if len(args) < 1:
         print("\nUso:")
         print("  python migrador.py clientes.csv")
         print("  python migrador.py clientes.csv servicos.csv")
+        print("  python migrador.py --delta clientes.csv servicos.csv")
+        print("\n--delta: reimporta só RAs novos ou alterados (status, valor_total)")
         print("\nFormato CSV: separador ';', encoding UTF-8")
         print("\nColunas para clientes.csv:")
         print("  nome;endereco;telefone;documento")
@@ -210,14 +286,14 @@ def main():
         return
 
     # Primeiro argumento: CSV de clientes
-    if len(sys.argv) >= 2:
-        print(f"\n→ Importando clientes de: {sys.argv[1]}")
-        importar_clientes(sys.argv[1])
+    if len(args) >= 1:
+        print(f"\n→ Importando clientes de: {args[0]}")
+        importar_clientes(args[0])
 
     # Segundo argumento (opcional): CSV de serviços
-    if len(sys.argv) >= 3:
-        print(f"\n→ Importando serviços de: {sys.argv[2]}")
-        importar_servicos(sys.argv[2])
+    if len(args) >= 2:
+        print(f"\n→ Importando serviços de: {args[1]}")
+        importar_servicos(args[1], delta=delta)
 
     print("\n✓ Migração concluída!")
 
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+monitor_dados.py — Detecção de alterações no banco (várias estações)
+Sistema Oficina 2026
+
+Uma conexão fica aberta só para ler PRAGMA data_version a cada
+INTERVALO_MS: o valor muda quando outra conexão (outra estação ou outra
+thread deste processo) grava no banco, e ler não custa nada além do
+cabeçalho do arquivo. Só quando muda o journal é consultado para saber
+quais tabelas foram alteradas. Gravações feitas por database.py neste
+processo também chegam pelo gancho database.ao_alterar().
+
+Os assinantes são chamados na thread do Tk com o conjunto de tabelas
+alteradas; sem alteração, nada é chamado e nada além do PRAGMA é lido.
+"""
+
+import threading
+import sqlite3
+
+import database
+
+INTERVALO_MS = 1000
+
+
+class MonitorDados:
+    """Verifica alterações pelo after() de uma janela Tk (ou objeto com after/after_cancel)."""
+
+    def __init__(self, janela, intervalo_ms=INTERVALO_MS):
+        self.janela = janela
+        self.intervalo_ms = intervalo_ms
+        self._conn = None
+        self._versao = None
+        self._seq = 0              # último journal.seq já visto
+        self._gravadas = set()     # tabelas gravadas neste processo (None = banco trocado)
+        self._lock = threading.Lock()
+        self._assinantes = []
+        self._agendado = None
+        database.ao_alterar(self._ao_gravar)
+
+    def assinar(self, callback, tabelas=None):
+        """callback(alteradas) quando alguma de `tabelas` (None = qualquer) mudar."""
+        self._assinantes.append((set(tabelas) if tabelas else None, callback))
+
+    def iniciar(self):
+        if self._agendado is None:
+            self._agendado = self.janela.after(self.intervalo_ms, self._verificar)
+
+    def parar(self):
+        if self._agendado is not None:
+            self.janela.after_cancel(self._agendado)
+            self._agendado = None
+        self._fechar()
+
+    def descartar_pendentes(self):
+        """
+        A tela vai reler tudo agora: o que mudou até aqui não precisa
+        gerar outra atualização na próxima verificação.
+        """
+        with self._lock:
+            self._gravadas &= {None}  # restauração ainda exige reconectar
+        try:
+            if self._conn is not None:
+                self._versao = self._conn.execute("PRAGMA data_version").fetchone()[0]
+                self._seq = self._ultimo_seq()
+        except sqlite3.Error:
+            self._fechar()
+
+    # ─── interno ───
+    def _ao_gravar(self, tabela):
+        # Chamado na thread que gravou: só anota
+        with self._lock:
+            self._gravadas.add(tabela)
+
+    def _conectar(self):
+        self._conn = sqlite3.connect(database.DB_PATH)
+        self._versao = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        self._seq = self._ultimo_seq()
+
+    def _fechar(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+            self._conn = None
+
+    def _ultimo_seq(self):
+        try:
+            return self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM journal").fetchone()[0]
+        except sqlite3.OperationalError:
+            return 0  # banco sem journal
+
+    def _tabelas_no_journal(self):
+        try:
+            linhas = self._conn.execute(
+                "SELECT tabela, MAX(seq) FROM journal WHERE seq > ? GROUP BY tabela", (self._seq,)
+            ).fetchall()
+        except sqlite3.OperationalError:
+            return set(database.TABELAS_JOURNAL)
+        if linhas:
+            self._seq = max(seq for _, seq in linhas)
+        return {tabela for tabela, _ in linhas}
+
+    def _verificar(self):
+        self._agendado = None
+        with self._lock:
+            alteradas, self._gravadas = self._gravadas, set()
+        try:
+            if None in alteradas:
+                # Banco restaurado (arquivo substituído): reconecta e considera tudo alterado
+                self._fechar()
+                alteradas = set(database.TABELAS_JOURNAL)
+            if self._conn is None:
+                self._conectar()
+            else:
+                versao = self._conn.execute("PRAGMA data_version").fetchone()[0]
+                if versao != self._versao:
+                    self._versao = versao
+                    alteradas |= self._tabelas_no_journal()
+        except sqlite3.Error as e:
+            print(f"[MONITOR] Falha ao verificar alteracoes: {e}")
+            self._fechar()
+        if alteradas:
+            self._avisar(alteradas)
+        self._agendado = self.janela.after(self.intervalo_ms, self._verificar)
+
+    def _avisar(self, alteradas):
+        for tabelas, callback in self._assinantes:
+            if tabelas is None or tabelas & alteradas:
+                try:
+                    callback(alteradas)
+                except Exception as e:
+                    print(f"[MONITOR] Erro ao avisar alteracao: {e}")
@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+"""
+oficina.py — Linha de comando para operações em lote (sem interface gráfica)
+Sistema Oficina 2026
+
+Usa as mesmas funções da interface (database, print_engine, backup,
+relatorio_financeiro). Listagens saem em streaming, linha a linha; com
+--json cada registro é um objeto JSON por linha (JSON Lines), bom para
+jq e outros scripts. Mensagens e erros dos módulos vão para o stderr, o
+stdout fica só com os dados.
+
+Uso:
+    python -m oficina listar --status Pronto --de 2026-01-01 --json
+    python -m oficina clientes --busca silva
+    python -m oficina mostrar 2026001
+    python -m oficina status Entregue 2026001 2026002
+    python -m oficina status Entregue --filtro-status Pronto --ate 2026-06-30 --simular
+    python -m oficina listar --status Pronto --json | jq -r .ra | python -m oficina status Entregue -
+    python -m oficina exportar csv --de 2026-01-01 --saida os_2026.csv
+    python -m oficina relatorio --mes 2026-10
+    python -m oficina pdf --de 2026-10-01 --ate 2026-10-31 --mesclar outubro.pdf
+    python -m oficina backup | backup --listar
+    python -m oficina restaurar 2026-10-01 --destino copia.db
+    python -m oficina restaurar 2026-10-01 --ate "2026-10-01 15:30:00" --destino copia.db
+    python -m oficina exportar-zip dados.zip [--base anterior.zip]
+    python -m oficina restaurar-zip dados.zip
+    python -m oficina importar-clientes antigos.csv
+"""
+
+import os
+import sys
+import csv
+import json
+import calendar
+import argparse
+import contextlib
+
+import database
+
+# Mesmos status dos botões da tela de detalhes da OS
+STATUS_OS = ["Aberto", "Aguardando Peca", "Pronto", "Entregue"]
+LOTE = 500
+
+CAMPOS_OS = ["ra", "data_entrada", "cliente_nome", "aparelho", "status",
+             "valor_total", "desconto", "valor_final", "forma_pagamento"]
+CAMPOS_CLIENTE = ["id", "nome", "telefone", "documento", "endereco", "data_cadastro"]
+
+
+# ──────────────────────────── SAÍDA ────────────────────────────
+
+class Saida:
+    """stdout dos dados: JSON Lines com --json, colunas separadas por tab sem."""
+
+    def __init__(self, arquivo, como_json):
+        self.arquivo = arquivo
+        self.como_json = como_json
+        self._cabecalho = False
+
+    def registro(self, dados, campos=None):
+        if self.como_json:
+            self.arquivo.write(json.dumps(dados, ensure_ascii=False) + "\n")
+            return
+        campos = campos or list(dados)
+        if not self._cabecalho:
+            self.arquivo.write("\t".join(campos) + "\n")
+            self._cabecalho = True
+        self.arquivo.write("\t".join("" if dados.get(c) is None else str(dados.get(c)) for c in campos) + "\n")
+
+    def resultado(self, dados, texto):
+        """Resumo de um comando: objeto JSON ou a frase `texto`."""
+        self.arquivo.write((json.dumps(dados, ensure_ascii=False) if self.como_json else texto) + "\n")
+
+
+def _ras_entrada(args):
+    """RAs dos argumentos; '-' lê um por linha do stdin (ex.: saída de listar)."""
+    for ra in args.ras:
+        if ra == "-":
+            for linha in sys.stdin:
+                linha = linha.strip()
+                if linha:
+                    yield linha
+        else:
+            yield ra
+
+
+def _periodo(args):
+    if getattr(args, "mes", None):
+        ano, mes = (int(p) for p in args.mes.split("-"))
+        return f"{ano}-{mes:02d}-01", f"{ano}-{mes:02d}-{calendar.monthrange(ano, mes)[1]:02d}"
+    return args.de, args.ate
+
+
+# ──────────────────────────── COMANDOS ────────────────────────────
+
+def cmd_listar(args, saida):
+    n = 0
+    for srv in database.iterar_servicos_periodo(args.de, args.ate, lote=LOTE, status=args.status, busca=args.busca):
+        saida.registro(srv, CAMPOS_OS)
+        n += 1
+        if args.limite and n >= args.limite:
+            break
+    return 0
+
+
+def cmd_clientes(args, saida):
+    if args.busca:
+        for cli in database.buscar_clientes(args.busca, limite=args.limite or -1):
+            saida.registro(cli, CAMPOS_CLIENTE)
+        return 0
+    n, offset = 0, 0
+    while True:
+        pagina = database.listar_clientes_pagina(offset, LOTE)
+        for cli in pagina:
+            saida.registro(cli, CAMPOS_CLIENTE)
+            n += 1
+            if args.limite and n >= args.limite:
+                return 0
+        if len(pagina) < LOTE:
+            return 0
+        offset += LOTE
+
+
+def cmd_mostrar(args, saida):
+    srv = database.obter_servico(args.ra)
+    if not srv:
+        print(f"[CLI] OS {args.ra} nao encontrada.")
+        return 1
+    srv["pecas"] = database.listar_pecas(args.ra)
+    if saida.como_json:
+        saida.resultado(srv, "")
+    else:
+        for campo, valor in srv.items():
+            if campo != "pecas":
+                saida.arquivo.write(f"{campo}\t{'' if valor is None else valor}\n")
+        for p in srv["pecas"]:
+            saida.arquivo.write(f"peca\t{p['descricao']}\t{p['valor_unitario']:.2f}\n")
+    return 0
+
+
+def cmd_status(args, saida):
+    ras = list(_ras_entrada(args))
+    if args.de or args.ate or args.filtro_status:
+        ras += database.listar_ras(args.de, args.ate, args.filtro_status)
+    ras = list(dict.fromkeys(ras))
+    if not ras:
+        print("[CLI] Nenhuma OS selecionada.")
+        return 1
+    falhas = 0
+    for ra in ras:
+        if args.simular:
+            ok = database.obter_servico(ra) is not None
+        else:
+            ok = database.atualizar_status(ra, args.novo_status)
+        falhas += not ok
+        saida.registro({"ra": ra, "status": args.novo_status, "ok": ok, "simulado": args.simular},
+                       ["ra", "status", "ok", "simulado"])
+    print(f"[CLI] {len(ras) - falhas} de {len(ras)} OS {'seriam alteradas' if args.simular else 'alteradas'} para '{args.novo_status}'.")
+    return 1 if falhas else 0
+
+
+def cmd_exportar(args, saida):
+    destino = open(args.saida, "w", encoding="utf-8", newline="") if args.saida else contextlib.nullcontext(saida.arquivo)
+    n = 0
+    with destino as f:
+        linhas = database.iterar_servicos_periodo(args.de, args.ate, lote=LOTE, status=args.status, busca=args.busca)
+        if args.formato == "csv":
+            escritor = csv.DictWriter(f, fieldnames=CAMPOS_OS, delimiter=";", extrasaction="ignore")
+            escritor.writeheader()
+            for srv in linhas:
+                escritor.writerow(srv)
+                n += 1
+        else:
+            # Array JSON escrito item a item (arquivo válido sem montar a lista na memória)
+            f.write("[")
+            for srv in linhas:
+                f.write(("," if n else "") + "\n" + json.dumps(srv, ensure_ascii=False))
+                n += 1
+            f.write("\n]\n")
+    if args.saida:
+        saida.resultado({"arquivo": args.saida, "os": n}, f"{n} OS exportadas para {args.saida}")
+    return 0
+
+
+def cmd_relatorio(args, saida):
+    import relatorio_financeiro
+    de, ate = _periodo(args)
+    if not (de and ate):
+        print("[CLI] Informe --mes ou --de e --ate.")
+        return 2
+    r = relatorio_financeiro.gerar_relatorio(de, ate, args.saida)
+    if not r:
+        return 1
+    saida.resultado(r, r["caminho"])
+    return 0
+
+
+def cmd_pdf(args, saida):
+    import print_engine
+    ras = list(_ras_entrada(args))
+    if args.de or args.ate or args.status:
+        ras += database.listar_ras(args.de, args.ate, args.status)
+    if not ras:
+        print("[CLI] Nenhuma OS selecionada.")
+        return 1
+    r = print_engine.gerar_pdfs_lote(ras, processos=args.processos, mesclar_em=args.mesclar)
+    for caminho in r.get("caminhos", []):
+        saida.registro({"pdf": caminho}, ["pdf"])
+    return 0 if r.get("caminhos") else 1
+
+
+def cmd_backup(args, saida):
+    import backup
+    if args.listar:
+        for data in backup.listar_backups():
+            saida.registro({"data": data}, ["data"])
+        return 0
+    ok = backup.realizar_backup()
+    saida.resultado({"ok": ok}, "Backup realizado." if ok else "Backup nao realizado (ja existe hoje ou erro).")
+    return 0 if ok else 1
+
+
+def cmd_restaurar(args, saida):
+    import backup
+    import recuperacao
+    if os.path.abspath(args.destino) == os.path.abspath(database.DB_PATH):
+        print("[CLI] O destino nao pode ser o banco em uso; restaure numa copia.")
+        return 2
+    if args.ate:
+        # So a hora: vale no dia DATA
+        momento = args.ate if "-" in args.ate else f"{args.data} {args.ate}"
+        ok = recuperacao.recuperar_ate(momento, args.destino) is not None
+        texto = f"Banco como estava em {momento}: {args.destino}"
+    else:
+        ok = backup.restaurar_backup(args.data, args.destino)
+        texto = f"Backup de {args.data} restaurado em: {args.destino}"
+    saida.resultado({"ok": ok, "arquivo": args.destino}, texto if ok else "Falha na restauracao.")
+    return 0 if ok else 1
+
+
+def cmd_exportar_zip(args, saida):
+    ok = database.exportar_dados(args.destino, base_zip=args.base)
+    saida.resultado({"ok": bool(ok), "arquivo": args.destino}, f"Exportado: {args.destino}" if ok else "Falha na exportacao.")
+    return 0 if ok else 1
+
+
+def cmd_restaurar_zip(args, saida):
+    if not args.sim:
+        resposta = input(f"Restaurar {args.arquivo} sobrescreve o banco atual. Continuar? [s/N] ") if sys.stdin.isatty() else ""
+        if resposta.strip().lower() != "s":
+            print("[CLI] Cancelado (use --sim para confirmar sem perguntar).")
+            return 1
+    ok = database.importar_dados(args.arquivo)
+    saida.resultado({"ok": ok}, "Dados restaurados." if ok else "Falha na restauracao.")
+    return 0 if ok else 1
+
+
+def cmd_importar_clientes(args, saida):
+    # Mesma ordem de tentativas da tela Configurações
+    try:
+        importados, duplicados, erros = database.importar_clientes_csv(args.csv, encoding="utf-8")
+    except Exception:
+        importados, duplicados, erros = database.importar_clientes_csv(args.csv, encoding="latin-1")
+    saida.resultado({"importados": importados, "duplicados": duplicados, "erros": erros},
+                    f"Importados: {importados}  Duplicados: {duplicados}  Erros: {erros}")
+    return 0
+
+
+# ──────────────────────────── ARGUMENTOS ────────────────────────────
+
+def _criar_parser():
+    comum = argparse.ArgumentParser(add_help=False)
+    comum.add_argument("--json", action="store_true", help="saida em JSON (um objeto por linha nas listagens)")
+
+    filtros = argparse.ArgumentParser(add_help=False)
+    filtros.add_argument("--de", help="data de entrada inicial (YYYY-MM-DD)")
+    filtros.add_argument("--ate", help="data de entrada final (YYYY-MM-DD)")
+
+    parser = argparse.ArgumentParser(prog="python -m oficina", description="Sistema Oficina 2026 - operacoes pela linha de comando.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("listar", parents=[comum, filtros], help="lista OS (mais antigas primeiro)")
+    p.add_argument("--status")
+    p.add_argument("--busca", help="RA ou nome do cliente")
+    p.add_argument("--limite", type=int)
+    p.set_defaults(func=cmd_listar)
+
+    p = sub.add_parser("clientes", parents=[comum], help="lista ou busca clientes")
+    p.add_argument("--busca", help="nome ou telefone")
+    p.add_argument("--limite", type=int)
+    p.set_defaults(func=cmd_clientes)
+
+    p = sub.add_parser("mostrar", parents=[comum], help="detalhes e pecas de uma OS")
+    p.add_argument("ra")
+    p.set_defaults(func=cmd_mostrar)
+
+    p = sub.add_parser("status", parents=[comum, filtros], help="altera o status de varias OS")
+    p.add_argument("novo_status", choices=STATUS_OS)
+    p.add_argument("ras", nargs="*", help="RAs ('-' = ler do stdin)")
+    p.add_argument("--filtro-status", help="seleciona as OS com este status (junto com --de/--ate)")
+    p.add_argument("--simular", action="store_true", help="so mostra o que seria alterado")
+    p.set_defaults(func=cmd_status)
+
+    p = sub.add_parser("exportar", parents=[comum, filtros], help="exporta OS em CSV ou JSON")
+    p.add_argument("formato", choices=["csv", "json"])
+    p.add_argument("--status")
+    p.add_argument("--busca")
+    p.add_argument("--saida", help="arquivo (padrao: stdout)")
+    p.set_defaults(func=cmd_exportar)
+
+    p = sub.add_parser("relatorio", parents=[comum, filtros], help="relatorio financeiro em PDF")
+    p.add_argument("--mes", help="mes inteiro (YYYY-MM)")
+    p.add_argument("--saida", help="arquivo PDF")
+    p.set_defaults(func=cmd_relatorio)
+
+    p = sub.add_parser("pdf", parents=[comum, filtros], help="gera PDFs de OS em lote (sem abrir)")
+    p.add_argument("ras", nargs="*", help="RAs ('-' = ler do stdin)")
+    p.add_argument("--status")
+    p.add_argument("--processos", type=int)
+    p.add_argument("--mesclar", help="tambem gera um PDF unico com todas")
+    p.set_defaults(func=cmd_pdf)
+
+    p = sub.add_parser("backup", parents=[comum], help="backup do dia (ou --listar)")
+    p.add_argument("--listar", action="store_true")
+    p.set_defaults(func=cmd_backup)
+
+    p = sub.add_parser("restaurar", parents=[comum], help="remonta um backup diario num arquivo (nao mexe no banco)")
+    p.add_argument("data", help="data do backup (YYYY-MM-DD)")
+    p.add_argument("--ate", help='reaplica o journal ate "YYYY-MM-DD HH:MM:SS" (ou so HH:MM:SS no dia DATA)')
+    p.add_argument("--destino", required=True, help="arquivo .db a gerar")
+    p.set_defaults(func=cmd_restaurar)
+
+    p = sub.add_parser("exportar-zip", parents=[comum], help="banco, config, PDFs e backups num ZIP")
+    p.add_argument("destino")
+    p.add_argument("--base", help="ZIP anterior (exportacao incremental)")
+    p.set_defaults(func=cmd_exportar_zip)
+
+    p = sub.add_parser("restaurar-zip", parents=[comum], help="restaura um ZIP exportado (sobrescreve o banco)")
+    p.add_argument("arquivo")
+    p.add_argument("--sim", action="store_true", help="nao pedir confirmacao")
+    p.set_defaults(func=cmd_restaurar_zip)
+
+    p = sub.add_parser("importar-clientes", parents=[comum], help="importa clientes de um CSV (programa antigo)")
+    p.add_argument("csv")
+    p.set_defaults(func=cmd_importar_clientes)
+    return parser
+
+
+def main(argv=None):
+    """Ponto de entrada CLI. Retorna o código de saída."""
+    args = _criar_parser().parse_args(argv)
+    database.init_db()
+    saida = Saida(sys.stdout, args.json)
+    try:
+        # Prints dos módulos ([ERRO DB], [PDF]...) vão para o stderr
+        with contextlib.redirect_stdout(sys.stderr):
+            return args.func(args, saida)
+    except BrokenPipeError:
+        # Ex.: `| head`; evita o erro de novo ao fechar o stdout
+        sys.stdout = open(os.devnull, "w")
+        return 0
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
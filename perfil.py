@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+perfil.py — Perfilamento opcional de ações (cProfile + tracemalloc)
+Sistema Oficina 2026
+
+Funções marcadas com @perfilar("nome") rodam sob cProfile e tracemalloc
+quando o perfilamento está ligado (variável de ambiente OFICINA_PERFIL=1
+ou "Perfilar acoes" = 1 em Configurações). Cada chamada gera, em
+Diagnostico/perfis/:
+    <data>_<nome>.pstats   abrir com: python -m pstats arquivo.pstats
+    <data>_<nome>.txt      tempo, pico de memória, funções mais caras e
+                           linhas que mais alocaram
+Só os MAX_ARQUIVOS perfis mais recentes são mantidos.
+
+tracemalloc conta as alocações de todas as threads enquanto a ação roda.
+Desligado, o custo é um teste de booleano por chamada. Só uma ação é
+perfilada por vez: chamadas aninhadas ou simultâneas (outra thread) rodam
+normalmente e entram, se for o caso, no perfil da que já está em curso.
+"""
+
+import os
+import io
+import time
+import threading
+import functools
+from datetime import datetime
+
+from tempos_inicio import DIAGNOSTICO_DIR
+
+PERFIS_DIR = os.path.join(DIAGNOSTICO_DIR, "perfis")
+MAX_ARQUIVOS = 60           # perfis (pares .pstats + .txt)
+TOP_FUNCOES = 30
+TOP_ALOCACOES = 25
+QUADROS_TRACEMALLOC = 10
+
+
+def _sim(valor):
+    return str(valor or "").strip().lower() in ("1", "s", "sim", "true")
+
+
+PELO_AMBIENTE = _sim(os.environ.get("OFICINA_PERFIL"))
+_ativo = PELO_AMBIENTE
+_em_curso = threading.Lock()
+_contador = 0
+
+
+def ativo():
+    return _ativo
+
+
+def ativar(ligar=True):
+    """Liga/desliga em tempo de execução."""
+    global _ativo
+    _ativo = bool(ligar)
+
+
+def configurar(valor):
+    """Aplica a opção "perfilar" do config.json; OFICINA_PERFIL=1 liga de qualquer jeito."""
+    ativar(PELO_AMBIENTE or _sim(valor))
+
+
+def perfilar(nome=None):
+    """Decorador: perfila a função quando o perfilamento estiver ligado."""
+    def decorador(funcao):
+        rotulo = nome or funcao.__name__
+
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            if not _ativo or not _em_curso.acquire(blocking=False):
+                return funcao(*args, **kwargs)
+            try:
+                return _executar(rotulo, funcao, args, kwargs)
+            finally:
+                _em_curso.release()
+        return envolvida
+    return decorador
+
+
+def _executar(rotulo, funcao, args, kwargs):
+    import cProfile
+    import tracemalloc
+
+    iniciou_tracemalloc = not tracemalloc.is_tracing()
+    if iniciou_tracemalloc:
+        tracemalloc.start(QUADROS_TRACEMALLOC)
+    tracemalloc.reset_peak()
+    perfil = cProfile.Profile()
+    inicio = time.perf_counter()
+    erro = None
+    try:
+        perfil.enable()
+    except ValueError:
+        # Outro perfilador já ativo (Python 3.12+ só permite um)
+        if iniciou_tracemalloc:
+            tracemalloc.stop()
+        return funcao(*args, **kwargs)
+    try:
+        return funcao(*args, **kwargs)
+    except BaseException as e:
+        erro = e
+        raise
+    finally:
+        perfil.disable()
+        segundos = time.perf_counter() - inicio
+        foto = tracemalloc.take_snapshot()
+        _, pico = tracemalloc.get_traced_memory()
+        if iniciou_tracemalloc:
+            tracemalloc.stop()
+        try:
+            _gravar(rotulo, perfil, foto, segundos, pico, erro)
+        except Exception as e:
+            print(f"[PERFIL] Falha ao gravar perfil de {rotulo}: {e}")
+
+
+def _gravar(rotulo, perfil, foto, segundos, pico, erro):
+    import pstats
+    import tracemalloc
+    global _contador
+
+    os.makedirs(PERFIS_DIR, exist_ok=True)
+    _contador += 1
+    # pid no nome: o lote de PDFs pode perfilar em vários processos ao mesmo tempo
+    base = os.path.join(PERFIS_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}_{_contador:03d}_{rotulo}")
+    perfil.dump_stats(f"{base}.pstats")
+
+    texto = io.StringIO()
+    texto.write(f"Acao: {rotulo}\nData: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    texto.write(f"Tempo: {segundos * 1000:.1f} ms\nPico de memoria (tracemalloc): {pico / 1024:.0f} KB\n")
+    if erro is not None:
+        texto.write(f"Terminou com erro: {erro!r}\n")
+    texto.write(f"\n=== {TOP_FUNCOES} funcoes com maior tempo acumulado ===\n")
+    pstats.Stats(perfil, stream=texto).strip_dirs().sort_stats("cumulative").print_stats(TOP_FUNCOES)
+    texto.write(f"\n=== {TOP_ALOCACOES} linhas que mais alocaram (ainda vivas no fim) ===\n")
+    foto = foto.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+    for est in foto.statistics("lineno")[:TOP_ALOCACOES]:
+        quadro = est.traceback[0]
+        texto.write(f"{est.size / 1024:10.1f} KB {est.count:8d}x  {quadro.filename}:{quadro.lineno}\n")
+    with open(f"{base}.txt", "w", encoding="utf-8") as f:
+        f.write(texto.getvalue())
+    _rotacionar()
+    print(f"[PERFIL] {rotulo}: {segundos * 1000:.0f} ms, pico {pico / 1024:.0f} KB -> {base}.txt")
+
+
+def _rotacionar():
+    try:
+        perfis = sorted(n[:-len(".pstats")] for n in os.listdir(PERFIS_DIR) if n.endswith(".pstats"))
+    except OSError:
+        return
+    for nome in perfis[:-MAX_ARQUIVOS]:
+        for ext in (".pstats", ".txt"):
+            try:
+                os.remove(os.path.join(PERFIS_DIR, nome + ext))
+            except OSError:
+                pass
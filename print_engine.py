@@ -7,14 +7,29 @@ PDF A4 com duas vias: Loja (superior) + Cliente (inferior).
 Layout profissional com cores azul e amarelo.
 """
 
+import io
 import os
 import sys
+import json
+import time
+import argparse
+import sqlite3
+import hashlib
 import subprocess
+import threading
+import unicodedata
+from itertools import repeat
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
 from reportlab.lib.colors import HexColor, black, white
 from reportlab.pdfgen import canvas
-from database import obter_servico, listar_pecas
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+import arquivo_pdf
+import perfil
+from database import obter_servico, listar_pecas, obter_servicos_lote, listar_pecas_lote, listar_ras
 
 # ──────────────────────────── CONSTANTES ────────────────────────────
 
@@ -32,7 +47,7 @@ CINZA       = HexColor("#888888")
 CINZA_CLARO = HexColor("#e8eef5")
 BRANCO      = white
 
-# Dados da empresa (sobrescritos pelo config.json via main.py)
+# Dados da empresa (sobrescritos pelo config.json ao importar o módulo)
 EMPRESA = {
     "nome": "ELETRONICA EXEMPLO",
     "endereco": "Rua Exemplo, 123 - Centro - Cidade/UF",
@@ -40,6 +55,11 @@ EMPRESA = {
     "cnpj": "00.000.000/0001-00",
 }
 
+# Campos do config.json que aparecem no PDF ou escolhem a fonte. Só eles entram
+# nas chaves do cache: o resto (impressora térmica, busca, diagnóstico...) não
+# muda o layout e não pode invalidar PDFs já gerados.
+CAMPOS_LAYOUT = ("nome", "endereco", "telefone", "cnpj", "fonte_ttf", "fonte_ttf_negrito")
+
 TERMO_GARANTIA = (
     "TERMO DE GARANTIA: Garantia de 90 dias a partir da data de entrega, conforme CDC (Lei 8.078/90). "
     "Nao cobre defeitos por mau uso, quedas, oscilacao de energia ou violacao por terceiros. "
@@ -48,72 +68,155 @@ TERMO_GARANTIA = (
 
 PDF_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "PDFs")
 
+# Cache de renderizacao: hash das entradas de cada OS_<ra>.pdf ja gerado.
+# Incrementar TEMPLATE_VERSAO sempre que o layout do PDF mudar.
+TEMPLATE_VERSAO = 1
+# Indice SQLite com uma linha por RA: gravar um PDF e um upsert, e a
+# interface e a linha de comando usam o mesmo arquivo sem perder entradas
+# uma da outra. O cache_pdf.json das versoes anteriores e importado uma vez.
+CACHE_PDF_PATH = os.path.join(PDF_DIR, "cache_pdf.db")
+_cache_local = threading.local()  # uma conexao por thread (fila de impressao, pool)
+
 
 def _garantir_diretorio():
     if not os.path.exists(PDF_DIR):
         os.makedirs(PDF_DIR)
 
 
+# ──────────────────────────── TEXTO / FONTES ────────────────────────────
+
+# Fonte em uso: Helvetica (padrao) ou a TTF embutida registrada por usar_fonte_ttf
+FONTE = "Helvetica"
+FONTE_NEGRITO = "Helvetica-Bold"
+
+# Procurada nesta ordem quando EMPRESA["fonte_ttf"] / OFICINA_FONTE_TTF nao estao definidos
+FONTES_TTF_PADRAO = [
+    (os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts", "DejaVuSans.ttf"),
+     os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts", "DejaVuSans-Bold.ttf")),
+]
+
+_SUBSTITUICOES = {
+    '\u2014': '-', '\u2013': '-', '\u2018': "'", '\u2019': "'",
+    '\u201c': '"', '\u201d': '"', '\u2026': '...', '\u2022': '*',
+}
+
+
+class _TabelaTexto(dict):
+    """
+    Tabela para str.translate: substituicoes fixas + fallback memoizado.
+    Cada caractere novo e decidido uma unica vez (mantido, sem acento ou '?')
+    e o resultado fica na propria tabela.
+    """
+
+    def __init__(self, aceita):
+        super().__init__({ord(k): v for k, v in _SUBSTITUICOES.items()})
+        self.aceita = aceita
+
+    def __missing__(self, cp):
+        ch = chr(cp)
+        if self.aceita(ch):
+            valor = ch
+        else:
+            base = "".join(c for c in unicodedata.normalize("NFKD", ch) if not unicodedata.combining(c))
+            valor = base if base and all(self.aceita(c) for c in base) else "?"
+        self[cp] = valor
+        return valor
+
+
+def _aceita_winansi(ch):
+    # Fontes padrao do PDF usam WinAnsi (cp1252): acentos do portugues cabem
+    try:
+        ch.encode("cp1252")
+        return ch.isprintable()
+    except UnicodeEncodeError:
+        return False
+
+
+_TABELA_WINANSI = _TabelaTexto(_aceita_winansi)
+_TABELA_TTF = _TabelaTexto(str.isprintable)
+_tabela = _TABELA_WINANSI
+_fonte_configurada = False
+
+
 def _safe(text):
-    """Remove caracteres problematicos para Helvetica."""
+    """Normaliza o texto para a fonte em uso (mantem acentos, troca o que ela nao desenha)."""
     if not text:
         return ""
-    replacements = {
-        '\u2014': '-', '\u2013': '-', '\u2018': "'", '\u2019': "'",
-        '\u201c': '"', '\u201d': '"', '\u2026': '...', '\u2022': '*',
-        '\u00e7': 'c', '\u00c7': 'C',
-        '\u00e3': 'a', '\u00c3': 'A',
-        '\u00e1': 'a', '\u00c1': 'A',
-        '\u00e9': 'e', '\u00c9': 'E',
-        '\u00ed': 'i', '\u00cd': 'I',
-        '\u00f3': 'o', '\u00d3': 'O',
-        '\u00fa': 'u', '\u00da': 'U',
-        '\u00ea': 'e', '\u00ca': 'E',
-        '\u00f4': 'o', '\u00d4': 'O',
-        '\u00e2': 'a', '\u00c2': 'A',
-        '\u00f5': 'o', '\u00d5': 'O',
-        '\u00e0': 'a', '\u00c0': 'A',
-        '\u00fc': 'u', '\u00dc': 'U',
-        '\u00b0': 'o',
-    }
-    result = str(text)
-    for orig, repl in replacements.items():
-        result = result.replace(orig, repl)
-    # Remove qualquer char acima de 127 restante
-    result = result.encode('ascii', 'replace').decode('ascii')
-    return result
-
-
-def gerar_pdf_ra(ra_numero):
-    """Gera PDF da OS. Retorna caminho ou None."""
+    texto = str(text)
+    if texto.isascii():
+        return texto
+    return texto.translate(_tabela)
+
+
+def usar_fonte_ttf(regular, negrito=None):
+    """
+    Registra uma fonte TTF (embutida no PDF so com os glifos usados) e passa
+    a usa-la em todos os documentos. Retorna True se conseguiu.
+    """
+    global FONTE, FONTE_NEGRITO, _tabela
     try:
-        servico = obter_servico(ra_numero)
-        if not servico:
-            print(f"[PDF] Servico RA {ra_numero} nao encontrado.")
-            return None
-
-        pecas = listar_pecas(ra_numero)
-        _garantir_diretorio()
-        pdf_path = os.path.join(PDF_DIR, f"OS_{ra_numero}.pdf")
-
-        c = canvas.Canvas(pdf_path, pagesize=A4)
-        c.setTitle(f"OS {ra_numero}")
-
-        _desenhar_via(c, servico, pecas, y_offset=HALF_H, via_label="VIA DA LOJA")
-        _desenhar_via(c, servico, pecas, y_offset=0, via_label="VIA DO CLIENTE")
-
-        # Linha de corte
-        c.setStrokeColor(CINZA)
-        c.setDash(4, 3)
-        c.setLineWidth(0.5)
-        c.line(M, HALF_H, PAGE_W - M, HALF_H)
-        c.setFont("Helvetica", 6)
-        c.setFillColor(CINZA)
-        c.drawCentredString(PAGE_W / 2, HALF_H + 1.5 * mm, "CORTE AQUI")
-
-        c.save()
-        print(f"[PDF] OK: {pdf_path}")
-        _abrir_pdf(pdf_path)
+        pdfmetrics.registerFont(TTFont("OficinaTTF", regular))
+        if negrito and os.path.exists(negrito):
+            pdfmetrics.registerFont(TTFont("OficinaTTF-Bold", negrito))
+            FONTE_NEGRITO = "OficinaTTF-Bold"
+        else:
+            FONTE_NEGRITO = "OficinaTTF"
+        FONTE = "OficinaTTF"
+        _tabela = _TABELA_TTF
+        return True
+    except Exception as e:
+        print(f"[PDF] Fonte TTF indisponivel ({regular}): {e}")
+        return False
+
+
+def _configurar_fonte():
+    """Na primeira renderizacao, ativa a TTF configurada (se houver). Registro e feito uma vez por processo."""
+    global _fonte_configurada
+    if _fonte_configurada:
+        return
+    _fonte_configurada = True
+    escolhida = EMPRESA.get("fonte_ttf") or os.environ.get("OFICINA_FONTE_TTF")
+    candidatas = [(escolhida, EMPRESA.get("fonte_ttf_negrito"))] if escolhida else FONTES_TTF_PADRAO
+    for regular, negrito in candidatas:
+        if regular and os.path.exists(regular) and usar_fonte_ttf(regular, negrito):
+            return
+
+
+@lru_cache(maxsize=4096)
+def _largura_caractere(caractere, fonte):
+    return pdfmetrics.stringWidth(caractere, fonte, 1000)
+
+
+def _largura(texto, fonte, tamanho):
+    """Largura do texto: soma das larguras de cada caractere (cache por caractere/fonte)."""
+    return sum(_largura_caractere(c, fonte) for c in texto) * tamanho / 1000
+
+
+def _truncar(texto, fonte, tamanho, largura_max):
+    """Corta o texto com '...' para caber em largura_max (pontos), numa passada so."""
+    limite = largura_max * 1000 / tamanho
+    disponivel = limite - 3 * _largura_caractere(".", fonte)  # espaco se precisar das reticencias
+    total, corte = 0.0, None
+    for i, c in enumerate(texto):
+        total += _largura_caractere(c, fonte)
+        if corte is None and total > disponivel:
+            corte = i
+        if total > limite:
+            return texto[:corte] + "..."
+    return texto
+
+
+@perfil.perfilar()
+def gerar_pdf_ra(ra_numero, abrir=True, forcar=False):
+    """
+    Gera PDF da OS. Retorna caminho ou None.
+    Se a OS, as pecas e o modelo nao mudaram desde a ultima geracao,
+    reaproveita o arquivo existente (forcar=True sempre regera).
+    """
+    try:
+        pdf_path = preparar_pdf_ra(ra_numero, forcar=forcar)
+        if pdf_path and abrir:
+            _abrir_pdf(pdf_path)
         return pdf_path
 
     except Exception as e:
@@ -123,35 +226,290 @@ def gerar_pdf_ra(ra_numero):
         return None
 
 
+@perfil.perfilar()
+def preparar_pdf_ra(ra_numero, forcar=False):
+    """
+    Garante PDFs/OS_<ra>.pdf atualizado: renderiza em memoria (BytesIO) e
+    grava com rename atomico. Pode ser chamada fora da thread da interface
+    (ver fila_impressao.py). Retorna o caminho ou None se a OS nao existe.
+    """
+    servico = obter_servico(ra_numero)
+    if not servico:
+        print(f"[PDF] Servico RA {ra_numero} nao encontrado.")
+        return None
+
+    pecas = listar_pecas(ra_numero)
+    _garantir_diretorio()
+    pdf_path = os.path.join(PDF_DIR, f"OS_{ra_numero}.pdf")
+    chave = _chave_render(servico, pecas)
+    existente = None if forcar else _pdf_disponivel(ra_numero, pdf_path, chave)
+    if existente:
+        print(f"[PDF] Sem alteracoes, usando: {existente}")
+        return existente
+
+    buf = io.BytesIO()
+    _renderizar(buf, [(servico, pecas)])
+    tmp_path = f"{pdf_path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(buf.getvalue())
+    os.replace(tmp_path, pdf_path)
+    _registrar_cache({ra_numero: (pdf_path, chave)})
+    print(f"[PDF] OK: {pdf_path}")
+    return pdf_path
+
+
+def gerar_pdfs_lote(ras, processos=None, mesclar_em=None):
+    """
+    Gera o PDF de varios RAs em processos paralelos, sem abrir visualizador.
+    Servicos e pecas sao buscados em duas consultas antes de distribuir.
+    Com mesclar_em, gera tambem um unico PDF com todas as OS (uma por pagina).
+    Retorna dict com caminhos, paginas, segundos e paginas_por_s.
+    """
+    inicio = time.perf_counter()
+    ras = list(dict.fromkeys(ras))
+    servicos = obter_servicos_lote(ras)
+    pecas = listar_pecas_lote(ras)
+    for ra in ras:
+        if ra not in servicos:
+            print(f"[PDF] Servico RA {ra} nao encontrado.")
+    itens = [(servicos[ra], pecas.get(ra, [])) for ra in ras if ra in servicos]
+
+    caminhos = []
+    gerados = []
+    if itens:
+        _garantir_diretorio()
+        empresa = dict(EMPRESA)
+        # So vai para os processos o que mudou desde a ultima geracao
+        chaves = {}
+        pendentes = []
+        for servico, pcs in itens:
+            ra = servico["ra"]
+            pdf_path = os.path.join(PDF_DIR, f"OS_{ra}.pdf")
+            chaves[ra] = _chave_render(servico, pcs)
+            existente = _pdf_disponivel(ra, pdf_path, chaves[ra])
+            caminhos.append(existente or pdf_path)
+            if not existente:
+                pendentes.append((servico, pcs))
+
+        processos = max(1, processos or os.cpu_count() or 1)
+        if processos == 1 or (len(pendentes) <= 1 and not mesclar_em):
+            gerados = _renderizar_lote(pendentes, empresa, PDF_DIR)
+            if mesclar_em:
+                _renderizar_mesclado(itens, empresa, mesclar_em)
+        else:
+            # Lotes pequenos para equilibrar a carga entre os processos
+            tam = max(1, len(pendentes) // (processos * 4))
+            lotes = [pendentes[i:i + tam] for i in range(0, len(pendentes), tam)]
+            with ProcessPoolExecutor(max_workers=processos) as ex:
+                mescla = ex.submit(_renderizar_mesclado, itens, empresa, mesclar_em) if mesclar_em else None
+                for parte in ex.map(_renderizar_lote, lotes, repeat(empresa), repeat(PDF_DIR)):
+                    gerados.extend(parte)
+                if mescla:
+                    mescla.result()
+        _registrar_cache({s["ra"]: (os.path.join(PDF_DIR, f"OS_{s['ra']}.pdf"), chaves[s["ra"]])
+                          for s, _ in pendentes})
+
+    segundos = time.perf_counter() - inicio
+    paginas = len(gerados) + (len(itens) if mesclar_em else 0)
+    pps = paginas / segundos if segundos > 0 else 0.0
+    print(f"[PDF] Lote: {len(caminhos)} OS ({len(caminhos) - len(gerados)} sem alteracoes), "
+          f"{paginas} paginas geradas em {segundos:.2f}s ({pps:.1f} pag/s)")
+    if mesclar_em and itens:
+        print(f"[PDF] Documento combinado: {mesclar_em}")
+    return {"caminhos": caminhos, "paginas": paginas, "segundos": segundos, "paginas_por_s": pps}
+
+
+def _empresa_layout():
+    """Parte de EMPRESA (e da fonte escolhida por variavel de ambiente) que muda o PDF."""
+    dados = {campo: EMPRESA.get(campo) for campo in CAMPOS_LAYOUT}
+    dados["fonte_ambiente"] = os.environ.get("OFICINA_FONTE_TTF")
+    return dados
+
+
+def _chave_render(servico, pecas):
+    """Hash de tudo que define o PDF: OS, pecas, dados da empresa, termo e modelo."""
+    _configurar_fonte()
+    bruto = json.dumps([TEMPLATE_VERSAO, FONTE, servico, pecas, _empresa_layout(), TERMO_GARANTIA],
+                       sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(bruto.encode("utf-8")).hexdigest()
+
+
+def _conexao_cache():
+    conn = getattr(_cache_local, "conn", None)
+    if conn is None or _cache_local.caminho != CACHE_PDF_PATH:
+        os.makedirs(os.path.dirname(CACHE_PDF_PATH), exist_ok=True)
+        conn = sqlite3.connect(CACHE_PDF_PATH, timeout=10)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS renders (
+                ra TEXT PRIMARY KEY,
+                hash TEXT NOT NULL,
+                tamanho INTEGER NOT NULL,
+                mtime INTEGER NOT NULL
+            )
+        """)
+        _importar_cache_json(conn)
+        _cache_local.conn, _cache_local.caminho = conn, CACHE_PDF_PATH
+    return conn
+
+
+def _importar_cache_json(conn):
+    """Traz para o indice o cache_pdf.json antigo (se existir) e o apaga."""
+    antigo = os.path.join(os.path.dirname(CACHE_PDF_PATH), "cache_pdf.json")
+    try:
+        with open(antigo, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return
+    with conn:
+        conn.executemany("INSERT OR IGNORE INTO renders VALUES (?, ?, ?, ?)",
+                         [(ra, e["hash"], e["tamanho"], e["mtime"]) for ra, e in cache.items()
+                          if isinstance(e, dict) and e.keys() >= {"hash", "tamanho", "mtime"}])
+    try:
+        os.remove(antigo)
+    except OSError:
+        pass
+    print(f"[PDF] Cache antigo importado: {len(cache)} PDFs")
+
+
+def _confere(entrada, pdf_path):
+    """entrada = (hash, tamanho, mtime): True se o arquivo ainda e o registrado."""
+    try:
+        st = os.stat(pdf_path)
+    except OSError:
+        return False
+    return entrada[1] == st.st_size and entrada[2] == st.st_mtime_ns
+
+
+def _em_cache(ra, pdf_path, chave):
+    """True se OS_<ra>.pdf foi gerado com a mesma chave e nao foi mexido depois."""
+    try:
+        entrada = _conexao_cache().execute(
+            "SELECT hash, tamanho, mtime FROM renders WHERE ra = ?", (ra,)).fetchone()
+    except sqlite3.Error as e:
+        print(f"[PDF] Falha ao consultar o cache: {e}")
+        return False
+    return entrada is not None and entrada[0] == chave and _confere(entrada, pdf_path)
+
+
+def _pdf_disponivel(ra, pdf_path, chave):
+    """Caminho de um PDF ja gerado com `chave`: o arquivo solto ou o extraido do pacote mensal."""
+    if _em_cache(ra, pdf_path, chave):
+        return pdf_path
+    return arquivo_pdf.extrair(ra, chave)
+
+
+def _chave_atual(ra):
+    """
+    Chave de um PDF de antes do cache (sem registro): calculada com os dados
+    de hoje, para a reimpressao usar o arquivado enquanto a OS nao mudar.
+    None se a OS nao existe mais (o PDF fica no pacote so como arquivo).
+    """
+    servico = obter_servico(ra)
+    if not servico:
+        return None
+    return _chave_render(servico, listar_pecas(ra))
+
+
+def compactar_pdfs(idade_dias=arquivo_pdf.IDADE_MINIMA_DIAS):
+    """Move PDFs antigos para os pacotes mensais (ver arquivo_pdf.py), levando a chave do cache."""
+    try:
+        conn = _conexao_cache()
+        entradas = conn.execute("SELECT ra, hash, tamanho, mtime FROM renders").fetchall()
+    except sqlite3.Error as e:
+        print(f"[PDF] Falha ao ler o cache, compactacao adiada: {e}")
+        return None
+    chaves = {e[0]: e[1] for e in entradas if _confere(e[1:], os.path.join(PDF_DIR, f"OS_{e[0]}.pdf"))}
+    resultado = arquivo_pdf.compactar(idade_dias, chaves, chave_de=_chave_atual)
+    removidos = [(e[0],) for e in entradas if not os.path.exists(os.path.join(PDF_DIR, f"OS_{e[0]}.pdf"))]
+    if removidos:
+        try:
+            with conn:
+                conn.executemany("DELETE FROM renders WHERE ra = ?", removidos)
+        except sqlite3.Error as e:
+            print(f"[PDF] Falha ao limpar o cache: {e}")
+    return resultado
+
+
+def _registrar_cache(gerados):
+    """Grava {ra: (caminho, chave)} no indice (um upsert por RA)."""
+    linhas = []
+    for ra, (pdf_path, chave) in gerados.items():
+        try:
+            st = os.stat(pdf_path)
+        except OSError:
+            continue
+        linhas.append((ra, chave, st.st_size, st.st_mtime_ns))
+    if not linhas:
+        return
+    try:
+        conn = _conexao_cache()
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO renders VALUES (?, ?, ?, ?)", linhas)
+    except sqlite3.Error as e:
+        print(f"[PDF] Nao foi possivel gravar o cache: {e}")
+
+
+def _renderizar_lote(itens, empresa, pasta):
+    """Executado nos processos do lote: um arquivo OS_<ra>.pdf por item."""
+    EMPRESA.update(empresa)
+    caminhos = []
+    for servico, pecas in itens:
+        pdf_path = os.path.join(pasta, f"OS_{servico['ra']}.pdf")
+        _renderizar(pdf_path, [(servico, pecas)])
+        caminhos.append(pdf_path)
+    return caminhos
+
+
+def _renderizar_mesclado(itens, empresa, destino):
+    EMPRESA.update(empresa)
+    _renderizar(destino, itens)
+    return destino
+
+
+def _renderizar(destino, itens):
+    """Desenha uma pagina A4 (duas vias) por (servico, pecas) em destino."""
+    _configurar_fonte()
+    c = canvas.Canvas(destino, pagesize=A4)
+    if len(itens) == 1:
+        c.setTitle(f"OS {itens[0][0]['ra']}")
+    else:
+        c.setTitle(f"Ordens de Servico ({len(itens)})")
+    for servico, pecas in itens:
+        _desenhar_pagina(c, servico, pecas)
+        c.showPage()
+    c.save()
+
+
+def _desenhar_pagina(c, servico, pecas):
+    _form_via_fixa(c)
+    _desenhar_via(c, servico, pecas, y_offset=HALF_H, via_label="VIA DA LOJA")
+    _desenhar_via(c, servico, pecas, y_offset=0, via_label="VIA DO CLIENTE")
+
+    # Linha de corte
+    c.setStrokeColor(CINZA)
+    c.setDash(4, 3)
+    c.setLineWidth(0.5)
+    c.line(M, HALF_H, PAGE_W - M, HALF_H)
+    c.setFont(FONTE, 6)
+    c.setFillColor(CINZA)
+    c.drawCentredString(PAGE_W / 2, HALF_H + 1.5 * mm, "CORTE AQUI")
+
+
 def _desenhar_via(c, servico, pecas, y_offset, via_label):
     """Desenha uma via completa (metade da pagina)."""
     x = M
     y_top = y_offset + HALF_H - M
     y = y_top
 
-    # ─── FAIXA HEADER ───
-    header_h = 20 * mm
-    # Fundo azul escuro
-    c.setFillColor(AZUL_ESCURO)
-    c.roundRect(x, y - header_h, CW, header_h, 3 * mm, fill=1, stroke=0)
-
-    # Faixa amarela lateral
-    c.setFillColor(AMARELO)
-    c.rect(x, y - header_h, 5 * mm, header_h, fill=1, stroke=0)
-
-    # Nome da empresa
-    c.setFillColor(BRANCO)
-    c.setFont("Helvetica-Bold", 13)
-    c.drawString(x + 8 * mm, y - 7 * mm, _safe(EMPRESA["nome"]))
-
-    # Dados da empresa
-    c.setFont("Helvetica", 7)
-    c.setFillColor(HexColor("#cccccc"))
-    c.drawString(x + 8 * mm, y - 11.5 * mm, _safe(f'{EMPRESA["endereco"]}  |  Tel: {EMPRESA["telefone"]}'))
-    c.drawString(x + 8 * mm, y - 15 * mm, _safe(f'CNPJ: {EMPRESA["cnpj"]}'))
+    # ─── PARTES FIXAS (form XObject, ver _form_via_fixa) ───
+    c.saveState()
+    c.translate(0, y_offset)
+    c.doForm(_form_via_fixa(c))
+    c.restoreState()
+    header_h = 20 * mm  # altura da faixa desenhada no form
 
     # Via label
-    c.setFont("Helvetica-Bold", 8)
+    c.setFont(FONTE_NEGRITO, 8)
     c.setFillColor(AMARELO)
     c.drawRightString(x + CW - 5 * mm, y - 7 * mm, _safe(via_label))
 
@@ -164,11 +522,11 @@ def _desenhar_via(c, servico, pecas, y_offset, via_label):
     c.setFillColor(AMARELO)
     c.roundRect(x, y - ra_box_h, ra_box_w, ra_box_h, 2 * mm, fill=1, stroke=0)
     c.setFillColor(AZUL_ESCURO)
-    c.setFont("Helvetica-Bold", 14)
+    c.setFont(FONTE_NEGRITO, 14)
     c.drawString(x + 3 * mm, y - 7.5 * mm, _safe(f"RA: {servico['ra']}"))
 
     # Data e Status
-    c.setFont("Helvetica", 8)
+    c.setFont(FONTE, 8)
     c.setFillColor(black)
     c.drawRightString(x + CW, y - 3 * mm, _safe(f"Data: {servico.get('data_entrada', '')}"))
     c.drawRightString(x + CW, y - 7.5 * mm, _safe(f"Status: {servico.get('status', '')}"))
@@ -178,7 +536,7 @@ def _desenhar_via(c, servico, pecas, y_offset, via_label):
     # ─── DADOS DO CLIENTE ───
     y = _titulo_secao(c, x, y, "DADOS DO CLIENTE")
 
-    c.setFont("Helvetica", 7.5)
+    c.setFont(FONTE, 7.5)
     c.setFillColor(black)
     dados_cli = [
         f"Nome: {servico.get('cliente_nome', '')}",
@@ -194,7 +552,7 @@ def _desenhar_via(c, servico, pecas, y_offset, via_label):
     # ─── DADOS DO APARELHO ───
     y = _titulo_secao(c, x, y, "DADOS DO APARELHO")
 
-    c.setFont("Helvetica", 7.5)
+    c.setFont(FONTE, 7.5)
     c.setFillColor(black)
     dados_ap = [
         f"Aparelho: {servico.get('aparelho', '')}    Marca: {servico.get('marca', '')}    Modelo: {servico.get('modelo', '')}",
@@ -202,9 +560,7 @@ def _desenhar_via(c, servico, pecas, y_offset, via_label):
         f"Defeito: {servico.get('defeito_relatado', '')}",
     ]
     for info in dados_ap:
-        texto = _safe(info)
-        if len(texto) > 110:
-            texto = texto[:110] + "..."
+        texto = _truncar(_safe(info), FONTE, 7.5, CW - 4 * mm)
         c.drawString(x + 2 * mm, y, texto)
         y -= 3.2 * mm
 
@@ -215,7 +571,7 @@ def _desenhar_via(c, servico, pecas, y_offset, via_label):
         y = _titulo_secao(c, x, y, "PECAS / SERVICOS")
 
         # Header da tabela
-        c.setFont("Helvetica-Bold", 7)
+        c.setFont(FONTE_NEGRITO, 7)
         c.setFillColor(AZUL)
         c.drawString(x + 2 * mm, y, "Descricao")
         c.drawRightString(x + CW - 2 * mm, y, "Valor (R$)")
@@ -227,12 +583,10 @@ def _desenhar_via(c, servico, pecas, y_offset, via_label):
         c.line(x, y, x + CW, y)
         y -= 3 * mm
 
-        c.setFont("Helvetica", 7)
+        c.setFont(FONTE, 7)
         c.setFillColor(black)
         for peca in pecas:
-            desc = _safe(peca.get("descricao", ""))
-            if len(desc) > 70:
-                desc = desc[:70] + "..."
+            desc = _truncar(_safe(peca.get("descricao", "")), FONTE, 7, CW - 30 * mm)
             valor = peca.get("valor_unitario", 0)
             c.drawString(x + 2 * mm, y, desc)
             c.drawRightString(x + CW - 2 * mm, y, f"{valor:.2f}")
@@ -251,7 +605,7 @@ def _desenhar_via(c, servico, pecas, y_offset, via_label):
     c.setFillColor(CINZA_CLARO)
     c.roundRect(x, y - box_h, CW, box_h, 2 * mm, fill=1, stroke=0)
 
-    c.setFont("Helvetica", 7)
+    c.setFont(FONTE, 7)
     c.setFillColor(CINZA)
 
     if desconto > 0:
@@ -260,64 +614,121 @@ def _desenhar_via(c, servico, pecas, y_offset, via_label):
         if forma_pgto:
             c.drawRightString(x + CW - 3 * mm, y - 4 * mm, _safe(f"Pagamento: {forma_pgto}"))
 
-        c.setFont("Helvetica-Bold", 10)
+        c.setFont(FONTE_NEGRITO, 10)
         c.setFillColor(AZUL_ESCURO)
         c.drawString(x + 3 * mm, y - 10 * mm, f"TOTAL: R$ {valor_final:.2f}")
     else:
         if forma_pgto:
             c.drawString(x + 3 * mm, y - 5.5 * mm, _safe(f"Pagamento: {forma_pgto}"))
-        c.setFont("Helvetica-Bold", 9)
+        c.setFont(FONTE_NEGRITO, 9)
         c.setFillColor(AZUL_ESCURO)
         c.drawRightString(x + CW - 3 * mm, y - 5.5 * mm, f"TOTAL: R$ {valor_final:.2f}")
 
     y -= box_h + 3 * mm
 
+
+def _chave_empresa():
+    """Identifica a versao dos dados fixos (empresa + termo) usada nos forms."""
+    bruto = json.dumps(_empresa_layout(), sort_keys=True, ensure_ascii=False) + TERMO_GARANTIA + FONTE
+    return hashlib.sha1(bruto.encode("utf-8")).hexdigest()[:12]
+
+
+def _form_via_fixa(c):
+    """
+    Cabecalho, assinaturas e termo de uma via, desenhados uma unica vez por
+    documento como form XObject (beginForm/doForm) e reaproveitados nas duas
+    vias de cada pagina e em todas as paginas. Retorna o nome do form.
+    """
+    nome = f"via_fixa_{_chave_empresa()}"
+    if not c.hasForm(nome):
+        c.beginForm(nome)
+        _desenhar_partes_fixas(c)
+        c.endForm()
+    return nome
+
+
+def _desenhar_partes_fixas(c):
+    """Partes da via que so dependem de EMPRESA, com a via em y_offset=0."""
+    x = M
+    y = HALF_H - M
+
+    # ─── FAIXA HEADER ───
+    header_h = 20 * mm
+    # Fundo azul escuro
+    c.setFillColor(AZUL_ESCURO)
+    c.roundRect(x, y - header_h, CW, header_h, 3 * mm, fill=1, stroke=0)
+
+    # Faixa amarela lateral
+    c.setFillColor(AMARELO)
+    c.rect(x, y - header_h, 5 * mm, header_h, fill=1, stroke=0)
+
+    # Nome da empresa
+    c.setFillColor(BRANCO)
+    c.setFont(FONTE_NEGRITO, 13)
+    c.drawString(x + 8 * mm, y - 7 * mm, _safe(EMPRESA["nome"]))
+
+    # Dados da empresa
+    c.setFont(FONTE, 7)
+    c.setFillColor(HexColor("#cccccc"))
+    c.drawString(x + 8 * mm, y - 11.5 * mm, _safe(f'{EMPRESA["endereco"]}  |  Tel: {EMPRESA["telefone"]}'))
+    c.drawString(x + 8 * mm, y - 15 * mm, _safe(f'CNPJ: {EMPRESA["cnpj"]}'))
+
     # ─── ASSINATURA ───
-    sig_y = y_offset + M + 14 * mm
+    sig_y = M + 14 * mm
     c.setStrokeColor(black)
     c.setDash(1, 0)
     c.setLineWidth(0.3)
     c.line(x, sig_y, x + 65 * mm, sig_y)
     c.line(x + 75 * mm, sig_y, x + CW, sig_y)
 
-    c.setFont("Helvetica", 6)
+    c.setFont(FONTE, 6)
     c.setFillColor(CINZA)
     c.drawString(x, sig_y - 3 * mm, "Assinatura do Cliente")
     c.drawString(x + 75 * mm, sig_y - 3 * mm, "Assinatura da Loja")
 
     # ─── TERMO ───
-    c.setFont("Helvetica", 4.5)
+    c.setFont(FONTE, 4.5)
     c.setFillColor(CINZA)
-    termo_y = y_offset + M + 1 * mm
-    linhas = _quebrar_texto(_safe(TERMO_GARANTIA), 170)
-    for lt in linhas:
+    termo_y = M + 1 * mm
+    # Desenha de baixo para cima: a ultima linha fica mais perto da margem
+    for lt in reversed(_linhas_termo(TERMO_GARANTIA, FONTE, 4.5, CW)):
         c.drawString(x, termo_y, lt)
         termo_y += 2 * mm
 
 
+@lru_cache(maxsize=8)
+def _linhas_termo(texto, fonte, tamanho, largura_max):
+    return tuple(_quebrar_texto(_safe(texto), fonte, tamanho, largura_max))
+
+
 def _titulo_secao(c, x, y, titulo):
     """Desenha o titulo de uma secao e retorna y atualizado."""
     c.setFillColor(AZUL)
     c.roundRect(x, y - 4 * mm, CW, 4 * mm, 1 * mm, fill=1, stroke=0)
-    c.setFont("Helvetica-Bold", 7)
+    c.setFont(FONTE_NEGRITO, 7)
     c.setFillColor(BRANCO)
     c.drawString(x + 2 * mm, y - 3 * mm, titulo)
     return y - 7 * mm
 
 
-def _quebrar_texto(texto, max_chars):
-    palavras = texto.split()
+def _quebrar_texto(texto, fonte, tamanho, largura_max):
+    """Quebra em linhas pela largura medida (stringWidth) e nao por contagem de caracteres."""
+    espaco = _largura(" ", fonte, tamanho)
     linhas = []
-    linha_atual = ""
-    for palavra in palavras:
-        if len(linha_atual) + len(palavra) + 1 <= max_chars:
-            linha_atual += (" " if linha_atual else "") + palavra
-            pass
+    atual = []
+    largura_atual = 0.0
+    for palavra in texto.split():
+        lp = _largura(palavra, fonte, tamanho)
+        nova = lp if not atual else largura_atual + espaco + lp
+        if atual and nova > largura_max:
+            linhas.append(" ".join(atual))
+            atual = [palavra]
+            largura_atual = lp
         else:
-            linhas.append(linha_atual)
-            linha_atual = palavra
-    if linha_atual:
-        linhas.append(linha_atual)
+            atual.append(palavra)
+            largura_atual = nova
+    if atual:
+        linhas.append(" ".join(atual))
     return linhas
 
 
@@ -333,8 +744,68 @@ def _abrir_pdf(pdf_path):
         print(f"[PDF] Nao foi possivel abrir: {e}")
 
 
+def imprimir_pdf(pdf_path):
+    """Envia o PDF para a impressora padrao do sistema (spooler)."""
+    try:
+        if sys.platform == "win32":
+            os.startfile(pdf_path, "print")
+        else:
+            subprocess.Popen(["lp", pdf_path])
+        return True
+    except Exception as e:
+        print(f"[PDF] Nao foi possivel imprimir: {e}")
+        return False
+
+
+def _carregar_empresa():
+    """Dados da empresa do config.json (mesmo arquivo usado pelo main.py)."""
+    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json")
+    try:
+        if os.path.exists(config_path):
+            with open(config_path, "r", encoding="utf-8") as f:
+                EMPRESA.update(json.load(f))
+    except Exception as e:
+        print(f"[PDF] Config ignorada: {e}")
+
+
+# Importado só na primeira impressão (ver main.py): os dados da empresa vêm junto
+_carregar_empresa()
+
+
+def main():
+    """Ponto de entrada CLI."""
+    parser = argparse.ArgumentParser(
+        description="Gera PDF de OS. Ex.: print_engine.py 2026001 | print_engine.py --batch --de 2026-01-01 --ate 2026-01-31"
+    )
+    parser.add_argument("ras", nargs="*", help="RAs a imprimir")
+    parser.add_argument("--batch", action="store_true", help="gera em lote, sem abrir visualizador")
+    parser.add_argument("--de", help="data de entrada inicial (YYYY-MM-DD)")
+    parser.add_argument("--ate", help="data de entrada final (YYYY-MM-DD)")
+    parser.add_argument("--status", help="filtra por status (ex.: Entregue)")
+    parser.add_argument("--mesclar", metavar="ARQUIVO.pdf", help="gera tambem um PDF unico com todas as OS")
+    parser.add_argument("--processos", type=int, default=None, help="processos paralelos (padrao: CPUs)")
+    parser.add_argument("--compactar", type=int, nargs="?", const=arquivo_pdf.IDADE_MINIMA_DIAS, metavar="DIAS",
+                        help="move PDFs sem alteracao ha DIAS dias para os pacotes mensais")
+    args = parser.parse_args()
+
+    if args.compactar is not None:
+        compactar_pdfs(args.compactar)
+        return
+    if not args.batch:
+        if not args.ras:
+            parser.print_usage()
+            return
+        gerar_pdf_ra(args.ras[0])
+        return
+
+    ras = list(args.ras)
+    if args.de or args.ate or args.status:
+        ras += listar_ras(args.de, args.ate, args.status)
+    if not ras:
+        print("[PDF] Nenhuma OS selecionada.")
+        return
+    gerar_pdfs_lote(ras, processos=args.processos, mesclar_em=args.mesclar)
+
+
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        gerar_pdf_ra(sys.argv[1])
-    else:
-        print("Uso: python print_engine.py <RA>")
+    main()
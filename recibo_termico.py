@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+recibo_termico.py — Recibo de entrada em impressora térmica (ESC/POS)
+Sistema Oficina 2026
+
+Alternativa rápida ao PDF A4 de duas vias: os mesmos dados de
+obter_servico / listar_pecas viram um fluxo ESC/POS para bobinas de 58 ou
+80 mm, enviado direto para a porta da impressora (ou para um arquivo).
+Cabeçalho da empresa e termo de garantia mudam raramente e ficam em cache.
+
+Uso:
+    python recibo_termico.py 2026001 [destino]
+"""
+
+import os
+import sys
+import unicodedata
+from functools import lru_cache
+
+import print_engine
+from database import obter_servico, listar_pecas
+
+# ──────────────────────────── ESC/POS ────────────────────────────
+
+ESC = b"\x1b"
+GS = b"\x1d"
+
+INICIAR = ESC + b"@"
+PAGINA_CP850 = ESC + b"t\x02"      # tabela de caracteres PC850 (acentos)
+ALINHAR_ESQ = ESC + b"a\x00"
+ALINHAR_CENTRO = ESC + b"a\x01"
+NEGRITO_ON = ESC + b"E\x01"
+NEGRITO_OFF = ESC + b"E\x00"
+DUPLO_ON = GS + b"!\x11"            # altura e largura em dobro
+DUPLO_OFF = GS + b"!\x00"
+CORTAR = GS + b"V\x42\x00"          # avança até a lâmina e corta (parcial)
+FINALIZAR = ESC + b"d\x03" + CORTAR   # 3 linhas em branco + corte
+
+CODIFICACAO = "cp850"
+
+# Colunas da fonte A em cada largura de bobina
+COLUNAS = {58: 32, 80: 48}
+LARGURA_PADRAO = 80
+
+# Porta padrão quando nem o destino nem o config.json indicam uma
+DESTINO_PADRAO = "LPT1" if sys.platform == "win32" else "/dev/usb/lp0"
+
+# Mesmas trocas do PDF A4 (travessão, aspas curvas, reticências...), feitas
+# antes de quebrar as linhas para a contagem de colunas já valer
+_TROCAS = str.maketrans(print_engine._SUBSTITUICOES)
+
+
+def _texto(valor):
+    return str(valor or "").translate(_TROCAS)
+
+
+@lru_cache(maxsize=2048)
+def _caractere(ch):
+    """Byte(s) do caractere na página de código, sem acento ou '?' se não couber."""
+    try:
+        return ch.encode(CODIFICACAO)
+    except UnicodeEncodeError:
+        base = "".join(c for c in unicodedata.normalize("NFKD", ch) if not unicodedata.combining(c))
+        try:
+            return base.encode(CODIFICACAO) if base else b"?"
+        except UnicodeEncodeError:
+            return b"?"
+
+
+def _cod(texto):
+    """Texto -> bytes da impressora (caracteres de controle viram espaço)."""
+    texto = _texto(texto)
+    if texto.isascii() and texto.isprintable():
+        return texto.encode("ascii")
+    return b"".join(_caractere(ch) if ch.isprintable() else b" " for ch in texto)
+
+
+def _quebrar(texto, colunas):
+    """Quebra por palavras em linhas de no máximo `colunas` caracteres."""
+    linhas, atual = [], ""
+    for palavra in _texto(texto).split():
+        while len(palavra) > colunas:
+            if atual:
+                linhas.append(atual)
+                atual = ""
+            linhas.append(palavra[:colunas])
+            palavra = palavra[colunas:]
+        if not atual:
+            atual = palavra
+        elif len(atual) + 1 + len(palavra) <= colunas:
+            atual += " " + palavra
+        else:
+            linhas.append(atual)
+            atual = palavra
+    if atual:
+        linhas.append(atual)
+    return linhas
+
+
+def _linha_valor(rotulo, valor, colunas):
+    """'rotulo ....... valor' ocupando a linha inteira."""
+    valor = f"{valor:.2f}"
+    rotulo = _texto(rotulo)[:max(0, colunas - len(valor) - 1)]
+    return rotulo + " " * (colunas - len(rotulo) - len(valor)) + valor
+
+
+@lru_cache(maxsize=8)
+def _cabecalho(colunas, nome, endereco, telefone, cnpj):
+    partes = [INICIAR, PAGINA_CP850, ALINHAR_CENTRO, NEGRITO_ON, DUPLO_ON]
+    # Em largura dupla cabe metade das colunas
+    partes += [_cod(l) + b"\n" for l in _quebrar(nome, colunas // 2)]
+    partes += [DUPLO_OFF, NEGRITO_OFF]
+    partes += [_cod(l) + b"\n" for l in _quebrar(endereco, colunas)]
+    if telefone:
+        partes.append(_cod(f"Tel: {telefone}") + b"\n")
+    if cnpj:
+        partes.append(_cod(f"CNPJ: {cnpj}") + b"\n")
+    partes += [ALINHAR_ESQ, b"-" * colunas + b"\n"]
+    return b"".join(partes)
+
+
+@lru_cache(maxsize=8)
+def _preambulo_garantia(colunas, termo):
+    linhas = _quebrar(termo, colunas)
+    return b"-" * colunas + b"\n" + b"".join(_cod(l) + b"\n" for l in linhas)
+
+
+def renderizar_recibo(servico, pecas, largura_mm=LARGURA_PADRAO):
+    """Bytes ESC/POS do recibo da OS (pronto para enviar à impressora)."""
+    colunas = COLUNAS.get(int(largura_mm), COLUNAS[LARGURA_PADRAO])
+    emp = print_engine.EMPRESA
+    partes = [
+        _cabecalho(colunas, emp.get("nome", ""), emp.get("endereco", ""), emp.get("telefone", ""), emp.get("cnpj", "")),
+        ALINHAR_CENTRO, NEGRITO_ON, DUPLO_ON, _cod(f"RA {servico['ra']}") + b"\n", DUPLO_OFF, NEGRITO_OFF,
+        _cod(f"Entrada: {servico.get('data_entrada', '')}") + b"\n",
+        ALINHAR_ESQ,
+    ]
+
+    def bloco(texto):
+        partes.extend(_cod(l) + b"\n" for l in _quebrar(texto, colunas))
+
+    bloco(f"Cliente: {servico.get('cliente_nome', '')}")
+    if servico.get("cliente_telefone"):
+        bloco(f"Tel: {servico.get('cliente_telefone')}")
+    aparelho = " ".join(str(servico.get(k) or "") for k in ("aparelho", "marca", "modelo")).strip()
+    bloco(f"Aparelho: {aparelho}")
+    if servico.get("numero_serie"):
+        bloco(f"N Serie: {servico.get('numero_serie')}")
+    bloco(f"Defeito: {servico.get('defeito_relatado', '')}")
+
+    if pecas:
+        partes.append(b"-" * colunas + b"\n")
+        for peca in pecas:
+            partes.append(_cod(_linha_valor(peca.get("descricao", ""), peca.get("valor_unitario", 0) or 0, colunas)) + b"\n")
+
+    valor_total = servico.get("valor_total", 0) or 0
+    desconto = servico.get("desconto", 0) or 0
+    valor_final = servico.get("valor_final", 0) or 0
+    partes.append(b"-" * colunas + b"\n")
+    if desconto > 0:
+        partes.append(_cod(_linha_valor("Subtotal", valor_total, colunas)) + b"\n")
+        partes.append(_cod(_linha_valor("Desconto", desconto, colunas)) + b"\n")
+    partes += [NEGRITO_ON, _cod(_linha_valor("TOTAL R$", valor_final, colunas)) + b"\n", NEGRITO_OFF]
+    if servico.get("forma_pagamento"):
+        bloco(f"Pagamento: {servico.get('forma_pagamento')}")
+
+    partes.append(_preambulo_garantia(colunas, print_engine.TERMO_GARANTIA))
+    partes += [b"\n", ALINHAR_CENTRO, b"_" * (colunas * 3 // 4) + b"\n", b"Assinatura do cliente\n", ALINHAR_ESQ]
+    partes.append(FINALIZAR)
+    return b"".join(partes)
+
+
+# ──────────────────────────── SAÍDA ────────────────────────────
+
+class ImpressoraArquivo:
+    """
+    Impressora falsa: cada recibo vira um arquivo .bin numa pasta.
+    Serve para testes e para conferir o recibo sem papel.
+    """
+
+    def __init__(self, pasta):
+        self.pasta = pasta
+        os.makedirs(pasta, exist_ok=True)
+
+    def write(self, dados):
+        n = len(self.trabalhos()) + 1
+        caminho = os.path.join(self.pasta, f"recibo_{n:04d}.bin")
+        with open(caminho, "wb") as f:
+            f.write(dados)
+        return len(dados)
+
+    def trabalhos(self):
+        return sorted(os.path.join(self.pasta, n) for n in os.listdir(self.pasta) if n.endswith(".bin"))
+
+    @staticmethod
+    def texto(caminho):
+        """Conteúdo legível de um trabalho (comandos ESC/POS removidos)."""
+        with open(caminho, "rb") as f:
+            dados = f.read()
+        for cmd in (FINALIZAR, INICIAR, PAGINA_CP850, ALINHAR_ESQ, ALINHAR_CENTRO,
+                    NEGRITO_ON, NEGRITO_OFF, DUPLO_ON, DUPLO_OFF):
+            dados = dados.replace(cmd, b"")
+        return dados.decode(CODIFICACAO)
+
+
+def enviar(dados, destino=None):
+    """
+    Envia bytes ESC/POS para `destino`: caminho de dispositivo/arquivo
+    (/dev/usb/lp0, LPT1, \\\\PC\\termica, recibo.bin) ou objeto com write().
+    """
+    destino = destino or print_engine.EMPRESA.get("impressora_termica") or DESTINO_PADRAO
+    if hasattr(destino, "write"):
+        destino.write(dados)
+        return True
+    try:
+        with open(destino, "wb") as f:
+            f.write(dados)
+        return True
+    except OSError as e:
+        print(f"[RECIBO] Nao foi possivel enviar para {destino}: {e}")
+        return False
+
+
+def imprimir_recibo(ra_numero, destino=None, largura_mm=None):
+    """Gera e envia o recibo térmico da OS. Retorna True se enviado."""
+    servico = obter_servico(ra_numero)
+    if not servico:
+        print(f"[RECIBO] Servico RA {ra_numero} nao encontrado.")
+        return False
+    largura = largura_mm or print_engine.EMPRESA.get("largura_termica") or LARGURA_PADRAO
+    try:
+        largura = int(largura)
+    except (TypeError, ValueError):
+        largura = LARGURA_PADRAO
+    dados = renderizar_recibo(servico, listar_pecas(ra_numero), largura)
+    return enviar(dados, destino)
+
+
+def main():
+    """Ponto de entrada CLI."""
+    if len(sys.argv) < 2:
+        print("Uso: python recibo_termico.py <RA> [destino]")
+        return
+    destino = sys.argv[2] if len(sys.argv) >= 3 else None
+    if imprimir_recibo(sys.argv[1], destino):
+        print(f"[RECIBO] OK: {destino or print_engine.EMPRESA.get('impressora_termica') or DESTINO_PADRAO}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+recuperacao.py — Recuperação ponto-a-ponto (backup diário + journal)
+Sistema Oficina 2026
+
+Restaura o último backup anterior ao momento pedido e reaplica o journal
+(alimentado por triggers em clientes, servicos e pecas) até esse momento.
+O banco atual não é alterado: o resultado vai para um arquivo separado.
+
+Uso:
+    python recuperacao.py "2026-10-19 16:59" [destino.db]
+"""
+
+import os
+import sys
+import json
+import sqlite3
+from datetime import datetime
+
+import backup
+import database
+
+
+def _normalizar_momento(momento):
+    """Aceita 'YYYY-MM-DD HH:MM[:SS]' e devolve 'YYYY-MM-DD HH:MM:SS'."""
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(momento.strip(), fmt).strftime("%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            continue
+    raise ValueError(f"momento inválido: {momento!r} (use YYYY-MM-DD HH:MM)")
+
+
+def escolher_backup(momento):
+    """Retorna (data, manifesto) do backup mais recente tirado até `momento`, ou None."""
+    escolhido = None
+    for data in backup.listar_backups():
+        manifesto = backup.ler_manifesto(data)
+        # Manifestos sem journal_seq são anteriores ao journal e não servem de base
+        if "journal_seq" not in manifesto:
+            continue
+        if manifesto.get("criado_em", "") <= momento:
+            escolhido = (data, manifesto)
+    return escolhido
+
+
+def recuperar_ate(momento, destino=None):
+    """
+    Gera em `destino` o banco como estava em `momento`.
+    Retorna o caminho do banco recuperado ou None.
+    """
+    try:
+        momento = _normalizar_momento(momento)
+        base = escolher_backup(momento)
+        if not base:
+            print(f"[RECUPERACAO] ✗ Nenhum backup anterior a {momento}.")
+            return None
+        data, manifesto = base
+
+        if not destino:
+            carimbo = momento.replace("-", "").replace(":", "").replace(" ", "_")
+            destino = os.path.join(backup.BACKUP_DIR, f"recuperado_{carimbo}.db")
+        if not backup.restaurar_backup(data, destino):
+            return None
+
+        aplicadas = _reaplicar_journal(destino, manifesto["journal_seq"], momento)
+        print(f"[RECUPERACAO] ✓ Backup {data} + {aplicadas} alterações até {momento}: {destino}")
+        return destino
+
+    except Exception as e:
+        print(f"[RECUPERACAO] ✗ Erro na recuperação: {e}")
+        return None
+
+
+def _reaplicar_journal(destino, seq_base, momento):
+    """Aplica em `destino` as entradas do journal atual com seq > seq_base e ts <= momento."""
+    origem = sqlite3.connect(database.DB_PATH)
+    conn = sqlite3.connect(destino)
+    aplicadas = 0
+    try:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN")
+        database.remover_triggers_journal(cursor)
+        linhas = origem.execute(
+            "SELECT seq, ts, tabela, op, linha, dados FROM journal WHERE seq > ? ORDER BY seq",
+            (seq_base,)
+        )
+        for seq, ts, tabela, op, linha, dados in linhas:
+            if ts[:19] > momento:
+                break
+            valores = json.loads(dados) if dados else {}
+            if op == "I":
+                cols = ", ".join(valores)
+                marcas = ", ".join("?" for _ in valores)
+                cursor.execute(
+                    f"INSERT OR REPLACE INTO {tabela} (rowid, {cols}) VALUES (?, {marcas})",
+                    (linha, *valores.values())
+                )
+            elif op == "U":
+                sets = ", ".join(f"{c} = ?" for c in valores)
+                cursor.execute(
+                    f"UPDATE {tabela} SET {sets} WHERE rowid = ?",
+                    (*valores.values(), linha)
+                )
+            elif op == "D":
+                cursor.execute(f"DELETE FROM {tabela} WHERE rowid = ?", (linha,))
+            # Mantém o journal do banco recuperado contínuo com o original
+            cursor.execute(
+                "INSERT INTO journal (seq, ts, tabela, op, linha, dados) VALUES (?, ?, ?, ?, ?, ?)",
+                (seq, ts, tabela, op, linha, dados)
+            )
+            aplicadas += 1
+        database.criar_triggers_journal(cursor)
+        conn.commit()
+        return aplicadas
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+        origem.close()
+
+
+def main():
+    """Ponto de entrada CLI."""
+    if len(sys.argv) < 2:
+        print("Uso: python recuperacao.py \"YYYY-MM-DD HH:MM\" [destino.db]")
+        print("\nBackups disponíveis:")
+        for data in backup.listar_backups():
+            print(f"  {data}")
+        return
+
+    destino = sys.argv[2] if len(sys.argv) >= 3 else None
+    caminho = recuperar_ate(sys.argv[1], destino)
+    if caminho:
+        print("\nConfira o banco recuperado e, com o programa fechado, substitua oficina.db por ele.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+relatorio_financeiro.py — Relatório financeiro em PDF (todas as OS de um período)
+Sistema Oficina 2026
+
+Lista cada OS do período com subtotal por dia e, no fim, o resumo por forma
+de pagamento. As OS são lidas do banco em lotes (database.iterar_servicos_periodo)
+e os flowables do platypus são criados sob demanda, então um ano inteiro
+não precisa caber na memória de uma vez.
+
+Uso:
+    python relatorio_financeiro.py --mes 2026-10
+    python relatorio_financeiro.py --de 2026-01-01 --ate 2026-12-31 [--saida ano.pdf]
+"""
+
+import os
+import time
+import argparse
+import calendar
+import itertools
+from functools import lru_cache
+from datetime import datetime
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.lib.colors import black, white
+from reportlab.platypus import BaseDocTemplate, PageTemplate, Frame, Table, TableStyle, Spacer
+
+import print_engine
+from print_engine import AZUL, AZUL_ESCURO, AMARELO, CINZA, CINZA_CLARO, _safe, _truncar
+from database import iterar_servicos_periodo
+
+MARGEM = 12 * mm
+LARGURA_UTIL = A4[0] - 2 * MARGEM
+
+# (título, largura) — soma = LARGURA_UTIL
+COLUNAS = [
+    ("RA", 18 * mm), ("Cliente", 46 * mm), ("Aparelho", 34 * mm), ("Status", 20 * mm),
+    ("Pagamento", 22 * mm), ("Bruto", 16 * mm), ("Desc.", 14 * mm), ("Final", 16 * mm),
+]
+TAMANHO_FONTE = 7
+
+LINHAS_POR_TABELA = 60      # linhas de OS por Table (o platypus quebra entre páginas)
+FLOWABLES_EM_MEMORIA = 16   # quantos flowables ficam prontos à frente do que está sendo paginado
+LOTE_BANCO = 500
+
+
+def _moeda(valor):
+    return f"{valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def _data_br(data):
+    try:
+        return datetime.strptime(data, "%Y-%m-%d").strftime("%d/%m/%Y")
+    except (TypeError, ValueError):
+        return data or "-"
+
+
+class _DocumentoSobDemanda(BaseDocTemplate):
+    """
+    Documento de uma página-modelo (moldura em todas as páginas) cujo build()
+    recebe um gerador de flowables. O laço é o do BaseDocTemplate.build, mas
+    a lista entregue a handle_flowable é reabastecida aos poucos, então só
+    FLOWABLES_EM_MEMORIA flowables (mais as partes de uma tabela quebrada
+    entre páginas) existem de cada vez.
+    """
+
+    def __init__(self, destino, moldura, **kwargs):
+        super().__init__(destino, **kwargs)
+        quadro = Frame(self.leftMargin, self.bottomMargin, self.width, self.height, id="normal")
+        self.addPageTemplates([PageTemplate(id="Relatorio", frames=quadro, onPage=moldura, pagesize=self.pagesize)])
+
+    def build(self, flowables):
+        self._startBuild()
+        canv = self.canv
+        canv._doctemplate = self
+        pendentes = []
+        try:
+            while True:
+                if len(pendentes) < FLOWABLES_EM_MEMORIA:
+                    pendentes.extend(itertools.islice(flowables, FLOWABLES_EM_MEMORIA - len(pendentes)))
+                if not pendentes:
+                    break
+                self.clean_hanging()
+                # Tira o primeiro da lista; se ele quebrar, as partes voltam para a frente
+                self.handle_flowable(pendentes)
+        finally:
+            del canv._doctemplate
+        self._endBuild()
+
+
+@lru_cache(maxsize=8)
+def _estilo_tabela(cabecalho, fonte, negrito):
+    comandos = [
+        ("FONT", (0, 0), (-1, -1), fonte, TAMANHO_FONTE),
+        ("ALIGN", (5, 0), (-1, -1), "RIGHT"),
+        ("TOPPADDING", (0, 0), (-1, -1), 1),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 1),
+        ("ROWBACKGROUNDS", (0, 1 if cabecalho else 0), (-1, -1), [white, CINZA_CLARO]),
+    ]
+    if cabecalho:
+        comandos += [
+            ("FONT", (0, 0), (-1, 0), negrito, TAMANHO_FONTE),
+            ("BACKGROUND", (0, 0), (-1, 0), AZUL),
+            ("TEXTCOLOR", (0, 0), (-1, 0), white),
+        ]
+    return TableStyle(comandos)
+
+
+def _tabela_os(linhas, cabecalho):
+    dados = ([[t for t, _ in COLUNAS]] if cabecalho else []) + linhas
+    t = Table(dados, colWidths=[w for _, w in COLUNAS], repeatRows=1 if cabecalho else 0)
+    t.setStyle(_estilo_tabela(cabecalho, print_engine.FONTE, print_engine.FONTE_NEGRITO))
+    return t
+
+
+def _tabela_subtotal(rotulos_valores, cor=AZUL_ESCURO):
+    """Linha única de totais alinhada às colunas de valores."""
+    t = Table([rotulos_valores], colWidths=[w for _, w in COLUNAS])
+    t.setStyle(TableStyle([
+        ("FONT", (0, 0), (-1, -1), print_engine.FONTE_NEGRITO, TAMANHO_FONTE),
+        ("TEXTCOLOR", (0, 0), (-1, -1), cor),
+        ("ALIGN", (5, 0), (-1, -1), "RIGHT"),
+        ("LINEABOVE", (0, 0), (-1, 0), 0.5, AZUL),
+        ("TOPPADDING", (0, 0), (-1, -1), 2),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+    ]))
+    return t
+
+
+def _linha_os(srv):
+    larguras = [w for _, w in COLUNAS]
+    fonte = print_engine.FONTE
+
+    def cel(texto, i):
+        return _truncar(_safe(texto or "-"), fonte, TAMANHO_FONTE, larguras[i] - 4)
+
+    return [
+        srv["ra"], cel(srv.get("cliente_nome"), 1), cel(srv.get("aparelho"), 2), cel(srv.get("status"), 3),
+        cel(srv.get("forma_pagamento"), 4), _moeda(srv.get("valor_total") or 0),
+        _moeda(srv.get("desconto") or 0), _moeda(srv.get("valor_final") or 0),
+    ]
+
+
+def _flowables(data_inicio, data_fim, totais):
+    """Gera os flowables do relatório enquanto percorre as OS; acumula os totais em `totais`."""
+    dia_atual, linhas, primeira_do_dia = None, [], True
+    dia = {"qtd": 0, "bruto": 0.0, "desconto": 0.0, "final": 0.0}
+    por_pagamento = totais["por_pagamento"]
+
+    def fechar_dia():
+        nonlocal linhas, primeira_do_dia
+        if linhas:
+            yield _tabela_os(linhas, primeira_do_dia)
+        yield _tabela_subtotal([
+            f"{_data_br(dia_atual)}", f"{dia['qtd']} OS", "", "", "",
+            _moeda(dia["bruto"]), _moeda(dia["desconto"]), _moeda(dia["final"]),
+        ])
+        linhas, primeira_do_dia = [], True
+
+    for srv in iterar_servicos_periodo(data_inicio, data_fim, lote=LOTE_BANCO):
+        data = srv.get("data_entrada") or ""
+        if data != dia_atual:
+            if dia_atual is not None:
+                yield from fechar_dia()
+            dia_atual = data
+            dia = {"qtd": 0, "bruto": 0.0, "desconto": 0.0, "final": 0.0}
+
+        bruto, desc, final = srv.get("valor_total") or 0, srv.get("desconto") or 0, srv.get("valor_final") or 0
+        for acum in (dia, totais):
+            acum["qtd"] += 1
+            acum["bruto"] += bruto
+            acum["desconto"] += desc
+            acum["final"] += final
+        pg = por_pagamento.setdefault(srv.get("forma_pagamento") or "Nao informado", [0, 0.0])
+        pg[0] += 1
+        pg[1] += final
+
+        linhas.append(_linha_os(srv))
+        if len(linhas) >= LINHAS_POR_TABELA:
+            yield _tabela_os(linhas, primeira_do_dia)
+            linhas, primeira_do_dia = [], False
+
+    if dia_atual is not None:
+        yield from fechar_dia()
+
+    # ─── RESUMO ───
+    yield Spacer(1, 6 * mm)
+    dados = [["Forma de pagamento", "OS", "Total (R$)"]]
+    for forma, (qtd, total) in sorted(por_pagamento.items(), key=lambda kv: -kv[1][1]):
+        dados.append([_safe(forma), str(qtd), _moeda(total)])
+    dados.append(["TOTAL DO PERIODO", str(totais["qtd"]), _moeda(totais["final"])])
+    t = Table(dados, colWidths=[60 * mm, 20 * mm, 35 * mm], hAlign="LEFT")
+    t.setStyle(TableStyle([
+        ("FONT", (0, 0), (-1, -1), print_engine.FONTE, 8),
+        ("FONT", (0, 0), (-1, 0), print_engine.FONTE_NEGRITO, 8),
+        ("FONT", (0, -1), (-1, -1), print_engine.FONTE_NEGRITO, 9),
+        ("BACKGROUND", (0, 0), (-1, 0), AZUL),
+        ("TEXTCOLOR", (0, 0), (-1, 0), white),
+        ("BACKGROUND", (0, -1), (-1, -1), AMARELO),
+        ("ALIGN", (1, 0), (-1, -1), "RIGHT"),
+        ("GRID", (0, 0), (-1, -1), 0.3, CINZA),
+    ]))
+    yield t
+    yield Spacer(1, 2 * mm)
+    yield _tabela_subtotal([
+        "Bruto / Desc. / Final", "", "", "", "",
+        _moeda(totais["bruto"]), _moeda(totais["desconto"]), _moeda(totais["final"]),
+    ], cor=black)
+
+
+def _desenhar_moldura(periodo):
+    titulo = _safe(f"{print_engine.EMPRESA.get('nome', '')} - Relatorio Financeiro")
+
+    def desenhar(c, doc):
+        c.saveState()
+        c.setFont(print_engine.FONTE_NEGRITO, 10)
+        c.setFillColor(AZUL_ESCURO)
+        c.drawString(MARGEM, A4[1] - 9 * mm, titulo)
+        c.setFont(print_engine.FONTE, 8)
+        c.drawRightString(A4[0] - MARGEM, A4[1] - 9 * mm, periodo)
+        c.setFillColor(CINZA)
+        c.drawRightString(A4[0] - MARGEM, 7 * mm, f"Pagina {doc.page}")
+        c.drawString(MARGEM, 7 * mm, f"Gerado em {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+        c.restoreState()
+
+    return desenhar
+
+
+def gerar_relatorio(data_inicio, data_fim, destino=None, abrir=False):
+    """
+    Gera o relatório de `data_inicio` a `data_fim` (YYYY-MM-DD, inclusivo).
+    Retorna {"caminho", "os", "faturado", "segundos"} ou None em caso de erro.
+    """
+    try:
+        inicio = time.perf_counter()
+        print_engine._configurar_fonte()
+        if not destino:
+            print_engine._garantir_diretorio()
+            destino = os.path.join(print_engine.PDF_DIR, f"Relatorio_{data_inicio}_{data_fim}.pdf")
+
+        periodo = f"{_data_br(data_inicio)} a {_data_br(data_fim)}"
+        doc = _DocumentoSobDemanda(
+            destino, _desenhar_moldura(periodo), pagesize=A4, leftMargin=MARGEM, rightMargin=MARGEM,
+            topMargin=14 * mm, bottomMargin=12 * mm, title=f"Relatorio Financeiro {periodo}",
+        )
+        totais = {"qtd": 0, "bruto": 0.0, "desconto": 0.0, "final": 0.0, "por_pagamento": {}}
+        doc.build(_flowables(data_inicio, data_fim, totais))
+
+        segundos = time.perf_counter() - inicio
+        print(f"[RELATORIO] OK: {destino} ({totais['qtd']} OS, {doc.page} paginas, {segundos:.1f}s)")
+        if abrir:
+            print_engine._abrir_pdf(destino)
+        return {"caminho": destino, "os": totais["qtd"], "faturado": totais["final"], "segundos": segundos}
+
+    except Exception as e:
+        print(f"[RELATORIO] Erro ao gerar relatorio: {e}")
+        return None
+
+
+def gerar_relatorio_mes(ano, mes, destino=None, abrir=False):
+    ultimo = calendar.monthrange(ano, mes)[1]
+    return gerar_relatorio(f"{ano}-{mes:02d}-01", f"{ano}-{mes:02d}-{ultimo:02d}", destino, abrir)
+
+
+def main():
+    """Ponto de entrada CLI."""
+    parser = argparse.ArgumentParser(description="Relatorio financeiro em PDF de um periodo.")
+    parser.add_argument("--mes", help="mes inteiro (YYYY-MM)")
+    parser.add_argument("--de", help="data inicial (YYYY-MM-DD)")
+    parser.add_argument("--ate", help="data final (YYYY-MM-DD)")
+    parser.add_argument("--saida", help="arquivo PDF de saida")
+    args = parser.parse_args()
+
+    if args.mes:
+        ano, mes = (int(p) for p in args.mes.split("-"))
+        gerar_relatorio_mes(ano, mes, args.saida)
+    elif args.de and args.ate:
+        gerar_relatorio(args.de, args.ate, args.saida)
+    else:
+        parser.print_usage()
+
+
+if __name__ == "__main__":
+    main()
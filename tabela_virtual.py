@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+"""
+tabela_virtual.py — Tabela virtualizada (linhas recicladas) para listas grandes
+Sistema Oficina 2026
+
+Só existem widgets para as linhas que cabem na tela. Ao rolar, as mesmas
+linhas recebem outros dados (configure), e os dados vêm da fonte em páginas
+de TAMANHO_PAGINA, com poucas páginas guardadas. Clicar no título de uma
+coluna ordena por ela (clicar de novo inverte).
+
+Fonte de dados: qualquer objeto com
+    contar() -> int
+    pagina(offset, limite, ordenar_por, decrescente) -> [dict]
+(ver FonteLista e FonteConsulta). Com um tarefas.Executor, contagem e páginas
+são buscadas em segundo plano e as linhas mostram "..." até chegarem.
+"""
+
+import math
+from collections import OrderedDict
+
+import customtkinter as ctk
+from theme import *
+
+TAMANHO_PAGINA = 100
+MAX_PAGINAS = 8
+LINHAS_POR_GIRO = 3
+LARGURA_ACOES = 0.14
+
+_ESPERA = object()  # marcador de registro cuja página ainda está sendo buscada
+
+
+class FonteLista:
+    """Fonte em memória, para listas curtas (ex.: últimas OS do dashboard)."""
+
+    def __init__(self, linhas):
+        self.linhas = list(linhas)
+        self._ordenadas = {}
+
+    def contar(self):
+        return len(self.linhas)
+
+    def pagina(self, offset, limite, ordenar_por=None, decrescente=False):
+        linhas = self.linhas
+        if ordenar_por:
+            chave = (ordenar_por, decrescente)
+            if chave not in self._ordenadas:
+                self._ordenadas[chave] = sorted(
+                    linhas, key=lambda r: _chave_ordem(r.get(ordenar_por)), reverse=decrescente)
+            linhas = self._ordenadas[chave]
+        return linhas[offset:offset + limite]
+
+
+class FonteConsulta:
+    """Fonte paginada no banco: funções de contagem e de página + filtros fixos."""
+
+    def __init__(self, contar, pagina, **filtros):
+        self._contar = contar
+        self._pagina = pagina
+        self.filtros = filtros
+
+    def contar(self):
+        return self._contar(**self.filtros)
+
+    def pagina(self, offset, limite, ordenar_por=None, decrescente=False):
+        if ordenar_por:
+            return self._pagina(offset, limite, ordenar_por, decrescente, **self.filtros)
+        return self._pagina(offset, limite, **self.filtros)
+
+
+def _chave_ordem(valor):
+    if valor is None:
+        return (0, 0)
+    if isinstance(valor, (int, float)):
+        return (1, valor)
+    return (2, str(valor).lower())
+
+
+class _Linha:
+    """Widgets de uma linha visível (reaproveitados para qualquer registro)."""
+
+    def __init__(self, tabela, indice_slot):
+        self.frame = ctk.CTkFrame(tabela.area, fg_color=COR_CARD, corner_radius=6, height=tabela.altura_linha - 2)
+        self.labels = []
+        self.valores = []
+        self.dados = None
+        rx = 0.01
+        for _, _, w in tabela.colunas:
+            lbl = ctk.CTkLabel(self.frame, text="", font=FONTE_PEQUENA, text_color=COR_TEXTO, anchor="w")
+            lbl.place(relx=rx, rely=0.5, anchor="w", relwidth=w)
+            self.labels.append(lbl)
+            self.valores.append(None)
+            rx += w
+        widgets = [self.frame] + self.labels
+        if tabela.acoes:
+            af = ctk.CTkFrame(self.frame, fg_color="transparent")
+            af.place(relx=rx, rely=0.5, anchor="w", relwidth=LARGURA_ACOES, relheight=0.9)
+            for k, (texto, cor, hover, _) in enumerate(tabela.acoes):
+                b = ctk.CTkButton(af, text=texto, width=40, height=26, font=("Segoe UI", 11), fg_color=cor, hover_color=hover,
+                                  command=lambda k=k: tabela._executar_acao(indice_slot, k))
+                b.pack(side="left", padx=2)
+                widgets.append(b)
+        for w in widgets:
+            tabela._ligar_roda(w)
+
+    def mostrar(self, dados, celulas, y):
+        """dados None = linha de espera (página ainda chegando)."""
+        self.dados = dados
+        for i, (lbl, cel) in enumerate(zip(self.labels, celulas)):
+            # configure só quando muda: redesenhar CTkLabel custa mais que comparar
+            if self.valores[i] != cel:
+                texto, cor = cel
+                lbl.configure(text=texto, text_color=cor)
+                self.valores[i] = cel
+        self.frame.place(x=0, y=y, relwidth=1)
+
+    def esconder(self):
+        self.dados = None
+        self.frame.place_forget()
+
+
+class TabelaVirtual(ctk.CTkFrame):
+    """
+    colunas: [(titulo, campo_para_ordenar ou None, largura relativa)]
+    formatar(linha) -> [(texto, cor)] na ordem das colunas
+    acoes: [(texto, cor, cor_hover, callback(linha))] botões no fim da linha
+    linhas_visiveis: altura fixa em linhas; sem ele a tabela ocupa o espaço do pai
+    """
+
+    def __init__(self, master, colunas, fonte, formatar, acoes=None, ordenar_por=None, decrescente=False,
+                 linhas_visiveis=None, altura_linha=40, mensagem_vazia="Nenhum registro.",
+                 executor=None, grupo=None, **kwargs):
+        super().__init__(master, fg_color="transparent", **kwargs)
+        self.colunas = colunas
+        self.formatar = formatar
+        self.acoes = acoes or []
+        self.altura_linha = altura_linha
+        self.ordenar_por = ordenar_por
+        self.decrescente = decrescente
+        self.mensagem_vazia = mensagem_vazia
+        self.fonte = fonte
+        self.executor = executor
+        self.grupo = grupo
+        self.total = 0
+        self.topo = 0
+        self._paginas = OrderedDict()
+        self._pedidas = set()
+        self._anteriores = {}  # páginas da leitura anterior, mostradas até a nova chegar (atualizar)
+        self._geracao = 0   # muda a cada recarga/ordenação; respostas antigas são ignoradas
+        self._carregando = False
+        self._celulas_espera = [("...", COR_TEXTO_SEC)] + [("", COR_TEXTO_SEC)] * (len(colunas) - 1)
+        self._linhas = []
+        self._altura = (linhas_visiveis or 0) * altura_linha
+
+        # Cabeçalho (clicável para ordenar)
+        header = ctk.CTkFrame(self, fg_color=COR_SIDEBAR, corner_radius=8, height=38)
+        header.pack(fill="x", pady=(0, 2))
+        header.pack_propagate(False)
+        self._titulos = []
+        rx = 0.01
+        for titulo, campo, w in colunas:
+            lbl = ctk.CTkLabel(header, text=titulo, font=("Segoe UI", 11, "bold"), text_color=COR_AMARELO, anchor="w",
+                               cursor="hand2" if campo else "")
+            lbl.place(relx=rx, rely=0.5, anchor="w", relwidth=w)
+            if campo:
+                lbl.bind("<Button-1>", lambda e, c=campo: self.ordenar(c))
+            self._titulos.append((lbl, titulo, campo))
+            rx += w
+        if self.acoes:
+            ctk.CTkLabel(header, text="Acoes", font=("Segoe UI", 11, "bold"), text_color=COR_AMARELO, anchor="w").place(
+                relx=rx, rely=0.5, anchor="w", relwidth=LARGURA_ACOES)
+
+        # Corpo: área com as linhas posicionadas + barra de rolagem
+        corpo = ctk.CTkFrame(self, fg_color="transparent")
+        corpo.grid_columnconfigure(0, weight=1)
+        corpo.grid_rowconfigure(0, weight=1)
+        if linhas_visiveis:
+            self.area = ctk.CTkFrame(corpo, fg_color="transparent", corner_radius=0, height=self._altura)
+            corpo.pack(fill="x")
+        else:
+            self.area = ctk.CTkFrame(corpo, fg_color="transparent", corner_radius=0)
+            corpo.pack(fill="both", expand=True)
+        self.area.grid(row=0, column=0, sticky="nsew")
+        self.barra = ctk.CTkScrollbar(corpo, command=self._rolar)
+        self.barra.grid(row=0, column=1, sticky="ns")
+        self.label_vazio = ctk.CTkLabel(self.area, text=mensagem_vazia, font=FONTE_NORMAL, text_color=COR_TEXTO_SEC)
+        self.area.bind("<Configure>", self._ao_redimensionar)
+        self._ligar_roda(self.area)
+        self._atualizar_titulos()
+        self.recarregar()
+
+    # ─── dados ───
+    def recarregar(self, fonte=None):
+        """Relê a contagem e descarta as páginas guardadas (após filtro ou alteração)."""
+        if fonte is not None:
+            self.fonte = fonte
+        self._descartar_paginas()
+        self.topo = 0
+        if self.executor:
+            geracao = self._geracao
+            self.total, self._carregando = 0, True
+            self.executor.executar(self.fonte.contar, grupo=self.grupo,
+                                   ao_concluir=lambda n: self._ao_contar(geracao, n))
+        else:
+            self.total = self.fonte.contar()
+        self._renderizar()
+
+    def atualizar(self, fonte=None):
+        """
+        Relê os dados mantendo posição e ordenação (tela que volta a ser
+        exibida). As linhas atuais continuam na tela até a leitura nova
+        chegar, e só as células que mudaram são redesenhadas.
+        """
+        if fonte is not None:
+            self.fonte = fonte
+        anteriores = dict(self._paginas)
+        self._descartar_paginas()
+        if not self.executor:
+            self.total = self.fonte.contar()
+            self._renderizar()
+            return
+        self._anteriores = anteriores
+        geracao = self._geracao
+        self.executor.executar(self.fonte.contar, grupo=self.grupo,
+                               ao_concluir=lambda n: self._ao_contar(geracao, n))
+        self._renderizar()
+
+    def _ao_contar(self, geracao, total):
+        if geracao == self._geracao:
+            self.total, self._carregando = total, False
+            self._renderizar()
+
+    def ordenar(self, campo):
+        if self.ordenar_por == campo:
+            self.decrescente = not self.decrescente
+        else:
+            self.ordenar_por, self.decrescente = campo, False
+        self._atualizar_titulos()
+        self._descartar_paginas()
+        self.topo = 0
+        self._renderizar()
+
+    def _descartar_paginas(self):
+        self._paginas.clear()
+        self._pedidas.clear()
+        self._anteriores = {}
+        self._geracao += 1
+
+    def _registro(self, indice):
+        num, pos = divmod(indice, TAMANHO_PAGINA)
+        pagina = self._paginas.get(num)
+        if pagina is None:
+            if self.executor:
+                self._pedir_pagina(num)
+                pagina = self._anteriores.get(num)
+                if pagina is None:
+                    return _ESPERA
+            else:
+                pagina = self.fonte.pagina(num * TAMANHO_PAGINA, TAMANHO_PAGINA, self.ordenar_por, self.decrescente)
+                self._guardar_pagina(num, pagina)
+        else:
+            self._paginas.move_to_end(num)
+        return pagina[pos] if pos < len(pagina) else None
+
+    def _guardar_pagina(self, num, pagina):
+        self._paginas[num] = pagina
+        if len(self._paginas) > MAX_PAGINAS:
+            self._paginas.popitem(last=False)
+
+    def _pedir_pagina(self, num):
+        if num in self._pedidas:
+            return
+        self._pedidas.add(num)
+        geracao = self._geracao
+
+        def recebida(pagina):
+            if geracao == self._geracao:
+                self._pedidas.discard(num)
+                self._anteriores.pop(num, None)
+                self._guardar_pagina(num, pagina)
+                self._renderizar()
+
+        self.executor.executar(self.fonte.pagina, num * TAMANHO_PAGINA, TAMANHO_PAGINA, self.ordenar_por,
+                               self.decrescente, grupo=self.grupo, ao_concluir=recebida)
+
+    # ─── desenho ───
+    def _atualizar_titulos(self):
+        for lbl, titulo, campo in self._titulos:
+            seta = (" ▼" if self.decrescente else " ▲") if campo and campo == self.ordenar_por else ""
+            lbl.configure(text=titulo + seta)
+
+    def _cheias(self):
+        return max(1, self._altura // self.altura_linha)
+
+    def _ao_redimensionar(self, event):
+        if event.height != self._altura:
+            self._altura = event.height
+            self._renderizar()
+
+    def _renderizar(self):
+        if self._altura <= 1:
+            return  # ainda sem tamanho; <Configure> chama de novo
+        visiveis = min(math.ceil(self._altura / self.altura_linha), max(self.total, 0))
+        while len(self._linhas) < visiveis:
+            self._linhas.append(_Linha(self, len(self._linhas)))
+        cheias = self._cheias()
+        self.topo = max(0, min(self.topo, self.total - cheias))
+
+        for i, linha in enumerate(self._linhas):
+            dados = self._registro(self.topo + i) if i < visiveis else None
+            if dados is None:
+                linha.esconder()
+            elif dados is _ESPERA:
+                linha.mostrar(None, self._celulas_espera, i * self.altura_linha)
+            else:
+                linha.mostrar(dados, self.formatar(dados), i * self.altura_linha)
+
+        if self.total:
+            self.label_vazio.place_forget()
+        else:
+            self.label_vazio.configure(text="Carregando..." if self._carregando else self.mensagem_vazia)
+            self.label_vazio.place(relx=0.5, y=20, anchor="n")
+        if self.total > cheias:
+            self.barra.grid()
+            self.barra.set(self.topo / self.total, min(1.0, (self.topo + cheias) / self.total))
+        else:
+            self.barra.grid_remove()
+
+    # ─── rolagem ───
+    def _rolar(self, acao, valor, unidade=None):
+        if acao == "moveto":
+            self.topo = int(float(valor) * self.total)
+        elif acao == "scroll":
+            passo = self._cheias() if unidade == "pages" else 1
+            self.topo += int(valor) * passo
+        self._renderizar()
+
+    def _roda(self, event):
+        if getattr(event, "num", None) == 4:
+            passos = -1
+        elif getattr(event, "num", None) == 5:
+            passos = 1
+        else:
+            passos = -1 if event.delta > 0 else 1
+        self.topo += passos * LINHAS_POR_GIRO
+        self._renderizar()
+        return "break"
+
+    def _ligar_roda(self, widget):
+        widget.bind("<MouseWheel>", self._roda)
+        widget.bind("<Button-4>", self._roda)
+        widget.bind("<Button-5>", self._roda)
+
+    def _executar_acao(self, slot, k):
+        dados = self._linhas[slot].dados
+        if dados is not None:
+            self.acoes[k][3](dados)
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+tarefas.py — Execução em segundo plano com retorno na thread do Tk
+Sistema Oficina 2026
+
+Consultas ao banco, exportações e PDFs rodam num pool de threads; o
+resultado volta para a interface pelo after() da janela, que só fica
+agendado enquanto há tarefas pendentes. Tarefas de uma tela levam um
+grupo ("tela") e são canceladas quando a tela é trocada, para que o
+retorno não mexa em widgets já destruídos.
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+
+INTERVALO_DESPACHO_MS = 30
+TRABALHADORES = 3
+
+
+class Tarefa:
+    """Handle de uma tarefa enviada ao Executor (parecido com concurrent.futures.Future)."""
+
+    def __init__(self, futuro, grupo, ao_concluir, ao_falhar):
+        self._futuro = futuro
+        self.grupo = grupo
+        self.ao_concluir = ao_concluir
+        self.ao_falhar = ao_falhar
+        self.cancelada = False
+
+    def cancelar(self):
+        """Descarta o resultado; se ainda não começou, nem chega a rodar."""
+        self.cancelada = True
+        return self._futuro.cancel()
+
+    def pronta(self):
+        return self._futuro.done()
+
+    def resultado(self, timeout=None):
+        """Bloqueia até o fim (não usar na thread do Tk)."""
+        return self._futuro.result(timeout)
+
+
+class Executor:
+    """Pool de threads ligado a uma janela Tk (qualquer objeto com after())."""
+
+    def __init__(self, janela, trabalhadores=TRABALHADORES):
+        self.janela = janela
+        self._pool = ThreadPoolExecutor(max_workers=trabalhadores, thread_name_prefix="tarefa")
+        self._prontas = queue.Queue()
+        self._pendentes = set()
+        self._lock = threading.Lock()
+        self._despachando = False
+
+    def executar(self, funcao, *args, ao_concluir=None, ao_falhar=None, grupo=None, **kwargs):
+        """
+        Roda funcao(*args, **kwargs) no pool. ao_concluir(resultado) ou
+        ao_falhar(excecao) são chamados na thread do Tk. Retorna a Tarefa.
+        """
+        futuro = self._pool.submit(funcao, *args, **kwargs)
+        tarefa = Tarefa(futuro, grupo, ao_concluir, ao_falhar)
+        with self._lock:
+            self._pendentes.add(tarefa)
+        futuro.add_done_callback(lambda _: self._prontas.put(tarefa))
+        self._agendar_despacho()
+        return tarefa
+
+    def cancelar_grupo(self, grupo):
+        with self._lock:
+            alvo = [t for t in self._pendentes if t.grupo == grupo]
+        for tarefa in alvo:
+            tarefa.cancelar()
+
+    def pendentes(self):
+        with self._lock:
+            return len(self._pendentes)
+
+    def encerrar(self, esperar=False):
+        """Cancela o que não começou e libera o pool."""
+        with self._lock:
+            alvo = list(self._pendentes)
+        for tarefa in alvo:
+            tarefa.cancelar()
+        self._pool.shutdown(wait=esperar, cancel_futures=True)
+
+    def _agendar_despacho(self):
+        if not self._despachando:
+            self._despachando = True
+            self.janela.after(INTERVALO_DESPACHO_MS, self._despachar)
+
+    def _despachar(self):
+        """Roda na thread do Tk: entrega os resultados prontos."""
+        while True:
+            try:
+                tarefa = self._prontas.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._pendentes.discard(tarefa)
+            if tarefa.cancelada:
+                continue
+            try:
+                resultado = tarefa.resultado()
+            except CancelledError:
+                continue
+            except Exception as e:
+                if tarefa.ao_falhar:
+                    self._chamar(tarefa.ao_falhar, e)
+                else:
+                    print(f"[TAREFA] Erro em segundo plano: {e}")
+                continue
+            if tarefa.ao_concluir:
+                self._chamar(tarefa.ao_concluir, resultado)
+        self._despachando = False
+        if self.pendentes():
+            self._agendar_despacho()
+
+    @staticmethod
+    def _chamar(callback, valor):
+        try:
+            callback(valor)
+        except Exception as e:
+            print(f"[TAREFA] Erro ao entregar resultado: {e}")
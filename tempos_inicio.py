@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+tempos_inicio.py — Tempos de cada fase da abertura do sistema
+Sistema Oficina 2026
+
+main.py marca os eventos da abertura (imports, janela, primeiro desenho,
+banco pronto, dashboard com dados). No fim o relatório vai para o console
+e uma linha JSON por abertura é acrescentada a
+Diagnostico/inicializacao.jsonl (últimas MAX_REGISTROS aberturas), para
+comparar máquinas e versões.
+"""
+
+import os
+import json
+import time
+from datetime import datetime
+
+DIAGNOSTICO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Diagnostico")
+ARQUIVO = os.path.join(DIAGNOSTICO_DIR, "inicializacao.jsonl")
+MAX_REGISTROS = 200
+
+
+class Cronometro:
+    """Eventos em ms desde `inicio` (perf_counter do começo do processo)."""
+
+    def __init__(self, inicio=None):
+        self.inicio = inicio if inicio is not None else time.perf_counter()
+        self.eventos = []         # (nome, ms desde o início)
+        self.segundo_plano = {}   # nome -> ms de trabalho fora da thread do Tk
+        self.concluido = False
+
+    def marcar(self, evento):
+        self.eventos.append((evento, (time.perf_counter() - self.inicio) * 1000))
+
+    def medir(self, nome, ms):
+        """Duração de uma etapa feita em segundo plano (sobrepõe as fases)."""
+        self.segundo_plano[nome] = ms
+
+    def relatorio(self):
+        total = self.eventos[-1][1] if self.eventos else 0
+        linhas = [f"[INICIO] Abertura em {total:.0f} ms"]
+        anterior = 0
+        for nome, ms in self.eventos:
+            linhas.append(f"  {nome:<22} +{ms - anterior:6.0f} ms  ({ms:6.0f} ms)")
+            anterior = ms
+        for nome, ms in self.segundo_plano.items():
+            linhas.append(f"  {nome:<22}  {ms:6.0f} ms  (2o plano)")
+        return "\n".join(linhas)
+
+    def concluir(self):
+        """Imprime o relatório; gravar() fica para quem chamar (faz E/S)."""
+        self.concluido = True
+        print(self.relatorio())
+
+    def gravar(self, caminho=ARQUIVO):
+        registro = {
+            "data": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "eventos": {nome: round(ms, 1) for nome, ms in self.eventos},
+            "segundo_plano": {nome: round(ms, 1) for nome, ms in self.segundo_plano.items()},
+        }
+        try:
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            linhas = []
+            if os.path.exists(caminho):
+                with open(caminho, "r", encoding="utf-8") as f:
+                    linhas = f.readlines()[-(MAX_REGISTROS - 1):]
+            linhas.append(json.dumps(registro, ensure_ascii=False) + "\n")
+            tmp = f"{caminho}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.writelines(linhas)
+            os.replace(tmp, caminho)
+        except OSError as e:
+            print(f"[INICIO] Falha ao gravar tempos: {e}")
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Pacotes mensais de PDFs: nenhum PDF some sem ir para o pacote e bytes que
+o índice deixou de apontar não ficam no pacote.
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import arquivo_pdf
+
+
+class TestArquivoPdf(unittest.TestCase):
+    def setUp(self):
+        self._pasta = tempfile.mkdtemp()
+        self._original = (arquivo_pdf.PDF_DIR, arquivo_pdf.PACOTES_DIR, arquivo_pdf.INDICE_PATH, arquivo_pdf.EXTRAIDOS_DIR)
+        arquivo_pdf.PDF_DIR = os.path.join(self._pasta, "PDFs")
+        arquivo_pdf.PACOTES_DIR = os.path.join(arquivo_pdf.PDF_DIR, "pacotes")
+        arquivo_pdf.INDICE_PATH = os.path.join(arquivo_pdf.PACOTES_DIR, "indice.db")
+        arquivo_pdf.EXTRAIDOS_DIR = os.path.join(self._pasta, "extraidos")
+        os.makedirs(arquivo_pdf.PDF_DIR)
+
+    def tearDown(self):
+        arquivo_pdf.PDF_DIR, arquivo_pdf.PACOTES_DIR, arquivo_pdf.INDICE_PATH, arquivo_pdf.EXTRAIDOS_DIR = self._original
+        shutil.rmtree(self._pasta, ignore_errors=True)
+
+    def _pdf(self, ra, dados):
+        caminho = os.path.join(arquivo_pdf.PDF_DIR, f"OS_{ra}.pdf")
+        with open(caminho, "wb") as f:
+            f.write(dados)
+        antigo = time.time() - 90 * 86400
+        os.utime(caminho, (antigo, antigo))
+        return caminho
+
+    def _bytes_nos_pacotes(self):
+        return sum(os.path.getsize(os.path.join(arquivo_pdf.PACOTES_DIR, n))
+                   for n in os.listdir(arquivo_pdf.PACOTES_DIR) if n.endswith(".pack"))
+
+    def test_pdf_sem_chave_e_arquivado(self):
+        # PDFs de antes do cache de renderização: nunca apagados sem ir para o pacote
+        self._pdf("2024000001", b"%PDF antigo, OS apagada")
+        self._pdf("2024000002", b"%PDF antigo, OS existente")
+        self._pdf("2026000001", b"%PDF com chave")
+        r = arquivo_pdf.compactar(60, {"2026000001": "abc"},
+                                  chave_de=lambda ra: "calculada" if ra == "2024000002" else None)
+        self.assertEqual((r["arquivos"], r["sem_chave"]), (3, 1))
+        self.assertEqual(os.listdir(arquivo_pdf.PDF_DIR), ["pacotes"])
+        self.assertIsNone(arquivo_pdf.localizar("2024000001")["chave"])
+        self.assertIsNone(arquivo_pdf.extrair("2024000001", "abc"))
+        with open(arquivo_pdf.extrair("2024000001"), "rb") as f:
+            self.assertEqual(f.read(), b"%PDF antigo, OS apagada")
+        with open(arquivo_pdf.extrair("2024000002", "calculada"), "rb") as f:
+            self.assertEqual(f.read(), b"%PDF antigo, OS existente")
+
+    def test_reempacotar_descarta_bytes_antigos(self):
+        self._pdf("1", b"%PDF primeira versao")
+        self._pdf("2", b"%PDF outra OS")
+        arquivo_pdf.compactar(60, {"1": "v1", "2": "x"})
+        self._pdf("1", b"%PDF segunda versao, maior")
+        r = arquivo_pdf.compactar(60, {"1": "v2"})
+        self.assertEqual(r["liberados"], len(b"%PDF primeira versao"))
+        self.assertEqual(self._bytes_nos_pacotes(), len(b"%PDF segunda versao, maior") + len(b"%PDF outra OS"))
+        with open(arquivo_pdf.extrair("1", "v2"), "rb") as f:
+            self.assertEqual(f.read(), b"%PDF segunda versao, maior")
+        with open(arquivo_pdf.extrair("2", "x"), "rb") as f:
+            self.assertEqual(f.read(), b"%PDF outra OS")
+        self.assertIsNone(arquivo_pdf.extrair("1", "v1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Exportação incremental: restaurar a cadeia base + incremental devolve só os
+arquivos da exportação mais recente.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import database
+
+
+class TestExportacaoIncremental(unittest.TestCase):
+    def setUp(self):
+        self._pasta = tempfile.mkdtemp()
+        self.dados = os.path.join(self._pasta, "oficina")
+        self.zips = os.path.join(self._pasta, "zips")
+        os.makedirs(os.path.join(self.dados, "PDFs", "pacotes"))
+        os.makedirs(self.zips)
+        self._original = (database.BASE_DIR, database.DB_PATH)
+        database.BASE_DIR = self.dados
+        database.DB_PATH = os.path.join(self.dados, "oficina.db")
+        database.init_db()
+
+    def tearDown(self):
+        database.BASE_DIR, database.DB_PATH = self._original
+        shutil.rmtree(self._pasta, ignore_errors=True)
+
+    def _gravar(self, rel, dados):
+        with open(os.path.join(self.dados, rel), "wb") as f:
+            f.write(dados)
+
+    def test_arquivo_apagado_depois_da_base_nao_volta(self):
+        self._gravar("PDFs/OS_2026001.pdf", b"%PDF solto")
+        base = os.path.join(self.zips, "base.zip")
+        self.assertTrue(database.exportar_dados(base))
+
+        # O PDF solto foi para um pacote depois da exportação base
+        os.remove(os.path.join(self.dados, "PDFs", "OS_2026001.pdf"))
+        self._gravar("PDFs/pacotes/pdfs_2026-01.pack", b"%PDF solto")
+        inc = os.path.join(self.zips, "inc.zip")
+        self.assertTrue(database.exportar_dados(inc, base_zip=base))
+
+        shutil.rmtree(os.path.join(self.dados, "PDFs"))
+        self.assertTrue(database.importar_dados(inc))
+        self.assertFalse(os.path.exists(os.path.join(self.dados, "PDFs", "OS_2026001.pdf")))
+        self.assertTrue(os.path.exists(os.path.join(self.dados, "PDFs", "pacotes", "pdfs_2026-01.pack")))
+        self.assertTrue(os.path.exists(os.path.join(self.dados, "oficina.db")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Fila de impressão com renderização lenta: o retorno precisa chegar à
+thread do Tk mesmo quando o PDF demora mais que um ciclo de despacho.
+"""
+
+import os
+import sys
+import time
+import heapq
+import types
+import itertools
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fila_impressao
+
+
+class JanelaFalsa:
+    """after() de uma janela Tk, rodado à mão nesta thread."""
+
+    def __init__(self):
+        self._fila = []
+        self._seq = itertools.count()
+
+    def after(self, ms, funcao):
+        heapq.heappush(self._fila, (time.perf_counter() + ms / 1000, next(self._seq), funcao))
+
+    def rodar(self, segundos):
+        fim = time.perf_counter() + segundos
+        while time.perf_counter() < fim:
+            if self._fila and self._fila[0][0] <= time.perf_counter():
+                heapq.heappop(self._fila)[2]()
+            else:
+                time.sleep(0.005)
+
+
+class TestFilaImpressaoLenta(unittest.TestCase):
+    def setUp(self):
+        self._original = sys.modules.get("print_engine")
+        motor = types.ModuleType("print_engine")
+
+        def preparar_pdf_ra(ra):
+            time.sleep(0.5)  # bem mais que INTERVALO_DESPACHO_MS
+            return f"/tmp/OS_{ra}.pdf"
+        motor.preparar_pdf_ra = preparar_pdf_ra
+        motor.imprimir_pdf = lambda caminho: None
+        motor._abrir_pdf = lambda caminho: None
+        sys.modules["print_engine"] = motor
+
+    def tearDown(self):
+        if self._original is None:
+            sys.modules.pop("print_engine", None)
+        else:
+            sys.modules["print_engine"] = self._original
+
+    def test_retorno_entregue_apos_renderizacao_lenta(self):
+        janela = JanelaFalsa()
+        fila = fila_impressao.FilaImpressao(janela)
+        recebidos = []
+        fila.solicitar("2026001", fila_impressao.SALVAR, lambda ra, caminho: recebidos.append((ra, caminho)))
+        janela.rodar(2.0)
+        self.assertTrue(fila.encerrar(timeout=5))
+        self.assertEqual(recebidos, [("2026001", "/tmp/OS_2026001.pdf")])
+        self.assertTrue(fila._resultados.empty())
+        self.assertFalse(fila.ocupada())
+
+
+if __name__ == "__main__":
+    unittest.main()
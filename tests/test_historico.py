@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+Comparação com backups: fonte ilegível é erro, não "todos os campos mudaram".
+"""
+
+import os
+import sys
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import historico
+
+
+class TestHistorico(unittest.TestCase):
+    def setUp(self):
+        self._pasta = tempfile.mkdtemp()
+        self.copia = os.path.join(self._pasta, "copia.db")
+        conn = sqlite3.connect(self.copia)
+        conn.execute("CREATE TABLE clientes (id INTEGER PRIMARY KEY, nome TEXT)")
+        conn.execute("INSERT INTO clientes VALUES (1, 'Ana')")
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        historico.fechar_tudo()
+        shutil.rmtree(self._pasta, ignore_errors=True)
+
+    def test_fonte_inexistente_levanta_erro(self):
+        with self.assertRaises(historico.FonteIndisponivel):
+            historico.obter_cliente_em(os.path.join(self._pasta, "nao_existe.db"), 1)
+        with self.assertRaises(historico.FonteIndisponivel):
+            historico.obter_servico_em(os.path.join(self._pasta, "nao_existe.zip"), "2026001")
+
+    def test_fonte_sem_a_tabela_levanta_erro(self):
+        with self.assertRaises(historico.FonteIndisponivel):
+            historico.obter_servico_em(self.copia, "2026001")
+
+    def test_registro_ausente_e_none(self):
+        self.assertEqual(historico.obter_cliente_em(self.copia, 1), {"id": 1, "nome": "Ana"})
+        self.assertIsNone(historico.obter_cliente_em(self.copia, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Recibo térmico renderizado na impressora falsa (ImpressoraArquivo): linhas
+dentro da bobina e acentos na página cp850.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import recibo_termico
+
+SERVICO = {
+    "ra": "2026001", "data_entrada": "2026-10-19", "cliente_nome": "João da Conceição — Oficina “Central”",
+    "cliente_telefone": "(11) 99999-0000", "aparelho": "Televisão", "marca": "Marca", "modelo": "X-100",
+    "defeito_relatado": "Não liga… fonte estourada depois de queda de energia, sem imagem e sem som algum",
+    "valor_total": 250.0, "desconto": 20.0, "valor_final": 230.0, "forma_pagamento": "Cartão de crédito",
+}
+PECAS = [{"descricao": "Fonte de alimentação completa com placa e conectores", "valor_unitario": 180.0},
+         {"descricao": "Mão de obra", "valor_unitario": 70.0}]
+
+
+class TestReciboTermico(unittest.TestCase):
+    def setUp(self):
+        self._pasta = tempfile.mkdtemp()
+        self.impressora = recibo_termico.ImpressoraArquivo(self._pasta)
+
+    def tearDown(self):
+        shutil.rmtree(self._pasta, ignore_errors=True)
+
+    def _imprimir(self, largura_mm):
+        dados = recibo_termico.renderizar_recibo(SERVICO, PECAS, largura_mm)
+        self.assertTrue(recibo_termico.enviar(dados, self.impressora))
+        caminho = self.impressora.trabalhos()[-1]
+        with open(caminho, "rb") as f:
+            self.assertEqual(f.read(), dados)
+        return dados, recibo_termico.ImpressoraArquivo.texto(caminho)
+
+    def test_linhas_cabem_na_bobina(self):
+        for largura_mm, colunas in ((58, 32), (80, 48)):
+            with self.subTest(largura_mm=largura_mm):
+                _, texto = self._imprimir(largura_mm)
+                linhas = texto.splitlines()
+                self.assertTrue(all(len(l) <= colunas for l in linhas), [l for l in linhas if len(l) > colunas])
+                self.assertIn("-" * colunas, linhas)
+                # Texto longo quebrado por palavras, sem perder nenhuma
+                self.assertIn("Defeito: Não liga... fonte estourada depois de queda de energia, sem imagem e sem som algum",
+                              " ".join(linhas))
+                self.assertTrue(any(l.endswith("230.00") and l.startswith("TOTAL R$") for l in linhas))
+
+    def test_acentos_cp850_e_pontuacao_como_no_pdf(self):
+        dados, texto = self._imprimir(80)
+        self.assertIn("João da Conceição".encode("cp850"), dados)
+        self.assertIn("Televisão", texto)
+        self.assertIn('Conceição - Oficina "Central"', texto)
+        self.assertIn("Não liga...", texto)
+        self.assertNotIn("?", texto)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+vigia_loop.py — Vigia de travamentos do loop de eventos do Tk
+Sistema Oficina 2026
+
+Um after() a cada INTERVALO_MS funciona como batimento: se o Tk ficou
+ocupado, o batimento chega atrasado. Uma thread separada acompanha o
+último batimento e, quando a espera passa de LIMITE_MS, copia a pilha da
+thread do Tk (sys._current_frames) naquele instante — é ela que mostra
+quem está segurando a janela. Quando o batimento volta, o travamento
+(tela, ação em andamento, duração e pilha) vai para o console e para
+Diagnostico/travamentos.jsonl.
+
+As ações da interface (navegação, busca, salvar, imprimir) também são
+cronometradas e somadas num histograma por ação em
+Diagnostico/latencias_ui.json, acumulado entre aberturas, para recolher
+das lojas. Toda a E/S de arquivo fica na thread do vigia.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import traceback
+from datetime import datetime
+
+from tempos_inicio import DIAGNOSTICO_DIR
+
+INTERVALO_MS = 100
+LIMITE_MS = 500
+# Travamento que não acaba (usuário vai fechar à força): grava sem esperar o fim
+TRAVAMENTO_LONGO_MS = 10000
+GRAVAR_A_CADA_S = 300
+FAIXAS_MS = (16, 33, 50, 100, 250, 500, 1000, 2000, 5000)  # + uma faixa "acima"
+MAX_REGISTROS = 200
+
+ARQUIVO_TRAVAMENTOS = os.path.join(DIAGNOSTICO_DIR, "travamentos.jsonl")
+ARQUIVO_LATENCIAS = os.path.join(DIAGNOSTICO_DIR, "latencias_ui.json")
+
+
+def _faixa(ms):
+    for i, limite in enumerate(FAIXAS_MS):
+        if ms <= limite:
+            return i
+    return len(FAIXAS_MS)
+
+
+def _rotulos():
+    anterior = 0
+    rotulos = []
+    for limite in FAIXAS_MS:
+        rotulos.append(f"{anterior}-{limite}")
+        anterior = limite
+    return rotulos + [f">{anterior}"]
+
+
+class VigiaLoop:
+    """
+    janela: widget Tk (after/after_idle/after_cancel), criado nesta thread.
+    tela(): nome da tela visível, para os registros de travamento.
+    """
+
+    def __init__(self, janela, tela=None, intervalo_ms=INTERVALO_MS, limite_ms=LIMITE_MS):
+        self.janela = janela
+        self.tela = tela or (lambda: None)
+        self.intervalo_ms = intervalo_ms
+        self.limite_ms = limite_ms
+        self._thread_tk = threading.get_ident()
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._thread = None
+        self._agendado = None
+        self._batida = time.perf_counter()
+        self._acao = None            # (nome, detalhe, início) até o Tk ficar ocioso
+        self._captura = None         # pilha/ação do travamento em curso (feita pela thread do vigia)
+        self._travamentos = []       # registros a gravar
+        self._histograma = {}        # ação -> {"faixas": [...], "soma_ms", "max_ms"} ainda não gravado
+        self.travamentos = 0
+
+    # ─── ciclo ───
+    def iniciar(self):
+        if self._thread is not None:
+            return
+        self._batida = time.perf_counter()
+        self._agendado = self.janela.after(self.intervalo_ms, self._batimento)
+        self._thread = threading.Thread(target=self._vigiar, name="vigia-loop", daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        """Para o batimento e grava o que falta (chamar ao fechar a janela)."""
+        if self._agendado is not None:
+            self.janela.after_cancel(self._agendado)
+            self._agendado = None
+        if self._thread is not None:
+            self._parar.set()
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._gravar()
+
+    # ─── ações da interface ───
+    def acao(self, nome, detalhe=""):
+        """
+        Marca o início de uma ação na thread do Tk. Ela termina quando o Tk
+        fica ocioso de novo (tratamento + redesenho) e entra no histograma.
+        """
+        acao = self._acao = (nome, detalhe, time.perf_counter())
+
+        def fim():
+            self.registrar(nome, (time.perf_counter() - acao[2]) * 1000)
+            if self._acao is acao:
+                self._acao = None
+        self.janela.after_idle(fim)
+
+    def registrar(self, nome, ms):
+        """Duração medida por quem chamou (ex.: do clique até o PDF pronto)."""
+        with self._lock:
+            h = self._histograma.get(nome)
+            if h is None:
+                h = self._histograma[nome] = {"faixas": [0] * (len(FAIXAS_MS) + 1), "soma_ms": 0.0, "max_ms": 0.0}
+            h["faixas"][_faixa(ms)] += 1
+            h["soma_ms"] += ms
+            h["max_ms"] = max(h["max_ms"], ms)
+
+    # ─── thread do Tk ───
+    def _batimento(self):
+        agora = time.perf_counter()
+        anterior, self._batida = self._batida, agora
+        atraso = (agora - anterior) * 1000 - self.intervalo_ms
+        self.registrar("loop", max(atraso, 0.0))
+        with self._lock:
+            captura, self._captura = self._captura, None
+        if captura is not None and captura["batida"] != anterior:
+            captura = None  # feita com o batimento antigo, de um travamento que já acabou
+        if atraso > self.limite_ms:
+            self._travou(atraso, captura)
+        self._agendado = self.janela.after(self.intervalo_ms, self._batimento)
+
+    def _travou(self, ms, captura):
+        self.travamentos += 1
+        captura = captura or {}
+        acao = captura.get("acao")
+        print(f"[VIGIA] Janela travada por {ms:.0f} ms (tela: {captura.get('tela') or '-'}, acao: {acao or '-'})")
+        if captura.get("pilha"):
+            # Última linha da pilha: onde a thread do Tk estava quando o limite passou
+            print(f"[VIGIA]   em {captura['pilha'][-1].strip().splitlines()[0]}")
+        registro = {k: v for k, v in captura.items() if k not in ("batida", "gravado")}
+        registro.update(duracao_ms=round(ms), data=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        with self._lock:
+            self._travamentos.append(registro)
+
+    # ─── thread do vigia ───
+    def _vigiar(self):
+        proxima_gravacao = time.monotonic() + GRAVAR_A_CADA_S
+        while not self._parar.wait(self.intervalo_ms / 1000):
+            batida = self._batida
+            parado = (time.perf_counter() - batida) * 1000 - self.intervalo_ms
+            if parado > self.limite_ms:
+                self._capturar(batida, parado)
+            if time.monotonic() >= proxima_gravacao:
+                proxima_gravacao = time.monotonic() + GRAVAR_A_CADA_S
+                self._gravar()
+            elif self._travamentos:
+                self._gravar_travamentos()
+
+    def _capturar(self, batida, parado):
+        with self._lock:
+            captura = self._captura
+        if captura is None or captura["batida"] != batida:
+            quadro = sys._current_frames().get(self._thread_tk)
+            acao = self._acao
+            captura = {
+                "tela": self._tela(),
+                "acao": f"{acao[0]} {acao[1]}".strip() if acao else None,
+                "pilha": traceback.format_stack(quadro) if quadro is not None else [],
+                "batida": batida,
+                "gravado": False,
+            }
+            with self._lock:
+                self._captura = captura
+        if parado > TRAVAMENTO_LONGO_MS and not captura["gravado"]:
+            # Pode não haver "depois": registra já, marcado como em andamento
+            captura["gravado"] = True
+            registro = {k: v for k, v in captura.items() if k not in ("batida", "gravado")}
+            registro.update(duracao_ms=round(parado), em_andamento=True, data=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            with self._lock:
+                self._travamentos.append(registro)
+
+    def _tela(self):
+        try:
+            return self.tela()
+        except Exception:
+            return None
+
+    def _gravar(self):
+        self._gravar_travamentos()
+        self._gravar_histograma()
+
+    def _gravar_travamentos(self, caminho=ARQUIVO_TRAVAMENTOS):
+        with self._lock:
+            novos, self._travamentos = self._travamentos, []
+        if not novos:
+            return
+        try:
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            linhas = []
+            if os.path.exists(caminho):
+                with open(caminho, "r", encoding="utf-8") as f:
+                    linhas = f.readlines()
+            linhas += [json.dumps(r, ensure_ascii=False) + "\n" for r in novos]
+            tmp = f"{caminho}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.writelines(linhas[-MAX_REGISTROS:])
+            os.replace(tmp, caminho)
+        except OSError as e:
+            print(f"[VIGIA] Falha ao gravar travamentos: {e}")
+
+    def _gravar_histograma(self, caminho=ARQUIVO_LATENCIAS):
+        """Soma o que foi medido desde a última gravação ao arquivo acumulado."""
+        with self._lock:
+            novos, self._histograma = self._histograma, {}
+        if not novos:
+            return
+        agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        dados = {}
+        try:
+            if os.path.exists(caminho):
+                with open(caminho, "r", encoding="utf-8") as f:
+                    dados = json.load(f)
+        except (OSError, ValueError):
+            dados = {}
+        if dados.get("faixas_ms") != _rotulos():
+            dados = {"faixas_ms": _rotulos(), "desde": agora, "acoes": {}}  # faixas mudaram: recomeça
+        for nome, h in novos.items():
+            total = dados["acoes"].setdefault(nome, {"faixas": [0] * len(h["faixas"]), "quantidade": 0, "media_ms": 0.0, "max_ms": 0.0})
+            qtd = total["quantidade"] + sum(h["faixas"])
+            total["media_ms"] = round((total["media_ms"] * total["quantidade"] + h["soma_ms"]) / qtd, 1)
+            total["quantidade"] = qtd
+            total["faixas"] = [a + b for a, b in zip(total["faixas"], h["faixas"])]
+            total["max_ms"] = round(max(total["max_ms"], h["max_ms"]), 1)
+        dados["atualizado"] = agora
+        try:
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            tmp = f"{caminho}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(dados, f, ensure_ascii=False, indent=1)
+            os.replace(tmp, caminho)
+        except OSError as e:
+            print(f"[VIGIA] Falha ao gravar latencias: {e}")
+
+
+def resumo(caminho=ARQUIVO_LATENCIAS):
+    """Texto com mediana aproximada (faixa) e máximo por ação, para o suporte."""
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            dados = json.load(f)
+    except (OSError, ValueError):
+        return "Sem latencias registradas."
+    linhas = [f"Latencias desde {dados.get('desde', '?')} (ate {dados.get('atualizado', '?')})"]
+    rotulos = dados["faixas_ms"]
+    for nome, h in sorted(dados["acoes"].items()):
+        acumulado, metade, mediana = 0, h["quantidade"] / 2, rotulos[-1]
+        for rotulo, qtd in zip(rotulos, h["faixas"]):
+            acumulado += qtd
+            if acumulado >= metade:
+                mediana = rotulo
+                break
+        linhas.append(f"  {nome:<24} {h['quantidade']:7d}x  mediana {mediana:>10} ms  media {h['media_ms']:7.1f} ms  max {h['max_ms']:8.1f} ms")
+    return "\n".join(linhas)
+
+
+if __name__ == "__main__":
+    print(resumo())